@@ -0,0 +1,259 @@
+"""End-to-end latency and throughput benchmarks for the bridge.
+
+Drives the real ``python -m pybridge`` entry point and ``session`` loop
+against the simulated fleet (``--simulate``), so the numbers cover process
+start-up, argument parsing, discovery post-processing, the session channel
+and storage, but not the network. Results are printed (or written with
+``--output``) as one JSON document so runs can be compared across releases.
+
+    python benchmarks/bench_bridge.py [--quick] [--only session] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from pyatv import const as pyatv_const  # noqa: E402
+
+from pybridge import output  # noqa: E402
+from pybridge.discovery import _config_to_payload  # noqa: E402
+from pybridge.simulator import SimulatedFleet, SimulationProfile  # noqa: E402
+from pybridge.storage import load_storage  # noqa: E402
+
+# Device behaviour for end-to-end runs: near-instant, so the bridge's own
+# overhead dominates.
+FAST_PROFILE = {
+    "devices": 4,
+    "arrival": 0.001,
+    "connect_latency": 0,
+    "command_latency": 0,
+    "seed": 1,
+}
+TARGET = "Simulated 001"
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, Any]:
+    """Summarise *samples* (seconds) in milliseconds."""
+
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+class Workspace:
+    """Temporary storage directory and simulation profile shared by the benchmarks."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.storage = str(root / "pyatv.conf")
+        self.profile = str(root / "profile.json")
+        Path(self.profile).write_text(json.dumps(FAST_PROFILE), encoding="utf-8")
+
+    def command(self, *args: str) -> List[str]:
+        return [
+            sys.executable,
+            "-m",
+            "pybridge",
+            "--simulate",
+            self.profile,
+            "--storage",
+            self.storage,
+            "--no-storage",
+            *args,
+        ]
+
+    def warm_up(self) -> None:
+        # Record the fleet in the scan telemetry so targeted scans stop early,
+        # as they do for a device the app has seen before.
+        subprocess.run(
+            self.command("scan", "--timeout", "0.05"),
+            cwd=REPO_ROOT,
+            check=True,
+            capture_output=True,
+        )
+
+
+def bench_cold_command(workspace: Workspace, runs: int) -> Dict[str, Any]:
+    """Wall time of one-shot ``command`` processes, start-up included."""
+
+    argv = workspace.command("command", "--identifier", TARGET, "--command", "home")
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(argv, cwd=REPO_ROOT, check=True, capture_output=True)
+        samples.append(time.perf_counter() - started)
+    return latency_summary(samples)
+
+
+def bench_session(workspace: Workspace, messages: int) -> Dict[str, Any]:
+    """Round-trip latency and throughput of commands over one ``session`` process."""
+
+    process = subprocess.Popen(
+        workspace.command("session", "--identifier", TARGET),
+        cwd=REPO_ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        bufsize=1,
+    )
+    assert process.stdin is not None and process.stdout is not None
+
+    try:
+        started = time.perf_counter()
+        ready = json.loads(process.stdout.readline())
+        ready_elapsed = time.perf_counter() - started
+        if ready.get("status") != "ready":
+            raise RuntimeError(f"session failed to start: {ready}")
+
+        request = json.dumps({"type": "command", "command": "right"}) + "\n"
+        samples = []
+        started = time.perf_counter()
+        for _ in range(messages):
+            sent = time.perf_counter()
+            process.stdin.write(request)
+            process.stdin.flush()
+            process.stdout.readline()
+            samples.append(time.perf_counter() - sent)
+        total = time.perf_counter() - started
+
+        process.stdin.write(json.dumps({"type": "close"}) + "\n")
+        process.stdin.flush()
+        process.wait(timeout=10)
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+    result = latency_summary(samples)
+    result["messages_per_second"] = round(messages / total, 1)
+    result["ready_ms"] = round(ready_elapsed * 1000, 3)
+    return result
+
+
+def bench_scan_processing(devices: int, repeat: int) -> Dict[str, Any]:
+    """Cost of turning scan results into the ``scan`` output line."""
+
+    fleet = SimulatedFleet(SimulationProfile(devices=devices, seed=1))
+    configs = [fleet.config(device) for device in fleet.devices]
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output.dumps({"devices": [_config_to_payload(config) for config in configs]})
+        samples.append(time.perf_counter() - started)
+
+    result = latency_summary(samples)
+    result["devices"] = devices
+    return result
+
+
+def bench_storage_load(root: Path, entries: int, repeat: int) -> Dict[str, Any]:
+    """Time to load a credential file holding *entries* paired devices."""
+
+    path = str(root / f"storage-{entries}.conf")
+
+    async def _populate() -> None:
+        loop = asyncio.get_running_loop()
+        storage = await load_storage(loop, path)
+        fleet = SimulatedFleet(SimulationProfile(devices=entries, seed=1))
+        for device in fleet.devices:
+            settings = await storage.get_settings(fleet.config(device))
+            settings.protocols.companion.credentials = f"companion-{device.index:064x}"
+            settings.protocols.airplay.credentials = f"airplay-{device.index:064x}"
+        await storage.save()
+
+    async def _load() -> float:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        await load_storage(loop, path)
+        return time.perf_counter() - started
+
+    asyncio.run(_populate())
+    samples = [asyncio.run(_load()) for _ in range(repeat)]
+
+    result = latency_summary(samples)
+    result["entries"] = entries
+    result["bytes"] = Path(path).stat().st_size
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations.")
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=["cold_command", "session", "scan_processing", "storage_load"],
+        help="Run only the named benchmark (repeatable).",
+    )
+    parser.add_argument("--output", metavar="PATH", help="Write results to a file.")
+    args = parser.parse_args()
+
+    scale = 0.2 if args.quick else 1.0
+
+    def count(value: int) -> int:
+        return max(3, int(value * scale))
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        workspace = Workspace(root)
+        workspace.warm_up()
+
+        benchmarks: Dict[str, Callable[[], Any]] = {
+            "cold_command": lambda: bench_cold_command(workspace, count(20)),
+            "session": lambda: bench_session(workspace, count(2000)),
+            "scan_processing": lambda: [
+                bench_scan_processing(devices, count(20)) for devices in (100, 1000, 5000)
+            ],
+            "storage_load": lambda: [
+                bench_storage_load(root, entries, count(20)) for entries in (10, 100, 1000)
+            ],
+        }
+        for name, run in benchmarks.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = run()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pyatv": f"{pyatv_const.MAJOR_VERSION}.{pyatv_const.MINOR_VERSION}"
+        f".{pyatv_const.PATCH_VERSION}",
+        "json_backend": output.BACKEND,
+        "results": results,
+    }
+
+    document = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(document + "\n", encoding="utf-8")
+    print(document)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Micro-benchmark for building and encoding ``scan`` output.
+
+Builds synthetic pyatv configurations for a large fleet and times turning
+them into the JSON line the CLI prints, with and without ``--fields``
+projection and with each available encoder.
+
+    python benchmarks/bench_scan_output.py [--devices 1000] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyatv import conf  # noqa: E402
+from pyatv.const import DeviceModel, OperatingSystem, PairingRequirement, Protocol  # noqa: E402
+from pyatv.interface import DeviceInfo  # noqa: E402
+
+from pybridge import output  # noqa: E402
+from pybridge.discovery import _config_to_payload  # noqa: E402
+
+PROJECTED_FIELDS = frozenset({"name", "address", "main_identifier"})
+
+
+def synthetic_configs(count: int) -> List[conf.AppleTV]:
+    """Return *count* Apple TV configurations with Companion and AirPlay services."""
+
+    configs = []
+    for index in range(count):
+        mac = ":".join(f"{(index >> shift) & 0xFF:02x}" for shift in (40, 32, 24, 16, 8, 0))
+        device_info = DeviceInfo(
+            {
+                DeviceInfo.OPERATING_SYSTEM: OperatingSystem.TvOS,
+                DeviceInfo.VERSION: "17.5",
+                DeviceInfo.BUILD_NUMBER: "21L570",
+                DeviceInfo.MODEL: DeviceModel.AppleTV4KGen3,
+                DeviceInfo.MAC: mac,
+            }
+        )
+        config = conf.AppleTV(
+            ipaddress.IPv4Address(0x0A000000 + index + 1),
+            f"Apple TV {index}",
+            device_info=device_info,
+        )
+        config.add_service(
+            conf.ManualService(
+                f"{index:08x}-0000-0000-0000-000000000000",
+                Protocol.Companion,
+                49153,
+                {},
+                credentials="token",
+                pairing_requirement=PairingRequirement.Mandatory,
+            )
+        )
+        config.add_service(
+            conf.ManualService(
+                mac,
+                Protocol.AirPlay,
+                7000,
+                {},
+                pairing_requirement=PairingRequirement.Mandatory,
+            )
+        )
+        configs.append(config)
+    return configs
+
+
+def stdlib_dumps(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def measure(
+    configs: List[conf.AppleTV],
+    fields: Optional[frozenset],
+    encode: Callable[[Any], str],
+    repeat: int,
+) -> Dict[str, float]:
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        line = encode({"devices": [_config_to_payload(config, fields) for config in configs]})
+        samples.append(time.perf_counter() - started)
+        size = len(line)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "bytes": size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    configs = synthetic_configs(args.devices)
+    encoders = {"json": stdlib_dumps}
+    if output.BACKEND != "json":
+        encoders[output.BACKEND] = output.dumps
+
+    results = []
+    for encoder_name, encode in encoders.items():
+        for label, fields in (("full", None), ("projected", PROJECTED_FIELDS)):
+            result = {"encoder": encoder_name, "payload": label}
+            result.update(measure(configs, fields, encode, args.repeat))
+            results.append(result)
+
+    baseline = results[0]["median_ms"]
+    for result in results:
+        result["speedup"] = round(baseline / result["median_ms"], 2)
+
+    print(json.dumps({"devices": args.devices, "repeat": args.repeat, "results": results}))
+
+
+if __name__ == "__main__":
+    main()
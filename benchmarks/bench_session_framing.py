@@ -0,0 +1,73 @@
+"""Micro-benchmark for session message framing.
+
+Times encoding one message into a complete frame and decoding a frame body
+back into a request, for every framing the session channel offers, using
+messages typical of high-rate input.
+
+    python benchmarks/bench_session_framing.py [--number 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pybridge.channel import (  # noqa: E402
+    FRAME_HEADER,
+    JSON_FRAMING,
+    available_framings,
+    decode_frame,
+    encode_frame,
+)
+
+MESSAGES: Dict[str, Dict[str, Any]] = {
+    "command": {"type": "command", "command": "right", "action": "SingleTap"},
+    "command_response": {
+        "status": "ok",
+        "type": "command",
+        "command": "right",
+        "action": "SingleTap",
+    },
+    "touch": {"type": "touch", "phase": "move", "x": 512.25, "y": 384.5, "t": 1718.0625},
+}
+
+
+def frame_body(frame: bytes, framing: str) -> bytes:
+    if framing == JSON_FRAMING:
+        return frame.rstrip(b"\n")
+    return frame[FRAME_HEADER.size :]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+
+    results = []
+    for message_name, message in MESSAGES.items():
+        for framing in available_framings():
+            frame = encode_frame(message, framing)
+            body = frame_body(frame, framing)
+            encode = timeit.timeit(lambda: encode_frame(message, framing), number=args.number)
+            decode = timeit.timeit(lambda: decode_frame(body, framing), number=args.number)
+            results.append(
+                {
+                    "message": message_name,
+                    "framing": framing,
+                    "bytes": len(frame),
+                    "encode_ns": round(encode / args.number * 1e9),
+                    "decode_ns": round(decode / args.number * 1e9),
+                }
+            )
+
+    print(json.dumps({"number": args.number, "results": results}))
+
+
+if __name__ == "__main__":
+    main()
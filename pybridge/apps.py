@@ -0,0 +1,84 @@
+"""Per-device cache of installed apps.
+
+Fetching ``apps.app_list()`` takes a noticeable round trip and the result
+rarely changes, so a session keeps each device's list in memory and persists
+it beside the storage file (``state_path(..., "apps")``) for later sessions.
+A list is served while younger than ``APP_LIST_TTL``; an older one is still
+served (marked stale) while a background refresh replaces it. Lists are bound
+to the firmware ``build_number`` and discarded when it changes.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .storage import BridgeState
+
+# Seconds after which a cached app list is refreshed in the background.
+APP_LIST_TTL = 6 * 3600.0
+
+
+@dataclass
+class AppList:
+    """A device's cached apps as ``{"name", "identifier"}`` records."""
+
+    apps: List[Dict[str, Optional[str]]]
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+    @property
+    def stale(self) -> bool:
+        return self.age >= APP_LIST_TTL
+
+    def bundle_id(self, app: str) -> Optional[str]:
+        """Return the bundle identifier of *app*, given as bundle identifier or name."""
+
+        for record in self.apps:
+            if record["identifier"] == app:
+                return record["identifier"]
+        wanted = app.lower()
+        for record in self.apps:
+            if record["name"] and record["name"].lower() == wanted:
+                return record["identifier"]
+        return None
+
+
+class AppCache(BridgeState):
+    """App lists of every device the bridge has listed apps for."""
+
+    STATE_NAME = "apps"
+
+    def __init__(self, path: Optional[Path] = None, data: Optional[Dict[str, Any]] = None):
+        super().__init__(path)
+        self.devices: Dict[str, Dict[str, Any]] = dict((data or {}).get("devices", {}))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"devices": self.devices}
+
+    def lookup(self, identifier: str, build_number: Optional[str]) -> Optional[AppList]:
+        """Return the cached list, or ``None`` when absent or from other firmware."""
+
+        entry = self.devices.get(identifier)
+        if entry is None or entry.get("build_number") != build_number:
+            return None
+        return AppList(apps=list(entry["apps"]), fetched_at=entry["fetched_at"])
+
+    def store(self, identifier: str, build_number: Optional[str], apps: Iterable[Any]) -> AppList:
+        """Replace the cached list with pyatv ``App`` objects (or compatible records)."""
+
+        records = [{"name": app.name, "identifier": app.identifier} for app in apps]
+        records.sort(key=lambda record: ((record["name"] or "").lower(), record["identifier"]))
+        entry = {
+            "build_number": build_number,
+            "fetched_at": round(time.time(), 3),
+            "apps": records,
+        }
+        self.devices[identifier] = entry
+        self.dirty = True
+        return AppList(apps=list(records), fetched_at=entry["fetched_at"])
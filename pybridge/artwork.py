@@ -0,0 +1,370 @@
+"""Content-addressed on-disk cache of now-playing artwork.
+
+Images are stored once per SHA-256 digest under a directory beside the
+storage file (``$HOME/.pyatv.artwork/`` by default), so every session and
+client shares them. The index maps an artwork identifier and requested size
+to a digest; a size that is not cached yet is resized locally from a larger
+cached variant when Pillow is installed, and only otherwise fetched from the
+device; artwork without an identifier is keyed by its digest. The least
+recently used images are evicted once the cache exceeds its byte budget.
+Sessions merge their changes into the index on disk under a file lock, so
+concurrent sessions keep each other's entries and share one budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .storage import BridgeState, read_state, state_path, write_state
+
+try:  # pragma: no cover - not available on Windows
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - depends on the environment
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None  # type: ignore[assignment]
+
+# Values of ``cache`` in an artwork response.
+HIT = "hit"
+RESIZED = "resized"
+MISS = "miss"
+
+_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png"}
+
+
+@dataclass
+class ArtworkEntry:
+    """One cached image."""
+
+    digest: str
+    path: Path
+    mimetype: str
+    width: int
+    height: int
+    size: int
+
+    def payload(self) -> Dict[str, Any]:
+        return {
+            "digest": self.digest,
+            "path": str(self.path),
+            "mimetype": self.mimetype,
+            "width": self.width,
+            "height": self.height,
+            "size": self.size,
+        }
+
+
+class ArtworkCache(BridgeState):
+    """Artwork images keyed by content, with size-based LRU eviction."""
+
+    STATE_NAME = "artwork"
+
+    def __init__(
+        self, max_bytes: int, path: Path, data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        super().__init__(path)
+        data = data or {}
+        self.directory = path.parent
+        self.max_bytes = max_bytes
+        # "<artwork id>@<width>x<height>" -> digest
+        self.keys: Dict[str, str] = dict(data.get("keys", {}))
+        # digest -> size, mimetype, width, height and last use (epoch seconds)
+        self.blobs: Dict[str, Dict[str, Any]] = dict(data.get("blobs", {}))
+        self.hits = 0
+        self.resized = 0
+        self.misses = 0
+        self.evictions = 0
+        # Digests evicted since the last save; they must not come back from the disk index.
+        self._evicted: Set[str] = set()
+        self._clock = max((blob.get("used", 0) for blob in self.blobs.values()), default=0.0)
+
+    @classmethod
+    def state_file(cls, storage_path: Optional[str]) -> Path:
+        # The index lives in the image directory, named like a state file without ".json".
+        return state_path(storage_path, cls.STATE_NAME).with_suffix("") / "index.json"
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"keys": self.keys, "blobs": self.blobs}
+
+    async def save(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Merge this session's changes into the index on disk and adopt the result."""
+
+        if self.path is None or not self.dirty:
+            return
+
+        state = {"keys": dict(self.keys), "blobs": {d: dict(b) for d, b in self.blobs.items()}}
+        try:
+            merged, evicted = await loop.run_in_executor(
+                None, _merge_index, self.path, state, set(self._evicted), self.max_bytes
+            )
+        except OSError:
+            pass
+        else:
+            self.keys, self.blobs = merged["keys"], merged["blobs"]
+            self.evictions += evicted
+            self._evicted.clear()
+        self.dirty = False
+
+    def lookup(
+        self, artwork_id: str, width: Optional[int], height: Optional[int]
+    ) -> Optional[ArtworkEntry]:
+        """Return the cached image for this size, counting a hit."""
+
+        entry = self._entry(self.keys.get(_key(artwork_id, width, height)))
+        if entry is not None:
+            self.hits += 1
+            self._touch(entry.digest)
+        return entry
+
+    async def resize(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        artwork_id: str,
+        width: Optional[int],
+        height: Optional[int],
+    ) -> Optional[ArtworkEntry]:
+        """Derive this size from a larger cached variant, when Pillow is available."""
+
+        if Image is None or (width is None and height is None):
+            return None
+
+        source = self._largest_variant(artwork_id, width, height)
+        if source is None:
+            return None
+
+        try:
+            resized = await loop.run_in_executor(None, _resize, source.path, width, height)
+        except (OSError, ValueError):  # pragma: no cover - unreadable or foreign image
+            return None
+
+        entry = await self._store(loop, artwork_id, width, height, *resized)
+        if entry is not None:
+            self.resized += 1
+        return entry
+
+    async def store(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        artwork_id: Optional[str],
+        width: Optional[int],
+        height: Optional[int],
+        data: bytes,
+        mimetype: str,
+        image_width: int,
+        image_height: int,
+    ) -> Optional[ArtworkEntry]:
+        """Add an image fetched from the device, counting a miss.
+
+        Without *artwork_id* the image is keyed by its digest, so it can only
+        be found again by content.
+        """
+
+        self.misses += 1
+        return await self._store(
+            loop, artwork_id, width, height, data, mimetype, image_width, image_height
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.resized + self.misses
+        return {
+            "hits": self.hits,
+            "resized": self.resized,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.resized) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "entries": len(self.blobs),
+            "bytes": self._total_bytes(),
+            "max_bytes": self.max_bytes,
+        }
+
+    async def _store(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        artwork_id: Optional[str],
+        width: Optional[int],
+        height: Optional[int],
+        data: bytes,
+        mimetype: str,
+        image_width: int,
+        image_height: int,
+    ) -> Optional[ArtworkEntry]:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.directory / (digest + _EXTENSIONS.get(mimetype, ".img"))
+        if digest not in self.blobs:
+            try:
+                await loop.run_in_executor(None, _write_blob, path, data)
+            except OSError:
+                return None
+            self.blobs[digest] = {
+                "file": path.name,
+                "size": len(data),
+                "mimetype": mimetype,
+                "width": image_width,
+                "height": image_height,
+            }
+
+        self.keys[_key(artwork_id or digest, width, height)] = digest
+        self._touch(digest)
+        await self._evict(loop, keep=digest)
+        return self._entry(digest)
+
+    async def _evict(self, loop: asyncio.AbstractEventLoop, keep: str) -> None:
+        """Remove least recently used images until the cache fits its budget."""
+
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for digest, blob in sorted(self.blobs.items(), key=lambda item: item[1].get("used", 0)):
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            victims.append(self.directory / blob["file"])
+            total -= blob["size"]
+            del self.blobs[digest]
+            self._evicted.add(digest)
+            self.evictions += 1
+
+        kept = set(self.blobs)
+        self.keys = {key: digest for key, digest in self.keys.items() if digest in kept}
+        await loop.run_in_executor(None, _remove_files, victims)
+
+    def _largest_variant(
+        self, artwork_id: str, width: Optional[int], height: Optional[int]
+    ) -> Optional[ArtworkEntry]:
+        prefix = artwork_id + "@"
+        best: Optional[ArtworkEntry] = None
+        for key, digest in self.keys.items():
+            if not key.startswith(prefix):
+                continue
+            entry = self._entry(digest)
+            if entry is None:
+                continue
+            if (width and entry.width < width) or (height and entry.height < height):
+                continue
+            if best is None or entry.width * entry.height > best.width * best.height:
+                best = entry
+        return best
+
+    def _entry(self, digest: Optional[str]) -> Optional[ArtworkEntry]:
+        blob = self.blobs.get(digest) if digest else None
+        if blob is None:
+            return None
+        path = self.directory / blob["file"]
+        if not path.exists():
+            # Removed behind our back; forget it so the image is fetched again.
+            del self.blobs[digest]
+            self._evicted.add(digest)
+            self.dirty = True
+            return None
+        return ArtworkEntry(
+            digest=digest,
+            path=path,
+            mimetype=blob["mimetype"],
+            width=blob["width"],
+            height=blob["height"],
+            size=blob["size"],
+        )
+
+    def _touch(self, digest: str) -> None:
+        # Strictly increasing, so uses within one clock tick keep their order.
+        self._clock = max(time.time(), self._clock + 1e-6)
+        self.blobs[digest]["used"] = self._clock
+        self.dirty = True
+
+    def _total_bytes(self) -> int:
+        return sum(blob["size"] for blob in self.blobs.values())
+
+
+def _key(artwork_id: str, width: Optional[int], height: Optional[int]) -> str:
+    return f"{artwork_id}@{width or 0}x{height or 0}"
+
+
+def _merge_index(
+    path: Path, state: Dict[str, Any], evicted: Set[str], max_bytes: int
+) -> Tuple[Dict[str, Any], int]:
+    """Merge *state* into the index at *path* and write it, holding the index lock.
+
+    Entries other sessions added are kept, the latest use of each image wins
+    and images evicted by this session stay evicted. Images beyond
+    *max_bytes* are then evicted, least recently used first. Returns the
+    merged index and how many images that removed.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a", encoding="utf-8") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # released when the file is closed
+
+        disk = read_state(path)
+        blobs: Dict[str, Dict[str, Any]] = {
+            digest: blob
+            for digest, blob in dict(disk.get("blobs", {})).items()
+            if digest not in evicted
+        }
+        for digest, blob in state["blobs"].items():
+            known = blobs.get(digest)
+            if known is None or blob.get("used", 0) >= known.get("used", 0):
+                blobs[digest] = blob
+
+        victims: List[Path] = []
+        total = sum(blob["size"] for blob in blobs.values())
+        for digest, blob in sorted(blobs.items(), key=lambda item: item[1].get("used", 0)):
+            if total <= max_bytes:
+                break
+            victims.append(path.parent / blob["file"])
+            total -= blob["size"]
+            del blobs[digest]
+
+        keys = dict(disk.get("keys", {}))
+        keys.update(state["keys"])
+        merged = {
+            "keys": {key: digest for key, digest in keys.items() if digest in blobs},
+            "blobs": blobs,
+        }
+        write_state(path, merged)
+        _remove_files(victims)
+    return merged, len(victims)
+
+
+def _write_blob(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def _remove_files(paths: Any) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _resize(
+    path: Path, width: Optional[int], height: Optional[int]
+) -> Tuple[bytes, str, int, int]:  # pragma: no cover - requires Pillow
+    with Image.open(path) as image:
+        image.thumbnail((width or image.width, height or image.height))
+        output = io.BytesIO()
+        if image.mode in ("RGB", "L"):
+            image.save(output, format="JPEG", quality=90)
+            mimetype = "image/jpeg"
+        else:
+            image.save(output, format="PNG")
+            mimetype = "image/png"
+        return output.getvalue(), mimetype, image.width, image.height
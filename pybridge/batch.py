@@ -0,0 +1,294 @@
+"""NDJSON batch runner for mixed operations across many devices."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Dict, List, Optional, Set, Union
+
+from pyatv.interface import AppleTV, BaseConfig, Storage
+
+from .constants import DEFAULT_FLEET_CONCURRENCY, DEFAULT_TIMEOUT
+from .control import PYATV_ERROR, ControlError, _connect_device
+from .device_lookup import select_config
+from .discovery import DiscoveryOptions, scan_configs
+from .fleet import CommandOperation, Emitter, FleetOperation, FleetSummary, PowerOperation
+from .mock import mock_configs
+from .pairing import PairingError, _clear_credentials, _parse_protocol
+from .storage import StorageError, load_storage
+
+BATCH_OPERATIONS = ("command", "power", "status", "unpair")
+
+
+@dataclass
+class BatchOptions:
+    """Options for running a batch of operations."""
+
+    concurrency: int = DEFAULT_FLEET_CONCURRENCY
+    timeout: float = DEFAULT_TIMEOUT
+    storage_path: Optional[str] = None
+    use_storage: bool = True
+    mock: bool = False
+
+
+@dataclass
+class BatchItem:
+    """One parsed input line."""
+
+    line: int
+    op: str
+    identifier: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+    def result(self, status: str, **fields: Any) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"status": status, "op": self.op, "line": self.line}
+        if "id" in self.payload:
+            result["id"] = self.payload["id"]
+        result.update(fields)
+        return result
+
+
+def parse_line(number: int, raw: str) -> Union[BatchItem, Dict[str, Any], None]:
+    """Parse input line *number*: an item, an error payload, or ``None`` when blank."""
+
+    message = raw.strip()
+    if not message:
+        return None
+
+    try:
+        payload = json.loads(message)
+    except json.JSONDecodeError:
+        return {"status": "error", "line": number, "error": "invalid json"}
+
+    if not isinstance(payload, dict):
+        return {"status": "error", "line": number, "error": "expected an object"}
+
+    op = payload.get("op")
+    identifier = payload.get("identifier")
+    if op not in BATCH_OPERATIONS:
+        return {"status": "error", "line": number, "error": f"unknown op: {op}"}
+    if not identifier:
+        return {"status": "error", "line": number, "error": "missing identifier"}
+
+    return BatchItem(line=number, op=op, identifier=str(identifier), payload=payload)
+
+
+async def run_batch(
+    options: BatchOptions, lines: AsyncIterable[str], emit: Emitter
+) -> FleetSummary:
+    """Run every operation in *lines* as it arrives.
+
+    Targets are resolved from a single discovery pass, made when the first
+    operation is read. Each device has one worker running its operations in
+    input order over a reused connection, which is replaced (and the
+    operation retried once) when an operation on it fails; devices run
+    concurrently. At most ``concurrency`` connections are open at once, so a
+    device needing one closes the least recently used idle connection.
+    Results, including per-operation errors, are passed to *emit* as they
+    complete.
+    """
+
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+    limit = max(1, options.concurrency)
+
+    succeeded = 0
+    failed = 0
+    unpaired = False
+    storage: Optional[Storage] = None
+    configs: Optional[List[Any]] = mock_configs() if options.mock else None
+    queues: Dict[str, "asyncio.Queue[Optional[BatchItem]]"] = {}
+    workers: List["asyncio.Future[None]"] = []
+    # Open connections, least recently used first, and the devices using theirs.
+    connections: Dict[str, AppleTV] = {}
+    busy: Set[str] = set()
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _discover() -> List[Any]:
+        nonlocal storage
+        if options.use_storage:
+            storage = await load_storage(loop, options.storage_path)
+
+        return await scan_configs(
+            DiscoveryOptions(
+                timeout=options.timeout,
+                protocol=None,
+                identifier=None,
+                storage_path=options.storage_path,
+                use_storage=options.use_storage,
+            ),
+            storage=storage,
+        )
+
+    async def _connection(config: BaseConfig) -> AppleTV:
+        atv = connections.pop(config.identifier, None)
+        if atv is None:
+            for identifier in list(connections):
+                if len(connections) < limit:
+                    break
+                if identifier not in busy:
+                    connections.pop(identifier).close()
+            atv = await _connect_device(config, loop, storage)
+        connections[config.identifier] = atv
+        return atv
+
+    async def _run_operation(config: BaseConfig, operation: FleetOperation) -> Dict[str, Any]:
+        reused = config.identifier in connections
+        atv = await _connection(config)
+        try:
+            return await operation.run(atv)
+        except (ControlError, PYATV_ERROR, OSError):
+            # Never hand out a connection that failed; one kept from an earlier
+            # operation may have been lost since, so that case gets one retry.
+            if connections.get(config.identifier) is atv:
+                del connections[config.identifier]
+            atv.close()
+            if not reused:
+                raise
+        return await operation.run(await _connection(config))
+
+    async def _run_item(config: BaseConfig, item: BatchItem) -> None:
+        nonlocal succeeded, failed, unpaired
+        item_started = time.monotonic()
+        try:
+            if options.mock:
+                fields = _mock_fields(item)
+            elif item.op == "unpair":
+                fields = await _unpair(config, item, storage)
+                unpaired = unpaired or fields["credentials_removed"]
+            else:
+                operation = _operation(item)
+                fields = dict(operation.fields)
+                fields.update(await _run_operation(config, operation))
+        except (ControlError, PairingError, StorageError, PYATV_ERROR, OSError) as exc:
+            failed += 1
+            emit(
+                item.result(
+                    "error",
+                    identifier=config.identifier,
+                    error=str(exc),
+                    elapsed=_since(item_started),
+                )
+            )
+            return
+
+        succeeded += 1
+        emit(
+            item.result(
+                "ok", identifier=config.identifier, elapsed=_since(item_started), **fields
+            )
+        )
+
+    async def _run_device(
+        config: BaseConfig, queue: "asyncio.Queue[Optional[BatchItem]]"
+    ) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            async with semaphore:
+                busy.add(config.identifier)
+                try:
+                    await _run_item(config, item)
+                finally:
+                    busy.discard(config.identifier)
+
+    try:
+        number = 0
+        async for raw in lines:
+            number += 1
+            parsed = parse_line(number, raw)
+            if parsed is None:
+                continue
+            if not isinstance(parsed, BatchItem):
+                failed += 1
+                emit(parsed)
+                continue
+
+            if configs is None:
+                configs = await _discover()
+            config = select_config(configs, parsed.identifier)
+            if config is None:
+                failed += 1
+                emit(parsed.result("error", identifier=parsed.identifier, error="device not found"))
+                continue
+
+            queue = queues.get(config.identifier)
+            if queue is None:
+                queue = queues[config.identifier] = asyncio.Queue()
+                workers.append(asyncio.ensure_future(_run_device(config, queue)))
+            queue.put_nowait(parsed)
+
+        for queue in queues.values():
+            queue.put_nowait(None)
+        await asyncio.gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for atv in connections.values():
+            atv.close()
+
+    if unpaired and storage is not None:
+        await storage.save()
+
+    return FleetSummary(
+        status="complete",
+        succeeded=succeeded,
+        failed=failed,
+        elapsed=_since(started),
+    )
+
+
+def _operation(item: BatchItem) -> FleetOperation:
+    if item.op == "command":
+        command = item.payload.get("command")
+        if not command:
+            raise ControlError("missing command")
+        return CommandOperation(str(command), str(item.payload.get("action", "SingleTap")))
+
+    if item.op == "power":
+        action = item.payload.get("action")
+        if not action:
+            raise ControlError("missing action")
+        return PowerOperation(str(action))
+
+    return PowerOperation("status")
+
+
+async def _unpair(
+    config: BaseConfig, item: BatchItem, storage: Optional[Storage]
+) -> Dict[str, Any]:
+    if storage is None:
+        raise PairingError("storage is required to unpair")
+
+    protocol_name = item.payload.get("protocol")
+    if not protocol_name:
+        raise PairingError("missing protocol")
+
+    protocol = _parse_protocol(str(protocol_name))
+    settings = await storage.get_settings(config)
+    return {
+        "protocol": protocol.name,
+        "credentials_removed": _clear_credentials(settings, protocol),
+    }
+
+
+def _mock_fields(item: BatchItem) -> Dict[str, Any]:
+    if item.op == "command":
+        return {
+            "command": str(item.payload.get("command", "")).lower(),
+            "action": str(item.payload.get("action", "SingleTap")),
+            "mock": True,
+        }
+    if item.op == "power":
+        return {"power": str(item.payload.get("action", "")).lower(), "mock": True}
+    if item.op == "unpair":
+        return {"protocol": item.payload.get("protocol"), "credentials_removed": True, "mock": True}
+    return {"power_state": "On", "mock": True}
+
+
+def _since(started: float) -> float:
+    return round(time.monotonic() - started, 4)
@@ -0,0 +1,156 @@
+"""Per-device circuit breakers for unreachable devices.
+
+After ``threshold`` consecutive failures to find or connect to a device its
+breaker opens and requests fail fast with an ``unavailable`` status instead
+of paying for another scan and connect timeout. Once the cooldown has passed
+the next request is let through as a half-open probe: success closes the
+breaker, failure reopens it with a doubled cooldown. A scan that sees the
+device makes it due for a probe straight away.
+
+State is persisted beside the storage file (``state_path(..., "breaker")``)
+so one-shot invocations share it.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+from .constants import DEFAULT_BREAKER_COOLDOWN
+from .storage import BridgeState
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pyatv.interface import BaseConfig
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# Upper bound, in seconds, of the doubled cooldown of a breaker that keeps failing.
+MAX_BREAKER_COOLDOWN = 600.0
+
+
+class BreakerOpen(Exception):
+    """Raised instead of contacting a device whose breaker is open."""
+
+    def __init__(self, key: str, entry: Dict[str, Any], retry_after: float) -> None:
+        super().__init__(f"device unavailable: {key} (retry in {retry_after:g}s)")
+        self.key = key
+        self.entry = entry
+        self.retry_after = retry_after
+
+    def payload(self) -> Dict[str, Any]:
+        return {
+            "status": "unavailable",
+            "identifier": self.key,
+            "error": "device unavailable",
+            "failures": self.entry.get("failures", 0),
+            "last_error": self.entry.get("last_error"),
+            "retry_after": self.retry_after,
+        }
+
+
+@dataclass
+class BreakerPolicy:
+    """When breakers open and how long they stay open."""
+
+    threshold: int
+    cooldown: float = DEFAULT_BREAKER_COOLDOWN
+
+
+class CircuitBreakers(BridgeState):
+    """Breaker state of every device addressed through the bridge."""
+
+    STATE_NAME = "breaker"
+
+    def __init__(
+        self,
+        policy: BreakerPolicy,
+        path: Optional[Path] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        super().__init__(path)
+        self.policy = policy
+        self.devices: Dict[str, Dict[str, Any]] = dict((data or {}).get("devices", {}))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"devices": self.devices}
+
+    def check(self, selector: str) -> bool:
+        """Raise ``BreakerOpen`` unless a request to *selector* may proceed.
+
+        A due open breaker turns half-open and lets this request through as
+        the probe (returning True, so the caller can persist the change);
+        concurrent requests keep failing fast until the probe has had a
+        cooldown to finish.
+        """
+
+        key = _key(selector)
+        entry = self.devices.get(key)
+        if entry is None or entry["state"] == CLOSED:
+            return False
+
+        now = time.time()
+        if now < entry["retry_at"]:
+            raise BreakerOpen(key, entry, round(entry["retry_at"] - now, 3))
+
+        entry["state"] = HALF_OPEN
+        entry["retry_at"] = now + entry["cooldown"]
+        self.dirty = True
+        return True
+
+    def record_success(self, selector: str) -> bool:
+        """Close the breaker of *selector*; returns True when it was tracked."""
+
+        tracked = self.devices.pop(_key(selector), None) is not None
+        self.dirty = self.dirty or tracked
+        return tracked
+
+    def record_failure(self, selector: str, error: str) -> None:
+        key = _key(selector)
+        entry = self.devices.setdefault(
+            key, {"state": CLOSED, "failures": 0, "cooldown": self.policy.cooldown}
+        )
+        entry["failures"] += 1
+        entry["last_error"] = error
+        self.dirty = True
+
+        if entry["state"] == HALF_OPEN:
+            entry["cooldown"] = min(MAX_BREAKER_COOLDOWN, entry["cooldown"] * 2)
+        elif entry["failures"] < self.policy.threshold:
+            return
+
+        entry["state"] = OPEN
+        entry["opened_at"] = time.time()
+        entry["retry_at"] = entry["opened_at"] + entry["cooldown"]
+
+    def observe(self, configs: Iterable[BaseConfig]) -> bool:
+        """Make open breakers of devices seen by a scan due for a probe.
+
+        Returns True when any breaker changed.
+        """
+
+        if not self.devices:
+            return False
+
+        seen = set()
+        for config in configs:
+            seen.update(_key(value) for value in config.all_identifiers if value)
+            seen.add(_key(str(config.address)))
+            name = getattr(config, "name", None)
+            if name:
+                seen.add(_key(name))
+
+        now = time.time()
+        changed = False
+        for key, entry in self.devices.items():
+            if key in seen and entry["state"] == OPEN and entry["retry_at"] > now:
+                entry["retry_at"] = now
+                changed = True
+        self.dirty = self.dirty or changed
+        return changed
+
+
+def _key(selector: str) -> str:
+    return selector.lower()
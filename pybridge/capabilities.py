@@ -0,0 +1,89 @@
+"""Per-device cache of which command paths work.
+
+Some devices reject ``remote.play_pause()`` and need the metadata-driven
+play/pause fallback; trying the toggle first costs them an exception and an
+extra round trip on every press. The path that worked is remembered per main
+identifier and trusted until the firmware ``build_number`` changes or the
+entry is older than ``REVALIDATE_AFTER``, whichever comes first.
+
+The cache is persisted beside the storage file (``state_path(..., "capabilities")``).
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .storage import BridgeState
+
+PLAY_PAUSE = "play_pause"
+# Values of the ``play_pause`` capability.
+TOGGLE = "toggle"
+FALLBACK = "fallback"
+# Seconds after which a cached path is tried afresh even without a firmware change.
+REVALIDATE_AFTER = 7 * 24 * 3600.0
+
+
+class CapabilityCache(BridgeState):
+    """Capabilities of every device the bridge has controlled."""
+
+    STATE_NAME = "capabilities"
+
+    def __init__(self, path: Optional[Path] = None, data: Optional[Dict[str, Any]] = None):
+        super().__init__(path)
+        self.devices: Dict[str, Dict[str, Any]] = dict((data or {}).get("devices", {}))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"devices": self.devices}
+
+    def for_device(self, identifier: str, build_number: Optional[str]) -> "DeviceCapabilities":
+        return DeviceCapabilities(self, identifier, build_number)
+
+
+class DeviceCapabilities:
+    """View of one device's entry, bound to the firmware build it runs now."""
+
+    def __init__(
+        self, cache: CapabilityCache, identifier: str, build_number: Optional[str]
+    ) -> None:
+        self._cache = cache
+        self.identifier = identifier
+        self.build_number = build_number
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the cached value of *name*, or ``None`` when it must be revalidated."""
+
+        entry = self._entry()
+        if entry is None:
+            return None
+        capability = entry["capabilities"].get(name)
+        if capability is None or time.time() - capability["checked_at"] > REVALIDATE_AFTER:
+            return None
+        return capability["value"]
+
+    def record(self, name: str, value: str) -> None:
+        """Remember that the *value* path of *name* worked (or was the one to use)."""
+
+        entry = self._entry()
+        if entry is None:
+            # First sighting, or new firmware: start over.
+            entry = {"build_number": self.build_number, "capabilities": {}}
+            self._cache.devices[self.identifier] = entry
+
+        current = entry["capabilities"].get(name)
+        if current is not None and current["value"] == value and self.get(name) is not None:
+            return
+        entry["capabilities"][name] = {"value": value, "checked_at": round(time.time(), 3)}
+        self._cache.dirty = True
+
+    def forget(self, name: str) -> None:
+        entry = self._entry()
+        if entry is not None and entry["capabilities"].pop(name, None) is not None:
+            self._cache.dirty = True
+
+    def _entry(self) -> Optional[Dict[str, Any]]:
+        entry = self._cache.devices.get(self.identifier)
+        if entry is None or entry.get("build_number") != self.build_number:
+            return None
+        return entry
@@ -0,0 +1,161 @@
+"""Message framing for the persistent ``session`` channel.
+
+Sessions start with newline-delimited JSON. A client may switch to
+length-prefixed binary frames (a 4-byte big-endian length followed by a
+MessagePack or CBOR body) by sending ``{"type": "framing", "framing": ...}``;
+the acknowledgement is the last message written in the old framing. Binary
+codecs are optional dependencies and only offered when installed.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .output import dumps, loads
+from .tracing import span
+
+try:  # pragma: no cover - depends on the environment
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - depends on the environment
+    import cbor2
+except ImportError:  # pragma: no cover - depends on the environment
+    cbor2 = None  # type: ignore[assignment]
+
+JSON_FRAMING = "json"
+FRAME_HEADER = struct.Struct(">I")
+# Frames larger than this are rejected; the channel cannot resynchronise after one.
+MAX_FRAME_SIZE = 1 << 20
+
+Codec = Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+
+_BINARY_CODECS: Dict[str, Codec] = {}
+if msgpack is not None:  # pragma: no branch
+    _BINARY_CODECS["msgpack"] = (msgpack.packb, msgpack.unpackb)
+if cbor2 is not None:  # pragma: no branch
+    _BINARY_CODECS["cbor"] = (cbor2.dumps, cbor2.loads)
+
+
+class ChannelError(Exception):
+    """Raised for a request that cannot be decoded.
+
+    ``fatal`` errors leave the input out of sync and end the session.
+    """
+
+    def __init__(self, message: str, fatal: bool = False) -> None:
+        super().__init__(message)
+        self.fatal = fatal
+
+
+def available_framings() -> List[str]:
+    """Return the framings this process can speak, JSON first."""
+
+    return [JSON_FRAMING, *_BINARY_CODECS]
+
+
+def encode_frame(payload: Dict[str, Any], framing: str) -> bytes:
+    """Encode *payload* as one complete frame, including its delimiter or header."""
+
+    if framing == JSON_FRAMING:
+        return dumps(payload).encode("utf-8") + b"\n"
+    body = _BINARY_CODECS[framing][0](payload)
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def decode_frame(body: bytes, framing: str) -> Dict[str, Any]:
+    """Decode a frame body (without delimiter or header) into a request object."""
+
+    try:
+        if framing == JSON_FRAMING:
+            payload = loads(body)
+        else:
+            payload = _BINARY_CODECS[framing][1](body)
+    except Exception as exc:  # codec-specific decode errors
+        message = "invalid json" if framing == JSON_FRAMING else "invalid frame"
+        raise ChannelError(message) from exc
+
+    if not isinstance(payload, dict):
+        raise ChannelError("expected an object")
+    return payload
+
+
+class SessionChannel:
+    """Reads requests from stdin and writes responses to stdout in the active framing.
+
+    Streams are looked up on every call so redirected ``sys.stdin`` and
+    ``sys.stdout`` are honoured.
+    """
+
+    def __init__(self) -> None:
+        self.framing = JSON_FRAMING
+
+    def validate(self, framing: str) -> None:
+        """Raise ``ChannelError`` unless the channel can switch to *framing*."""
+
+        if framing not in available_framings():
+            raise ChannelError(f"unsupported framing: {framing}")
+        if framing != JSON_FRAMING and not hasattr(sys.stdin, "buffer"):
+            raise ChannelError("binary framing requires a byte stream")
+
+    def select(self, framing: str) -> None:
+        """Switch framing for every following read and write."""
+
+        self.validate(framing)
+        self.framing = framing
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Block until the next request arrives; ``None`` once input is closed."""
+
+        if self.framing == JSON_FRAMING:
+            return self._read_line()
+        return self._read_binary()
+
+    def send(self, payload: Dict[str, Any]) -> None:
+        """Write one response."""
+
+        if self.framing == JSON_FRAMING:
+            with span("serialize", framing=self.framing):
+                line = dumps(payload) + "\n"
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            return
+
+        with span("serialize", framing=self.framing):
+            frame = encode_frame(payload, self.framing)
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+        out.write(frame)
+        out.flush()
+
+    def _read_line(self) -> Optional[Dict[str, Any]]:
+        # Read through the byte buffer when there is one so nothing is left in a
+        # text read-ahead buffer if the client switches to binary framing.
+        stream = getattr(sys.stdin, "buffer", sys.stdin)
+        while True:
+            line = stream.readline()
+            if not line:
+                return None
+            message = line.strip()
+            if message:
+                return decode_frame(message, JSON_FRAMING)
+
+    def _read_binary(self) -> Optional[Dict[str, Any]]:
+        stream = sys.stdin.buffer
+        header = stream.read(FRAME_HEADER.size)
+        if not header:
+            return None
+        if len(header) < FRAME_HEADER.size:
+            raise ChannelError("truncated frame", fatal=True)
+
+        (length,) = FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise ChannelError("frame too large", fatal=True)
+
+        body = stream.read(length)
+        if len(body) < length:
+            raise ChannelError("truncated frame", fatal=True)
+        return decode_frame(body, self.framing)
@@ -4,41 +4,50 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
+import contextlib
+import os
 import sys
 from dataclasses import asdict, is_dataclass
-from typing import Any, Callable, Coroutine, List, Optional
-
-from pyatv import exceptions as pyatv_exceptions
-from pyatv.const import Protocol
-PYATV_ERROR = getattr(
-    pyatv_exceptions,
-    "PyatvError",
-    getattr(pyatv_exceptions, "PyATVError", Exception),
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    Iterator,
+    List,
+    Optional,
 )
 
-from . import discovery
-from .control import (
-    CommandOptions,
-    ControlError,
-    PowerOptions,
-    SessionOptions,
-    execute_command,
-    execute_power,
-    run_command_session,
+from .breaker import BreakerOpen, BreakerPolicy
+from .constants import (
+    DEFAULT_ARTWORK_CACHE_MB,
+    DEFAULT_BREAKER_COOLDOWN,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_BULK_CONCURRENCY,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_FLEET_CONCURRENCY,
+    DEFAULT_HEARTBEAT_TIMEOUT,
+    DEFAULT_PAIRING_HANDLE_TIMEOUT,
+    DEFAULT_POWER_CONFIDENCE,
+    DEFAULT_TIMEOUT,
+    DEFAULT_VERIFY_CONCURRENCY,
+    DEFAULT_WAKE_TIMEOUT,
+    POWER_STATUS_SOURCES,
+    PROTOCOL_NAMES,
+    SCAN_FIELDS,
 )
-from .pairing import (
-    DEFAULT_PIN,
-    PairingError,
-    PairingOptions,
-    PairingResult,
-    PinRequiredResult,
-    UnpairOptions,
-    create_pairing_session,
-    pair_device,
-    unpair_device,
-)
-from .storage import StorageError, clear_storage
+from .deadline import DeadlineExceeded, deadline
+from .output import emit, parse_fields, project
+from .storage import StorageError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .device_lookup import DeviceSelector
+    from .fleet import FleetOperation
+    from .pairing import PairingOptions
+
+# Subcommand handlers import their helper modules (and with them pyatv) lazily,
+# so argument parsing, --mock runs and clear-storage start without loading pyatv.
 
 CommandHandler = Callable[[argparse.Namespace], Coroutine[Any, Any, int]]
 
@@ -57,6 +66,12 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Use deterministic mock responses instead of contacting devices.",
     )
+    parser.add_argument(
+        "--simulate",
+        metavar="SPEC",
+        help="Run against a simulated fleet instead of real devices: a device count "
+        "or the path of a JSON simulation profile.",
+    )
     parser.add_argument(
         "--storage",
         metavar="PATH",
@@ -67,25 +82,86 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Disable storage loading even if a default is available.",
     )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Cancel the command (for session: each request) after SECONDS and "
+        "report a timeout status. Session messages may override it with a "
+        "\"deadline\" field.",
+    )
+    parser.add_argument(
+        "--breaker",
+        type=int,
+        nargs="?",
+        const=DEFAULT_BREAKER_THRESHOLD,
+        metavar="FAILURES",
+        help="Fail fast with an unavailable status once a device has failed FAILURES "
+        f"times in a row (default: {DEFAULT_BREAKER_THRESHOLD}) until its cooldown passes.",
+    )
+    parser.add_argument(
+        "--breaker-cooldown",
+        type=float,
+        default=DEFAULT_BREAKER_COOLDOWN,
+        metavar="SECONDS",
+        help="Seconds an open breaker fails fast before the next request may probe the "
+        f"device; doubled after each failed probe (default: {DEFAULT_BREAKER_COOLDOWN:g}).",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Profile the command with cProfile and write pstats output to PATH.",
+    )
+    parser.add_argument(
+        "--trace-events",
+        dest="trace_events",
+        metavar="PATH",
+        help="Write spans of the main phases (storage load, scan, select, connect, "
+        "remote call, serialize) to PATH as Chrome trace-event JSON.",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     scan_parser = subparsers.add_parser("scan", help="Discover Apple TV devices")
     scan_parser.add_argument(
         "--timeout",
-        type=float,
-        default=5.0,
-        help="Scan timeout in seconds (default: 5).",
+        type=_parse_timeout,
+        default=DEFAULT_TIMEOUT,
+        help="Scan timeout in seconds, fractions allowed, or 'auto' for the "
+        "timeout learned from previous scans (default: 5).",
     )
     scan_parser.add_argument(
         "--protocol",
-        choices=[name for name in Protocol.__members__.keys()],
+        choices=PROTOCOL_NAMES,
         help="Filter scan to a specific protocol.",
     )
     scan_parser.add_argument(
         "--identifier",
         help="Only return a device matching a specific identifier.",
     )
+    scan_parser.add_argument(
+        "--path",
+        dest="paths",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Scan path: 'multicast', an interface name, a CIDR range or comma "
+        "separated addresses. Repeat to scan several paths concurrently; results "
+        "are merged keeping the lowest unicast latency per device (multicast "
+        "answers carry no latency).",
+    )
+    scan_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Include recorded discovery arrival times and the adaptive timeout.",
+    )
+    scan_parser.add_argument(
+        "--fields",
+        type=_parse_scan_fields,
+        metavar="FIELDS",
+        help="Comma-separated device fields to return "
+        f"({', '.join(SCAN_FIELDS)}). Omitted fields are never built.",
+    )
     scan_parser.set_defaults(handler=_handle_scan)
 
     pair_parser = subparsers.add_parser("pair", help="Pair a device")
@@ -97,7 +173,7 @@ def build_parser() -> argparse.ArgumentParser:
     pair_parser.add_argument(
         "--protocol",
         required=True,
-        choices=[name for name in Protocol.__members__.keys()],
+        choices=PROTOCOL_NAMES,
         help="Protocol to pair (e.g. Companion, AirPlay).",
     )
     pair_parser.add_argument(
@@ -116,6 +192,57 @@ def build_parser() -> argparse.ArgumentParser:
     )
     pair_parser.set_defaults(handler=_handle_pair)
 
+    bulk_parser = subparsers.add_parser(
+        "pair-bulk",
+        help="Pair several devices and protocols concurrently from one scan",
+    )
+    bulk_target = bulk_parser.add_mutually_exclusive_group(required=True)
+    bulk_target.add_argument(
+        "--identifier",
+        dest="identifiers",
+        action="append",
+        help="Identifier (id/name/address) of a device to pair; repeat for more devices.",
+    )
+    bulk_target.add_argument(
+        "--all",
+        dest="all_devices",
+        action="store_true",
+        help="Pair every discovered device.",
+    )
+    bulk_parser.add_argument(
+        "--protocol",
+        dest="protocols",
+        action="append",
+        required=True,
+        choices=PROTOCOL_NAMES,
+        help="Protocol to pair; repeat for more protocols.",
+    )
+    bulk_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_BULK_CONCURRENCY,
+        help=f"Maximum pairing sessions in flight (default: {DEFAULT_BULK_CONCURRENCY}).",
+    )
+    bulk_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Scan timeout in seconds (default: 5).",
+    )
+    bulk_parser.add_argument(
+        "--display-name",
+        default="pyatv-bridge",
+        help="Friendly name presented during pairing.",
+    )
+    bulk_parser.add_argument(
+        "--pairing-timeout",
+        type=float,
+        default=DEFAULT_PAIRING_HANDLE_TIMEOUT,
+        help="Seconds a device waiting for its PIN is given before it fails "
+        f"(default: {DEFAULT_PAIRING_HANDLE_TIMEOUT:g}).",
+    )
+    bulk_parser.set_defaults(handler=_handle_pair_bulk)
+
     unpair_parser = subparsers.add_parser("unpair", help="Remove stored credentials for a device")
     unpair_parser.add_argument(
         "--identifier",
@@ -125,7 +252,7 @@ def build_parser() -> argparse.ArgumentParser:
     unpair_parser.add_argument(
         "--protocol",
         required=True,
-        choices=[name for name in Protocol.__members__.keys()],
+        choices=PROTOCOL_NAMES,
         help="Protocol to unpair (e.g. Companion, AirPlay).",
     )
     unpair_parser.set_defaults(handler=_handle_unpair)
@@ -133,11 +260,7 @@ def build_parser() -> argparse.ArgumentParser:
     command_parser = subparsers.add_parser(
         "command", help="Send a remote control command"
     )
-    command_parser.add_argument(
-        "--identifier",
-        required=True,
-        help="Identifier (id/name/address) of the device to control.",
-    )
+    _add_selector_arguments(command_parser)
     command_parser.add_argument(
         "--command",
         required=True,
@@ -151,19 +274,107 @@ def build_parser() -> argparse.ArgumentParser:
     command_parser.set_defaults(handler=_handle_command)
 
     power_parser = subparsers.add_parser("power", help="Send a power action")
-    power_parser.add_argument(
-        "--identifier",
-        required=True,
-        help="Identifier (id/name/address) of the device to control.",
-    )
+    _add_selector_arguments(power_parser)
     power_parser.add_argument(
         "--action",
         required=True,
         choices=["on", "off", "status"],
         help="Power action to perform.",
     )
+    power_parser.add_argument(
+        "--source",
+        choices=POWER_STATUS_SOURCES,
+        default="device",
+        help="Where a status comes from: 'device' connects for an authoritative answer, "
+        "'discovery' infers it from the scan without connecting, and 'auto' infers it "
+        "unless the confidence is below --min-confidence (default: device).",
+    )
+    power_parser.add_argument(
+        "--min-confidence",
+        type=float,
+        default=DEFAULT_POWER_CONFIDENCE,
+        help="Confidence an inferred status needs with --source auto "
+        f"(default: {DEFAULT_POWER_CONFIDENCE:g}).",
+    )
+    power_parser.add_argument(
+        "--wake",
+        action="store_true",
+        help="Power on through the wake fast path: find the device at its last known "
+        "address, connect only the protocol that wakes it, retry while it wakes and "
+        "report the time until it is confirmed on.",
+    )
+    power_parser.add_argument(
+        "--wake-timeout",
+        type=float,
+        default=DEFAULT_WAKE_TIMEOUT,
+        help=f"Seconds --wake keeps trying (default: {DEFAULT_WAKE_TIMEOUT:g}).",
+    )
     power_parser.set_defaults(handler=_handle_power)
 
+    group_parser = subparsers.add_parser(
+        "group",
+        help="Send a remote command to several devices at the same moment",
+    )
+    _add_selector_arguments(group_parser)
+    group_parser.add_argument(
+        "--command",
+        required=True,
+        help="Remote command (home/menu/select/play_pause/up/down/left/right).",
+    )
+    group_parser.add_argument(
+        "--action",
+        default="SingleTap",
+        help="Input action for directional/menu/home/select commands (SingleTap, DoubleTap, Hold).",
+    )
+    group_parser.set_defaults(handler=_handle_group)
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Run newline-delimited JSON operations across devices",
+    )
+    batch_parser.add_argument(
+        "--file",
+        metavar="PATH",
+        help="Read operations from a file instead of stdin.",
+    )
+    batch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_FLEET_CONCURRENCY,
+        help=f"Maximum devices handled at once (default: {DEFAULT_FLEET_CONCURRENCY}).",
+    )
+    batch_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Scan timeout in seconds (default: 5).",
+    )
+    batch_parser.set_defaults(handler=_handle_batch)
+
+    verify_parser = subparsers.add_parser(
+        "verify", help="Check every stored credential against its device"
+    )
+    verify_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_VERIFY_CONCURRENCY,
+        help=f"Maximum connections in flight (default: {DEFAULT_VERIFY_CONCURRENCY}).",
+    )
+    verify_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Scan timeout in seconds (default: 5).",
+    )
+    verify_parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=DEFAULT_CONNECT_TIMEOUT,
+        help="Seconds allowed per protocol connection "
+        f"(default: {DEFAULT_CONNECT_TIMEOUT:g}).",
+    )
+    verify_parser.set_defaults(handler=_handle_verify)
+
     clear_parser = subparsers.add_parser(
         "clear-storage", help="Remove stored pyatv credentials"
     )
@@ -178,34 +389,184 @@ def build_parser() -> argparse.ArgumentParser:
         required=True,
         help="Identifier (id/name/address) of the device to control.",
     )
-    session_parser.set_defaults(handler=_handle_session)
+    session_parser.add_argument(
+        "--pairing-timeout",
+        type=float,
+        default=DEFAULT_PAIRING_HANDLE_TIMEOUT,
+        help="Seconds a pair_begin handle waits for pair_pin before it is closed "
+        f"(default: {DEFAULT_PAIRING_HANDLE_TIMEOUT:g}).",
+    )
+    session_parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Write every request and response with timestamps to a trace file.",
+    )
+    session_parser.add_argument(
+        "--stall-threshold",
+        type=float,
+        metavar="SECONDS",
+        help="Watch the event loop and record stalls longer than SECONDS (with stack "
+        "snapshots); lag percentiles are reported by the stats message.",
+    )
+    session_parser.add_argument(
+        "--heartbeat",
+        type=float,
+        metavar="SECONDS",
+        help="Probe the connection after SECONDS of inactivity and reconnect when the "
+        "probe fails; health and RTT are reported by the health message.",
+    )
+    session_parser.add_argument(
+        "--heartbeat-timeout",
+        type=float,
+        default=DEFAULT_HEARTBEAT_TIMEOUT,
+        metavar="SECONDS",
+        help="Seconds a heartbeat probe may take before the connection is treated as "
+        f"dead (default: {DEFAULT_HEARTBEAT_TIMEOUT:g}).",
+    )
+    session_parser.add_argument(
+        "--artwork-cache",
+        type=float,
+        default=DEFAULT_ARTWORK_CACHE_MB,
+        metavar="MB",
+        help="Disk budget of the shared artwork cache; least recently used images are "
+        f"evicted beyond it (default: {DEFAULT_ARTWORK_CACHE_MB}).",
+    )
+    session_parser.set_defaults(handler=_handle_session, per_request_deadline=True)
+
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="Replay a recorded session trace and compare latencies",
+    )
+    replay_parser.add_argument(
+        "--trace",
+        required=True,
+        metavar="PATH",
+        help="Trace written by 'session --record'.",
+    )
+    replay_parser.add_argument(
+        "--identifier",
+        help="Device to replay against (default: the device in the trace).",
+    )
+    replay_parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Send each request as soon as the previous one is answered instead "
+        "of at its recorded time.",
+    )
+    replay_parser.set_defaults(handler=_handle_replay)
 
     return parser
 
 
+def _add_selector_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--identifier",
+        dest="identifiers",
+        action="append",
+        default=[],
+        help="Identifier (id/name/address) of the device to control. Repeat to "
+        "target several devices.",
+    )
+    parser.add_argument(
+        "--all",
+        dest="all_devices",
+        action="store_true",
+        help="Target every discovered device.",
+    )
+    parser.add_argument(
+        "--name",
+        metavar="GLOB",
+        help="Target devices whose name matches a glob pattern.",
+    )
+    parser.add_argument(
+        "--model",
+        metavar="GLOB",
+        help="Target devices whose model matches a glob pattern.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_FLEET_CONCURRENCY,
+        help="Maximum devices handled at once when several are targeted "
+        f"(default: {DEFAULT_FLEET_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Scan timeout in seconds when several devices are targeted (default: 5).",
+    )
+
+
+def _parse_scan_fields(value: str) -> List[str]:
+    try:
+        return parse_fields(value, SCAN_FIELDS)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _parse_timeout(value: str) -> Optional[float]:
+    if value.lower() == "auto":
+        return None
+
+    try:
+        timeout = float(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid timeout: {value}") from exc
+
+    if timeout <= 0:
+        raise argparse.ArgumentTypeError("timeout must be positive")
+    return timeout
+
+
 async def _handle_scan(args: argparse.Namespace) -> int:
+    stats: Optional[dict] = None
+    timings: Optional[list] = None
     if args.mock:
-        devices = discovery.mock_devices()
+        from .mock import mock_devices
+        from .telemetry import ScanTelemetry
+
+        devices = [project(device, args.fields) for device in mock_devices()]
+        if args.stats:
+            stats = ScanTelemetry().summary()
     else:
+        from . import discovery
+
         options = discovery.DiscoveryOptions(
             timeout=args.timeout,
             protocol=args.protocol,
             identifier=args.identifier,
             storage_path=args.storage,
             use_storage=not args.no_storage,
+            paths=args.paths,
+            fields=args.fields,
         )
         try:
-            devices = await discovery.discover_devices(options)
+            if options.paths:
+                devices, path_timings = await discovery.discover_paths(options)
+                timings = [asdict(timing) for timing in path_timings]
+            else:
+                devices = await discovery.discover_devices(options)
+            if args.stats:
+                stats = await discovery.scan_statistics(options)
         except StorageError as exc:
             raise CLIError(str(exc)) from exc
         except ValueError as exc:
             raise CLIError(str(exc)) from exc
 
-    print(json.dumps({"devices": devices}, separators=(",", ":")))
+    payload: dict = {"devices": devices}
+    if timings is not None:
+        payload["paths"] = timings
+    if stats is not None:
+        payload["stats"] = stats
+
+    emit(payload)
     return 0
 
 
 async def _handle_pair(args: argparse.Namespace) -> int:
+    from .pairing import PairingError, PairingOptions, pair_device
+
     options = PairingOptions(
         identifier=args.identifier,
         protocol=args.protocol,
@@ -228,11 +589,20 @@ async def _handle_pair(args: argparse.Namespace) -> int:
         raise CLIError(str(exc)) from exc
 
     payload = asdict(result) if is_dataclass(result) else result
-    print(json.dumps(payload, separators=(",", ":")))
+    emit(payload)
     return 0
 
 
 async def _handle_pair_interactive(options: PairingOptions) -> int:
+    from .pairing import (
+        DEFAULT_PIN,
+        PYATV_ERROR,
+        PairingError,
+        PairingResult,
+        PinRequiredResult,
+        create_pairing_session,
+    )
+
     try:
         session = await create_pairing_session(options)
     except StorageError as exc:
@@ -256,7 +626,7 @@ async def _handle_pair_interactive(options: PairingOptions) -> int:
                 protocol=protocol.name,
                 message="Enter the PIN shown on the Apple TV screen.",
             )
-            print(json.dumps(asdict(payload), separators=(",", ":")), flush=True)
+            emit(asdict(payload), flush=True)
             pin_code = await _read_pin_from_stdin()
             if pin_code is None:
                 raise PairingError("pin entry aborted")
@@ -279,7 +649,7 @@ async def _handle_pair_interactive(options: PairingOptions) -> int:
             credentials_saved=True,
             credentials=pairing.service.credentials,
         )
-        print(json.dumps(asdict(payload), separators=(",", ":")), flush=True)
+        emit(asdict(payload), flush=True)
         return 0
     except PYATV_ERROR as exc:
         raise CLIError(str(exc)) from exc
@@ -289,6 +659,48 @@ async def _handle_pair_interactive(options: PairingOptions) -> int:
         await pairing.close()
 
 
+async def _handle_pair_bulk(args: argparse.Namespace) -> int:
+    from .mock import mock_devices
+    from .pairing import BulkPairingOptions, PairingError, pair_bulk
+
+    if args.mock and args.all_devices:
+        identifiers = [device["main_identifier"] for device in mock_devices()]
+    else:
+        identifiers = args.identifiers or []
+
+    options = BulkPairingOptions(
+        identifiers=identifiers,
+        protocols=args.protocols,
+        all_devices=args.all_devices and not args.mock,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        display_name=args.display_name,
+        storage_path=args.storage,
+        use_storage=not args.no_storage,
+        mock=args.mock,
+        pin_timeout=args.pairing_timeout,
+    )
+
+    def _emit(payload: dict) -> None:
+        emit(payload, flush=True)
+
+    try:
+        summary = await pair_bulk(options, _emit, _read_line_from_stdin)
+    except StorageError as exc:
+        raise CLIError(str(exc)) from exc
+    except PairingError as exc:
+        raise CLIError(str(exc)) from exc
+
+    _emit(asdict(summary))
+    return 0 if summary.failed == 0 else 1
+
+
+async def _read_line_from_stdin() -> Optional[str]:
+    loop = asyncio.get_running_loop()
+    line = await loop.run_in_executor(None, sys.stdin.readline)
+    return line or None
+
+
 async def _read_pin_from_stdin() -> Optional[str]:
     loop = asyncio.get_running_loop()
     try:
@@ -304,6 +716,8 @@ async def _read_pin_from_stdin() -> Optional[str]:
 
 
 async def _handle_unpair(args: argparse.Namespace) -> int:
+    from .pairing import PairingError, UnpairOptions, unpair_device
+
     options = UnpairOptions(
         identifier=args.identifier,
         protocol=args.protocol,
@@ -320,18 +734,29 @@ async def _handle_unpair(args: argparse.Namespace) -> int:
         raise CLIError(str(exc)) from exc
 
     payload = asdict(result) if is_dataclass(result) else result
-    print(json.dumps(payload, separators=(",", ":")))
+    emit(payload)
     return 0
 
 
 async def _handle_command(args: argparse.Namespace) -> int:
+    from .control import CommandOptions, ControlError, execute_command
+
+    selector = _selector_from_args(args)
+    if not selector.is_single:
+        from .fleet import CommandOperation
+
+        return await _run_fleet(
+            args, selector, lambda: CommandOperation(args.command, args.action)
+        )
+
     options = CommandOptions(
-        identifier=args.identifier,
+        identifier=selector.identifiers[0],
         command=args.command,
         action=args.action,
         storage_path=args.storage,
         use_storage=not args.no_storage,
         mock=args.mock,
+        breaker=_breaker_policy(args),
     )
 
     try:
@@ -339,17 +764,45 @@ async def _handle_command(args: argparse.Namespace) -> int:
     except (StorageError, ControlError) as exc:
         raise CLIError(str(exc)) from exc
 
-    print(json.dumps(result, separators=(",", ":")))
+    emit(result)
     return 0
 
 
 async def _handle_power(args: argparse.Namespace) -> int:
+    from .control import ControlError, PowerOptions, execute_power
+
+    if args.source != "device" and args.action != "status":
+        raise CLIError("--source only applies to --action status")
+    if not 0 <= args.min_confidence <= 1:
+        raise CLIError("--min-confidence must be between 0 and 1")
+    if args.wake and args.action != "on":
+        raise CLIError("--wake only applies to --action on")
+    if args.wake_timeout <= 0:
+        raise CLIError("--wake-timeout must be positive")
+
+    selector = _selector_from_args(args)
+    if not selector.is_single:
+        from .fleet import PowerOperation
+
+        return await _run_fleet(
+            args,
+            selector,
+            lambda: PowerOperation(
+                args.action, args.source, args.min_confidence, args.wake, args.wake_timeout
+            ),
+        )
+
     options = PowerOptions(
-        identifier=args.identifier,
+        identifier=selector.identifiers[0],
         action=args.action,
         storage_path=args.storage,
         use_storage=not args.no_storage,
         mock=args.mock,
+        breaker=_breaker_policy(args),
+        source=args.source,
+        min_confidence=args.min_confidence,
+        wake=args.wake,
+        wake_timeout=args.wake_timeout,
     )
 
     try:
@@ -357,16 +810,114 @@ async def _handle_power(args: argparse.Namespace) -> int:
     except (StorageError, ControlError) as exc:
         raise CLIError(str(exc)) from exc
 
-    print(json.dumps(result, separators=(",", ":")))
+    emit(result)
     return 0
 
 
+def _breaker_policy(args: argparse.Namespace) -> Optional[BreakerPolicy]:
+    if args.breaker is None:
+        return None
+    return BreakerPolicy(threshold=args.breaker, cooldown=args.breaker_cooldown)
+
+
+def _reject_breaker(args: argparse.Namespace) -> None:
+    # Breakers are kept per selector by the single-device paths; fan-outs do not consult them.
+    if args.breaker is not None:
+        raise CLIError("--breaker only applies to a single device")
+
+
+def _selector_from_args(args: argparse.Namespace) -> DeviceSelector:
+    from .device_lookup import DeviceSelector
+
+    selector = DeviceSelector(
+        identifiers=list(args.identifiers),
+        all_devices=args.all_devices,
+        name=args.name,
+        model=args.model,
+    )
+    if selector.is_empty:
+        raise CLIError("select devices with --identifier, --all, --name or --model")
+    return selector
+
+
+async def _run_fleet(
+    args: argparse.Namespace,
+    selector: DeviceSelector,
+    build_operation: Callable[[], FleetOperation],
+) -> int:
+    from .control import ControlError
+    from .fleet import FleetOptions, run_fleet
+
+    _reject_breaker(args)
+    options = FleetOptions(
+        selector=selector,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        storage_path=args.storage,
+        use_storage=not args.no_storage,
+        mock=args.mock,
+    )
+
+    def _emit(payload: dict) -> None:
+        emit(payload, flush=True)
+
+    try:
+        summary = await run_fleet(options, build_operation(), _emit)
+    except (StorageError, ControlError) as exc:
+        raise CLIError(str(exc)) from exc
+
+    _emit(asdict(summary))
+    return 0 if summary.failed == 0 else 1
+
+
+async def _handle_group(args: argparse.Namespace) -> int:
+    from .control import ControlError
+    from .fleet import CommandOperation, FleetOptions, run_group
+
+    _reject_breaker(args)
+    options = FleetOptions(
+        selector=_selector_from_args(args),
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        storage_path=args.storage,
+        use_storage=not args.no_storage,
+        mock=args.mock,
+    )
+
+    try:
+        result = await run_group(options, CommandOperation(args.command, args.action))
+    except (StorageError, ControlError) as exc:
+        raise CLIError(str(exc)) from exc
+
+    emit(asdict(result))
+    return 0 if result.status == "ok" else 1
+
+
 async def _handle_session(args: argparse.Namespace) -> int:
+    from .control import ControlError, SessionOptions, run_command_session
+
+    if args.stall_threshold is not None and args.stall_threshold <= 0:
+        raise CLIError("--stall-threshold must be positive")
+    if args.heartbeat is not None and args.heartbeat <= 0:
+        raise CLIError("--heartbeat must be positive")
+    if args.heartbeat_timeout <= 0:
+        raise CLIError("--heartbeat-timeout must be positive")
+    if args.artwork_cache < 0:
+        raise CLIError("--artwork-cache must not be negative")
+
     options = SessionOptions(
         identifier=args.identifier,
         storage_path=args.storage,
         use_storage=not args.no_storage,
         mock=args.mock,
+        pairing_timeout=args.pairing_timeout,
+        record_path=args.record,
+        request_deadline=args.deadline,
+        breaker=_breaker_policy(args),
+        stall_threshold=args.stall_threshold,
+        heartbeat=args.heartbeat,
+        heartbeat_timeout=args.heartbeat_timeout,
+        artwork_cache_bytes=int(args.artwork_cache * 1024 * 1024),
     )
 
     try:
@@ -375,7 +926,111 @@ async def _handle_session(args: argparse.Namespace) -> int:
         raise CLIError(str(exc)) from exc
 
 
+async def _handle_replay(args: argparse.Namespace) -> int:
+    from .recording import RecordingError, load_trace, replay_trace
+
+    try:
+        trace = load_trace(args.trace)
+    except RecordingError as exc:
+        raise CLIError(str(exc)) from exc
+
+    identifier = args.identifier or trace.identifier
+    if not identifier:
+        raise CLIError("trace has no identifier; pass --identifier")
+
+    # The session under test runs with this process's backend and storage options.
+    session_argv = [sys.executable, "-m", "pybridge"]
+    if args.mock:
+        session_argv.append("--mock")
+    if args.simulate is not None:
+        session_argv.extend(["--simulate", args.simulate])
+    if args.storage:
+        session_argv.extend(["--storage", args.storage])
+    if args.no_storage:
+        session_argv.append("--no-storage")
+    session_argv.extend(["session", "--identifier", identifier])
+
+    env = dict(os.environ)
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+
+    try:
+        result = await replay_trace(trace, session_argv, paced=not args.fast, env=env)
+    except RecordingError as exc:
+        raise CLIError(str(exc)) from exc
+
+    emit(asdict(result))
+    return 0 if result.status == "ok" else 1
+
+
+async def _handle_batch(args: argparse.Namespace) -> int:
+    from .batch import BatchOptions, run_batch
+    from .control import ControlError
+
+    loop = asyncio.get_running_loop()
+    try:
+        source = open(args.file, "r", encoding="utf-8") if args.file else sys.stdin
+    except OSError as exc:
+        raise CLIError(f"unable to read batch: {exc}") from exc
+
+    async def _lines() -> AsyncIterator[str]:
+        # Read one line at a time so operations start while the producer is still writing.
+        while True:
+            try:
+                line = await loop.run_in_executor(None, source.readline)
+            except OSError as exc:
+                raise CLIError(f"unable to read batch: {exc}") from exc
+            if not line:
+                return
+            yield line
+
+    options = BatchOptions(
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        storage_path=args.storage,
+        use_storage=not args.no_storage,
+        mock=args.mock,
+    )
+
+    def _emit(payload: dict) -> None:
+        emit(payload, flush=True)
+
+    try:
+        summary = await run_batch(options, _lines(), _emit)
+    except (StorageError, ControlError) as exc:
+        raise CLIError(str(exc)) from exc
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    _emit(asdict(summary))
+    return 0 if summary.failed == 0 else 1
+
+
+async def _handle_verify(args: argparse.Namespace) -> int:
+    from .verify import VerifyError, VerifyOptions, verify_credentials
+
+    options = VerifyOptions(
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        connect_timeout=args.connect_timeout,
+        storage_path=args.storage,
+        use_storage=not args.no_storage,
+        mock=args.mock,
+    )
+
+    try:
+        result = await verify_credentials(options)
+    except (StorageError, VerifyError) as exc:
+        raise CLIError(str(exc)) from exc
+
+    emit(asdict(result))
+    return 0 if result.stale == 0 and result.unreachable == 0 else 1
+
+
 async def _handle_clear_storage(args: argparse.Namespace) -> int:
+    from .storage import clear_storage
+
     if args.mock:
         payload = {
             "status": "cleared",
@@ -391,10 +1046,73 @@ async def _handle_clear_storage(args: argparse.Namespace) -> int:
 
         payload = asdict(result)
 
-    print(json.dumps(payload, separators=(",", ":")))
+    emit(payload)
     return 0
 
 
+@contextlib.contextmanager
+def _simulation(spec: Optional[str]) -> Iterator[None]:
+    if spec is None:
+        yield
+        return
+
+    from .simulator import SimulationError, load_profile, simulated
+
+    try:
+        profile = load_profile(spec)
+    except SimulationError as exc:
+        raise CLIError(str(exc)) from exc
+
+    with simulated(profile):
+        yield
+
+
+@contextlib.contextmanager
+def _profiling(path: Optional[str]) -> Iterator[None]:
+    if path is None:
+        yield
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        try:
+            profiler.dump_stats(path)
+        except OSError as exc:
+            raise CLIError(f"unable to write profile: {exc}") from exc
+
+
+@contextlib.contextmanager
+def _tracing(path: Optional[str]) -> Iterator[None]:
+    if path is None:
+        yield
+        return
+
+    from .tracing import tracing
+
+    with tracing() as tracer:
+        try:
+            yield
+        finally:
+            try:
+                tracer.write(path)
+            except OSError as exc:
+                raise CLIError(f"unable to write trace events: {exc}") from exc
+
+
+async def _run_handler(handler: CommandHandler, args: argparse.Namespace) -> int:
+    # A session applies --deadline to each request rather than to its lifetime.
+    if getattr(args, "per_request_deadline", False):
+        return await handler(args)
+    async with deadline(args.deadline):
+        return await handler(args)
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
@@ -404,11 +1122,31 @@ def main(argv: Optional[List[str]] = None) -> int:
         parser.print_help(sys.stderr)
         return 1
 
+    if args.simulate is not None and args.mock:
+        parser.error("--mock and --simulate cannot be combined")
+    if args.deadline is not None and args.deadline <= 0:
+        parser.error("--deadline must be positive")
+    if args.breaker is not None and args.breaker < 1:
+        parser.error("--breaker must be at least 1")
+    if args.breaker_cooldown <= 0:
+        parser.error("--breaker-cooldown must be positive")
+
     try:
-        return asyncio.run(handler(args))
+        with _simulation(args.simulate), _tracing(args.trace_events), _profiling(
+            args.profile
+        ):
+            return asyncio.run(_run_handler(handler, args))
     except CLIError as exc:
         print(str(exc), file=sys.stderr)
         return 2
+    except DeadlineExceeded as exc:
+        emit(exc.payload())
+        print(str(exc), file=sys.stderr)
+        return 3
+    except BreakerOpen as exc:
+        emit(exc.payload())
+        print(str(exc), file=sys.stderr)
+        return 4
     except KeyboardInterrupt:
         print("aborted", file=sys.stderr)
         return 130
@@ -0,0 +1,52 @@
+"""Shared defaults that must be importable without loading pyatv.
+
+The CLI builds its parser from these values, so they live apart from the
+modules that wrap pyatv to keep one-shot process start-up cheap.
+"""
+
+# Names of ``pyatv.const.Protocol`` members, used for argument choices.
+PROTOCOL_NAMES = ("DMAP", "MRP", "AirPlay", "Companion", "RAOP")
+
+# Top-level keys of a ``scan`` device payload, selectable with ``--fields``.
+# ``path`` and ``latency`` are only present for ``--path`` scans.
+SCAN_FIELDS = (
+    "name",
+    "address",
+    "model",
+    "deep_sleep",
+    "identifiers",
+    "main_identifier",
+    "device_info",
+    "protocols",
+    "path",
+    "latency",
+)
+
+DEFAULT_TIMEOUT = 5.0
+MIN_TIMEOUT = 0.5
+
+DEFAULT_BULK_CONCURRENCY = 4
+# Seconds an in-session pairing handle may wait for its PIN before it is closed.
+DEFAULT_PAIRING_HANDLE_TIMEOUT = 120.0
+# Seconds a session heartbeat probe may take before the connection is considered dead.
+DEFAULT_HEARTBEAT_TIMEOUT = 2.0
+
+DEFAULT_VERIFY_CONCURRENCY = 16
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+DEFAULT_FLEET_CONCURRENCY = 8
+
+# Consecutive failures that open a device's circuit breaker when --breaker is given.
+DEFAULT_BREAKER_THRESHOLD = 3
+# Seconds an open breaker fails fast before a half-open probe is allowed.
+DEFAULT_BREAKER_COOLDOWN = 30.0
+
+# Where ``power --action status`` takes its answer from: a connection, discovery
+# (plus recent observations), or discovery unless it is below --min-confidence.
+POWER_STATUS_SOURCES = ("device", "discovery", "auto")
+# Confidence below which ``--source auto`` connects for an authoritative answer.
+DEFAULT_POWER_CONFIDENCE = 0.8
+# Seconds ``power --action on --wake`` keeps retrying and waiting for the device to be on.
+DEFAULT_WAKE_TIMEOUT = 30.0
+# Megabytes of now-playing artwork a session keeps on disk (see ``artwork``).
+DEFAULT_ARTWORK_CACHE_MB = 64
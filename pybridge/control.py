@@ -3,15 +3,26 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import copy
 import inspect
-import json
-import sys
-from dataclasses import dataclass
-from typing import Any, Optional
+import time
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union
 
 from pyatv import connect
 from pyatv import exceptions as pyatv_exceptions
-from pyatv.const import DeviceState, InputAction, PowerState, Protocol
+from pyatv.const import (
+    DeviceState,
+    FeatureName,
+    FeatureState,
+    InputAction,
+    PowerState,
+    Protocol,
+    TouchAction,
+)
 PYATV_ERROR = getattr(
     pyatv_exceptions,
     "PyatvError",
@@ -20,15 +31,90 @@ PYATV_ERROR = getattr(
 from pyatv.interface import AppleTV, BaseConfig
 from pyatv.interface import Storage
 
+from .apps import AppCache, AppList
+from .artwork import HIT, MISS, RESIZED, ArtworkCache, ArtworkEntry
+from .breaker import BreakerOpen, BreakerPolicy, CircuitBreakers
+from .capabilities import FALLBACK, PLAY_PAUSE, TOGGLE, CapabilityCache, DeviceCapabilities
+from .channel import JSON_FRAMING, ChannelError, SessionChannel, available_framings
 from .device_lookup import select_config
-from .discovery import DiscoveryOptions, scan_configs
+from .constants import (
+    DEFAULT_ARTWORK_CACHE_MB,
+    DEFAULT_HEARTBEAT_TIMEOUT,
+    DEFAULT_POWER_CONFIDENCE,
+    DEFAULT_WAKE_TIMEOUT,
+)
+from .deadline import DeadlineExceeded, deadline, parse_deadline
+from .gestures import GestureStream
+from .discovery import DiscoveryOptions, locate_known_device, scan_configs, scan_host
+from .heartbeat import ConnectionMonitor
+from .mock import MOCK_APPS
+from .pairing import (
+    DEFAULT_PAIRING_HANDLE_TIMEOUT,
+    PairingError,
+    PairingManager,
+    mock_pairing_factory,
+    pyatv_pairing_factory,
+)
+from .power_inference import (
+    SOURCE_DEVICE,
+    SOURCE_DISCOVERY,
+    SOURCE_PUSH,
+    PowerInference,
+    PowerObservations,
+    infer_power_state,
+)
+from .recording import RecordingError, SessionRecorder
 from .storage import load_storage
+from .tracing import span
+from .watchdog import LoopWatchdog
 
 
 class ControlError(Exception):
     """Raised when sending a command fails."""
 
 
+# stdin/stdout framing shared by the (single) session this process runs, and
+# the trace recorder while ``--record`` is active.
+_session_channel = SessionChannel()
+_session_recorder: Optional[SessionRecorder] = None
+_session_watchdog: Optional[LoopWatchdog] = None
+_PLAY_PAUSE_COMMANDS = {"play_pause", "playpause"}
+# Session requests that use the device connection.
+_CONNECTION_REQUESTS = {
+    "command",
+    "touch",
+    "power",
+    "health",
+    "now_playing",
+    "artwork",
+    "apps",
+    "launch_app",
+}
+# pyatv touch modes of the touch events that carry a position.
+_TOUCH_MODES = {"down": TouchAction.Press, "move": TouchAction.Hold, "up": TouchAction.Release}
+# Artwork width asked of the device when a request names no size, as pyatv does.
+_DEFAULT_ARTWORK_WIDTH = 512
+_PLAYING_FIELDS = (
+    "title",
+    "artist",
+    "album",
+    "genre",
+    "series_name",
+    "season_number",
+    "episode_number",
+    "media_type",
+    "device_state",
+    "position",
+    "total_time",
+    "repeat",
+    "shuffle",
+    "hash",
+)
+# Seconds between wake attempts, and between power state polls once a wake was sent.
+_WAKE_RETRY_INTERVAL = 0.5
+_WAKE_POLL_INTERVAL = 0.25
+
+
 @dataclass
 class CommandOptions:
     """Incoming CLI options for remote commands."""
@@ -40,6 +126,7 @@ class CommandOptions:
     storage_path: Optional[str] = None
     use_storage: bool = True
     mock: bool = False
+    breaker: Optional[BreakerPolicy] = None
 
 
 @dataclass
@@ -51,6 +138,13 @@ class PowerOptions:
     storage_path: Optional[str] = None
     use_storage: bool = True
     mock: bool = False
+    breaker: Optional[BreakerPolicy] = None
+    # Only used by the status action; see ``power_inference``.
+    source: str = SOURCE_DEVICE
+    min_confidence: float = DEFAULT_POWER_CONFIDENCE
+    # Only used by the on action; see ``_wake_target``.
+    wake: bool = False
+    wake_timeout: float = DEFAULT_WAKE_TIMEOUT
 
 
 @dataclass
@@ -61,6 +155,52 @@ class SessionOptions:
     storage_path: Optional[str] = None
     use_storage: bool = True
     mock: bool = False
+    pairing_timeout: float = DEFAULT_PAIRING_HANDLE_TIMEOUT
+    record_path: Optional[str] = None
+    stall_threshold: Optional[float] = None
+    heartbeat: Optional[float] = None
+    heartbeat_timeout: float = DEFAULT_HEARTBEAT_TIMEOUT
+    request_deadline: Optional[float] = None
+    breaker: Optional[BreakerPolicy] = None
+    artwork_cache_bytes: int = DEFAULT_ARTWORK_CACHE_MB * 1024 * 1024
+
+
+@dataclass
+class SessionContext:
+    """State shared by the message handlers of a persistent session.
+
+    The storage and discovery results loaded at session start stay warm so
+    operations such as pairing do not pay for another load or scan.
+    """
+
+    atv: Optional[AppleTV]
+    config: Any
+    configs: List[BaseConfig]
+    storage: Optional[Storage]
+    pairing: PairingManager
+    started: float = field(default_factory=time.monotonic)
+    messages: int = 0
+    # Default deadline of a request without its own ``deadline`` field.
+    deadline: Optional[float] = None
+    # Breakers are keyed by the identifier the session was started with.
+    selector: str = ""
+    breakers: Optional[CircuitBreakers] = None
+    # Held by device requests, heartbeat probes and reconnects.
+    link_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    monitor: Optional[ConnectionMonitor] = None
+    # pyatv keeps only a weak reference to listeners.
+    listener: Any = None
+    capabilities: Optional[CapabilityCache] = None
+    # Power states seen by this session, including pushed updates.
+    power: Optional[PowerObservations] = None
+    artwork: Optional[ArtworkCache] = None
+    apps: Optional[AppCache] = None
+    # The app list fetch in flight, shared by requests and background refreshes.
+    apps_refresh: Optional[asyncio.Task] = None
+    # Created by the first touch message.
+    touch: Optional[GestureStream] = None
+    # Scans for devices other than the session target, e.g. to pair them.
+    discovery: Optional[DiscoveryOptions] = None
 
 
 async def execute_command(options: CommandOptions) -> dict:
@@ -75,37 +215,26 @@ async def execute_command(options: CommandOptions) -> dict:
             "mock": True,
         }
 
-    loop = asyncio.get_running_loop()
-
-    storage: Optional[Storage] = None
-    if options.use_storage:
-        storage = await load_storage(loop, options.storage_path)
-
-    configs = await scan_configs(
-        DiscoveryOptions(
-            timeout=5,
-            protocol=None,
-            identifier=None,
-            storage_path=options.storage_path,
-            use_storage=options.use_storage,
-        ),
-        storage=storage,
-    )
-
-    config = select_config(configs, options.identifier)
-    if config is None:
-        raise ControlError("device not found")
-
     action = _parse_action(options.action)
 
     command = options.command.lower()
 
-    atv = await _connect_device(config, loop, storage)
+    breakers = await _load_breakers(options)
+    _, _, config, atv = await _open_target(options, breakers)
+
+    loop = asyncio.get_running_loop()
+    cache: Optional[CapabilityCache] = None
+    capabilities: Optional[DeviceCapabilities] = None
+    if command in _PLAY_PAUSE_COMMANDS:
+        cache = await CapabilityCache.load(loop, options.storage_path)
+        capabilities = _device_capabilities(cache, config, atv)
 
     try:
-        await _invoke_remote(atv, command, action)
+        await _invoke_remote(atv, command, action, capabilities)
     finally:
         atv.close()
+        if cache is not None:
+            await cache.save(loop)
 
     return {
         "status": "ok",
@@ -126,66 +255,459 @@ async def execute_power(options: PowerOptions) -> dict:
             "mock": True,
         }
 
+    loop = asyncio.get_running_loop()
+    breakers = await _load_breakers(options)
+    observations = await PowerObservations.load(loop, options.storage_path)
+
+    if options.wake and options.action.lower() == "on":
+        response = await _wake_target(options, breakers)
+        if response["confirmed"]:
+            observations.record(response["identifier"], "On")
+            await observations.save(loop)
+        return response
+
+    inferred = options.action.lower() == "status" and options.source != SOURCE_DEVICE
+    if inferred:
+        storage, _, config = await _find_target(options, breakers)
+        inference = _infer_power(config, observations)
+        if options.source == SOURCE_DISCOVERY or inference.confidence >= options.min_confidence:
+            response = {"status": "ok", "identifier": config.identifier}
+            response.update(inference.payload())
+            return response
+        atv = await _connect_target(options, breakers, config, storage)
+    else:
+        _, _, config, atv = await _open_target(options, breakers)
+
+    try:
+        result = await _perform_power(atv, options.action)
+    finally:
+        atv.close()
+
+    observations.record(config.identifier, _observed_power_state(result))
+    await observations.save(loop)
+
+    if "power_state" in result:
+        response = {
+            "status": "ok",
+            "identifier": config.identifier,
+            "power_state": result["power_state"],
+        }
+        if inferred:
+            response.update({"confidence": 1.0, "source": SOURCE_DEVICE})
+        return response
+
+    return {
+        "status": "ok",
+        "identifier": config.identifier,
+        "power": options.action,
+    }
+
+
+async def _load_breakers(
+    options: Union[CommandOptions, PowerOptions, SessionOptions],
+) -> Optional[CircuitBreakers]:
+    if options.breaker is None:
+        return None
+    loop = asyncio.get_running_loop()
+    return await CircuitBreakers.load(loop, options.storage_path, options.breaker)
+
+
+async def _open_target(
+    options: Union[CommandOptions, PowerOptions, SessionOptions],
+    breakers: Optional[CircuitBreakers],
+) -> Tuple[Optional[Storage], List[BaseConfig], BaseConfig, AppleTV]:
+    """Find and connect to ``options.identifier``, honouring its circuit breaker.
+
+    Raises ``BreakerOpen`` without contacting the device while the breaker is
+    open; "device not found" and connection failures are recorded against it.
+    """
+
+    storage, configs, config = await _find_target(options, breakers)
+    atv = await _connect_target(options, breakers, config, storage)
+    return storage, configs, config, atv
+
+
+async def _find_target(
+    options: Union[CommandOptions, PowerOptions, SessionOptions],
+    breakers: Optional[CircuitBreakers],
+) -> Tuple[Optional[Storage], List[BaseConfig], BaseConfig]:
+    """The scan half of ``_open_target``."""
+
     loop = asyncio.get_running_loop()
 
+    if breakers is not None and breakers.check(options.identifier):
+        await breakers.save(loop)
+
     storage: Optional[Storage] = None
     if options.use_storage:
         storage = await load_storage(loop, options.storage_path)
 
-    configs = await scan_configs(
-        DiscoveryOptions(
-            timeout=5,
-            protocol=None,
-            identifier=None,
-            storage_path=options.storage_path,
-            use_storage=options.use_storage,
-        ),
-        storage=storage,
-    )
+    try:
+        configs = await scan_configs(
+            DiscoveryOptions(
+                timeout=None,
+                protocol=None,
+                identifier=None,
+                storage_path=options.storage_path,
+                use_storage=options.use_storage,
+                target=options.identifier,
+            ),
+            storage=storage,
+        )
 
-    config = select_config(configs, options.identifier)
-    if config is None:
-        raise ControlError("device not found")
+        config = select_config(configs, options.identifier)
+        if config is None:
+            raise ControlError("device not found")
+    except ControlError as exc:
+        if breakers is not None:
+            breakers.record_failure(options.identifier, str(exc))
+            await breakers.save(loop)
+        raise
+
+    return storage, configs, config
 
-    atv = await _connect_device(config, loop, storage)
 
+async def _connect_target(
+    options: Union[CommandOptions, PowerOptions, SessionOptions],
+    breakers: Optional[CircuitBreakers],
+    config: BaseConfig,
+    storage: Optional[Storage],
+) -> AppleTV:
+    """The connect half of ``_open_target``."""
+
+    loop = asyncio.get_running_loop()
     try:
-        power = atv.power
-        action = options.action.lower()
-        if action == "on":
+        atv = await _connect_device(config, loop, storage)
+    except ControlError as exc:
+        if breakers is not None:
+            breakers.record_failure(options.identifier, str(exc))
+            await breakers.save(loop)
+        raise
+
+    if breakers is not None and breakers.record_success(options.identifier):
+        await breakers.save(loop)
+    return atv
+
+
+async def _perform_power(atv: AppleTV, action: str) -> dict:
+    """Apply a power action, returning ``power`` or ``power_state`` result fields."""
+
+    power = atv.power
+    lower_action = str(action).lower()
+    with span("power", action=lower_action):
+        if lower_action == "on":
             await power.turn_on()
-        elif action == "off":
+            return {"power": "on"}
+        if lower_action == "off":
             await power.turn_off()
-        elif action == "status":
+            return {"power": "off"}
+        if lower_action == "status":
             state = await _resolve_power_state(power)
+            return {"power_state": state.name if isinstance(state, PowerState) else str(state)}
+    raise ControlError(f"unknown power action: {action}")
+
+
+async def _wake_target(options: PowerOptions, breakers: Optional[CircuitBreakers]) -> dict:
+    """Power on ``options.identifier`` without a full scan and connect where possible.
+
+    The device is looked up at its last known address (credentials come from
+    storage as usual), falling back to a targeted scan, and then woken by
+    ``_wake_config``. Breaker outcomes are recorded as for ``_open_target``.
+    """
+
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+
+    if breakers is not None and breakers.check(options.identifier):
+        await breakers.save(loop)
+
+    storage: Optional[Storage] = None
+    if options.use_storage:
+        storage = await load_storage(loop, options.storage_path)
+
+    discovery_options = DiscoveryOptions(
+        timeout=None,
+        protocol=None,
+        identifier=None,
+        storage_path=options.storage_path,
+        use_storage=options.use_storage,
+        target=options.identifier,
+    )
+
+    try:
+        located = "cached"
+        config = await locate_known_device(discovery_options, storage)
+        if config is None:
+            located = "scan"
+            configs = await scan_configs(discovery_options, storage=storage)
+            config = select_config(configs, options.identifier)
+            if config is None:
+                raise ControlError("device not found")
+
+        result = await _wake_config(config, loop, storage, options.wake_timeout, started)
+    except ControlError as exc:
+        if breakers is not None:
+            breakers.record_failure(options.identifier, str(exc))
+            await breakers.save(loop)
+        raise
+
+    if breakers is not None and breakers.record_success(options.identifier):
+        await breakers.save(loop)
+
+    response = {"status": "ok", "identifier": config.identifier}
+    response.update(result)
+    response["located"] = located
+    return response
+
+
+async def _wake_config(
+    config: BaseConfig,
+    loop: asyncio.AbstractEventLoop,
+    storage: Optional[Storage],
+    timeout: float,
+    started: float,
+) -> dict:
+    """Turn on a device that may be asleep, retrying until it answers or *timeout* passes.
+
+    Only the protocol that carries the wake request is connected. Once it is
+    sent the power state is polled until the device reports ``On``;
+    ``time_to_on`` is measured from *started* (a ``time.monotonic()`` value).
+    """
+
+    give_up = started + timeout
+    protocol = _wake_protocol(config)
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            atv = await _connect_device(config, loop, storage, protocol)
+            try:
+                with span("power", action="wake", attempt=attempts):
+                    await atv.power.turn_on()
+                    confirmed = await _await_power_on(atv.power, give_up)
+            finally:
+                atv.close()
+        except (ControlError, PYATV_ERROR) as exc:
+            error = str(exc) or type(exc).__name__
+        else:
             return {
-                "status": "ok",
-                "identifier": config.identifier,
-                "power_state": state.name if isinstance(state, PowerState) else str(state),
+                "power": "on",
+                "confirmed": confirmed,
+                "attempts": attempts,
+                "time_to_on": round(time.monotonic() - started, 4) if confirmed else None,
             }
-        else:
-            raise ControlError(f"unknown power action: {options.action}")
-    finally:
-        atv.close()
 
-    return {
-        "status": "ok",
-        "identifier": config.identifier,
-        "power": options.action,
-    }
+        if time.monotonic() + _WAKE_RETRY_INTERVAL >= give_up:
+            raise ControlError(f"device did not wake: {error}")
+        await asyncio.sleep(_WAKE_RETRY_INTERVAL)
+        # Ask the device itself again: a waking device may have a fresh address or services.
+        try:
+            found = await scan_host(
+                str(config.address), set(config.all_identifiers), _WAKE_RETRY_INTERVAL, storage
+            )
+        except PYATV_ERROR:
+            found = None
+        if found is not None:
+            config = found
+            protocol = _wake_protocol(config)
+
+
+def _wake_protocol(config: BaseConfig) -> Optional[Protocol]:
+    """Return the one protocol worth connecting to power *config* on, if it offers one."""
+
+    get_service = getattr(config, "get_service", None)
+    if get_service is None:
+        return None
+    for protocol in (Protocol.Companion, Protocol.MRP):
+        if get_service(protocol) is not None:
+            return protocol
+    return None
+
+
+async def _await_power_on(power: Any, give_up: float) -> bool:
+    """Poll until *power* reports ``On``; False when that is not confirmed in time."""
+
+    while True:
+        try:
+            state = await _resolve_power_state(power)
+        except ControlError:
+            return False
+        if state == PowerState.On:
+            return True
+        if time.monotonic() + _WAKE_POLL_INTERVAL >= give_up:
+            return False
+        await asyncio.sleep(_WAKE_POLL_INTERVAL)
+
+
+def _infer_power(config: BaseConfig, observations: PowerObservations) -> PowerInference:
+    deep_sleep = bool(getattr(config, "deep_sleep", False))
+    return infer_power_state(deep_sleep, observations.get(config.identifier))
+
+
+def _observed_power_state(result: dict) -> str:
+    """Return the power state implied by a ``_perform_power`` result."""
+
+    if "power_state" in result:
+        return result["power_state"]
+    return "On" if result.get("power") == "on" else "Off"
 
 
 async def _connect_device(
     config: BaseConfig,
     loop: asyncio.AbstractEventLoop,
     storage: Optional[Storage],
+    protocol: Optional[Protocol] = None,
 ) -> AppleTV:
+    """Connect to *config*, only over *protocol* when given.
+
+    pyatv's ``connect`` sets up every enabled service whatever its
+    ``protocol`` argument says, so a copy of *config* with only *protocol*
+    enabled is connected instead.
+    """
+
+    if protocol is not None:
+        config = _restrict_config(config, protocol)
+    connecting = asyncio.ensure_future(connect(config, loop, storage=storage))
     try:
-        return await connect(config, loop, storage=storage)
+        with span("connect", identifier=config.identifier):
+            return await asyncio.shield(connecting)
+    except asyncio.CancelledError:
+        # A deadline fired: stop connecting, and close the connection if it won the race.
+        connecting.cancel()
+        connecting.add_done_callback(_close_abandoned_connection)
+        raise
     except PYATV_ERROR as exc:
         raise ControlError(str(exc)) from exc
 
 
+def _restrict_config(config: BaseConfig, protocol: Protocol) -> BaseConfig:
+    """Return a copy of *config* with every service but *protocol* disabled."""
+
+    restricted = copy.deepcopy(config)
+    for service in restricted.services:
+        service.enabled = service.protocol == protocol
+    return restricted
+
+
+def _close_abandoned_connection(connecting: asyncio.Future) -> None:
+    if not connecting.cancelled() and connecting.exception() is None:
+        connecting.result().close()
+
+
+class _SessionListener:
+    """pyatv device and power listener of a session.
+
+    Connection loss is reported to the session monitor; pushed power state
+    changes are recorded for ``power --source discovery`` to use later.
+    """
+
+    def __init__(self, context: SessionContext, atv: AppleTV) -> None:
+        self._context = context
+        self._atv = atv
+
+    def connection_lost(self, exception: Exception) -> None:
+        self._report(str(exception) or "connection lost")
+
+    def connection_closed(self) -> None:
+        self._report("connection closed")
+
+    def powerstate_update(self, old_state: PowerState, new_state: PowerState) -> None:
+        if self._context.atv is self._atv and self._context.power is not None:
+            self._context.power.record(
+                self._context.config.identifier, new_state.name, SOURCE_PUSH
+            )
+
+    def _report(self, error: str) -> None:
+        # Ignore connections the session already replaced or is closing itself.
+        if self._context.atv is self._atv and self._context.monitor is not None:
+            self._context.monitor.connection_lost(error)
+
+
+def _watch_connection(context: SessionContext) -> None:
+    context.listener = _SessionListener(context, context.atv)
+    context.atv.listener = context.listener
+    power = getattr(context.atv, "power", None)
+    if power is not None:
+        power.listener = context.listener
+
+
+async def _probe_connection(atv: AppleTV) -> None:
+    """Exchange one message with the device.
+
+    Metadata and power state are answered from pyatv's cache, so the probe
+    sends the generic message pyatv uses as its own MRP heartbeat and, for
+    Companion-only connections, fetches the attention state.
+    """
+
+    mrp = _protocol_instance(atv.remote_control, Protocol.MRP)
+    protocol = getattr(mrp, "protocol", None)
+    if protocol is not None:
+        from pyatv.protocols.mrp import messages, protobuf
+
+        await protocol.send_and_receive(messages.create(protobuf.GENERIC_MESSAGE))
+        return
+
+    companion = _protocol_instance(getattr(atv, "apps", None), Protocol.Companion)
+    api = getattr(companion, "api", None)
+    if api is not None:
+        await api.fetch_attention_state()
+        return
+
+    raise ControlError("heartbeat requires an MRP or Companion connection")
+
+
+def _protocol_instance(relayer: Any, protocol: Protocol) -> Any:
+    """Return the *protocol* implementation behind a pyatv facade interface."""
+
+    get = getattr(relayer, "get", None)
+    return get(protocol) if callable(get) else None
+
+
+async def _reconnect_session(context: SessionContext, options: SessionOptions) -> None:
+    """Replace the session connection, rescanning if the device moved.
+
+    Outcomes feed the session's circuit breaker, so background reconnects
+    act as its half-open probes.
+    """
+
+    loop = asyncio.get_running_loop()
+    stale = context.atv
+    stale.listener = None
+    stale.close()
+
+    try:
+        atv = await _connect_device(context.config, loop, context.storage)
+    except ControlError:
+        try:
+            configs = await scan_configs(
+                DiscoveryOptions(
+                    timeout=None,
+                    protocol=None,
+                    identifier=None,
+                    storage_path=options.storage_path,
+                    use_storage=options.use_storage,
+                    target=options.identifier,
+                ),
+                storage=context.storage,
+            )
+            config = select_config(configs, options.identifier)
+            if config is None:
+                raise ControlError("device not found")
+            atv = await _connect_device(config, loop, context.storage)
+        except ControlError as exc:
+            if context.breakers is not None:
+                context.breakers.record_failure(context.selector, str(exc))
+                await context.breakers.save(loop)
+            raise
+        context.config = config
+        context.configs = configs
+
+    context.atv = atv
+    _watch_connection(context)
+    if context.breakers is not None and context.breakers.record_success(context.selector):
+        await context.breakers.save(loop)
+
+
 def _parse_action(name: str) -> InputAction:
     try:
         return InputAction[name]
@@ -197,6 +719,7 @@ async def _invoke_remote(
     atv: AppleTV,
     command: str,
     action: InputAction,
+    capabilities: Optional[DeviceCapabilities] = None,
 ) -> None:
     remote = atv.remote_control
 
@@ -211,29 +734,88 @@ async def _invoke_remote(
     }
 
     if command in directional_commands:
-        await directional_commands[command](action=action)
+        with span("remote", command=command):
+            await directional_commands[command](action=action)
         return
 
-    if command in {"play_pause", "playpause"}:
-        await _invoke_play_pause(atv)
+    if command in _PLAY_PAUSE_COMMANDS:
+        with span("remote", command="play_pause"):
+            await _invoke_play_pause(atv, capabilities)
         return
 
     raise ControlError(f"unsupported command: {command}")
 
 
-async def _invoke_play_pause(atv: AppleTV) -> None:
+async def _invoke_play_pause(
+    atv: AppleTV, capabilities: Optional[DeviceCapabilities] = None
+) -> None:
+    """Toggle playback, going straight to the path known to work on this device.
+
+    The path comes from the capability cache, else from ``atv.features``;
+    when neither knows, the toggle is tried first. The path that worked is
+    recorded, and a cached fallback that fails is forgotten.
+    """
+
+    path = capabilities.get(PLAY_PAUSE) if capabilities is not None else None
+    if path is None:
+        path = _play_pause_feature_path(atv)
+
+    if path == FALLBACK:
+        try:
+            await _fallback_play_pause(atv, None)
+        except ControlError:
+            if capabilities is not None:
+                capabilities.forget(PLAY_PAUSE)
+            raise
+        if capabilities is not None:
+            capabilities.record(PLAY_PAUSE, FALLBACK)
+        return
+
     remote = atv.remote_control
 
     try:
         await remote.play_pause()
     except (pyatv_exceptions.CommandError, pyatv_exceptions.NotSupportedError) as exc:
         await _fallback_play_pause(atv, exc)
+        path = FALLBACK
     except PYATV_ERROR as exc:
         raise ControlError(str(exc)) from exc
+    else:
+        path = TOGGLE
+
+    if capabilities is not None:
+        capabilities.record(PLAY_PAUSE, path)
+
+
+def _play_pause_feature_path(atv: AppleTV) -> Optional[str]:
+    """Return the play/pause path implied by ``atv.features``, if it is conclusive."""
+
+    features = getattr(atv, "features", None)
+    if features is None:
+        return None
+    try:
+        state = features.get_feature(FeatureName.PlayPause).state
+    except PYATV_ERROR:  # pragma: no cover - depends on the protocol backend
+        return None
+    if state == FeatureState.Available:
+        return TOGGLE
+    if state == FeatureState.Unsupported:
+        return FALLBACK
+    return None
+
 
+def _build_number(atv: AppleTV) -> Optional[str]:
+    return getattr(getattr(atv, "device_info", None), "build_number", None)
 
-async def _fallback_play_pause(atv: AppleTV, original_exc: Exception) -> None:
-    failure_message = str(original_exc) or "play/pause command failed"
+
+def _device_capabilities(
+    cache: CapabilityCache, config: BaseConfig, atv: AppleTV
+) -> DeviceCapabilities:
+    return cache.for_device(config.identifier, _build_number(atv))
+
+
+async def _fallback_play_pause(atv: AppleTV, original_exc: Optional[Exception]) -> None:
+    failure_message = str(original_exc or "") or "play/pause command failed"
 
     metadata = getattr(atv, "metadata", None)
     if metadata is None:
@@ -259,86 +841,194 @@ async def _fallback_play_pause(atv: AppleTV, original_exc: Exception) -> None:
 
 
 async def run_command_session(options: SessionOptions) -> int:
-    """Maintain a persistent connection for command and power handling."""
+    """Maintain a persistent connection for command and power handling.
 
-    if options.mock:
-        await _run_mock_session(options)
-        return 0
+    With ``record_path`` every request and response is written to a trace
+    (see ``recording``). With ``stall_threshold`` a ``LoopWatchdog`` samples
+    event-loop lag and records stalls, reported by the ``stats`` message.
+    """
 
-    loop = asyncio.get_running_loop()
+    global _session_recorder, _session_watchdog
 
-    storage: Optional[Storage] = None
-    if options.use_storage:
-        storage = await load_storage(loop, options.storage_path)
+    _session_channel.select(JSON_FRAMING)
 
-    configs = await scan_configs(
-        DiscoveryOptions(
-            timeout=5,
-            protocol=None,
-            identifier=None,
-            storage_path=options.storage_path,
-            use_storage=options.use_storage,
-        ),
-        storage=storage,
-    )
+    if options.record_path:
+        try:
+            _session_recorder = SessionRecorder.open(options.record_path, options.identifier)
+        except RecordingError as exc:
+            raise ControlError(str(exc)) from exc
 
-    config = select_config(configs, options.identifier)
-    if config is None:
-        _emit_session_payload({"status": "error", "error": "device not found", "fatal": True})
-        return 2
+    if options.stall_threshold is not None:
+        _session_watchdog = LoopWatchdog(options.stall_threshold)
+        _session_watchdog.start()
 
     try:
-        atv = await _connect_device(config, loop, storage)
+        if options.mock:
+            await _run_mock_session(options)
+            return 0
+        return await _run_device_session(options)
+    finally:
+        if _session_watchdog is not None:
+            await _session_watchdog.stop()
+            _session_watchdog = None
+        if _session_recorder is not None:
+            _session_recorder.close()
+            _session_recorder = None
+
+
+async def _run_device_session(options: SessionOptions) -> int:
+    loop = asyncio.get_running_loop()
+
+    breakers = await _load_breakers(options)
+    try:
+        async with deadline(options.request_deadline):
+            storage, configs, config, atv = await _open_target(options, breakers)
     except ControlError as exc:
         _emit_session_payload({"status": "error", "error": str(exc), "fatal": True})
         return 2
+    except (DeadlineExceeded, BreakerOpen) as exc:
+        response = exc.payload()
+        response["fatal"] = True
+        _emit_session_payload(response)
+        return 3 if isinstance(exc, DeadlineExceeded) else 4
 
     _emit_session_payload(
         {
             "status": "ready",
             "identifier": config.identifier,
             "name": getattr(config, "name", None),
+            "framings": available_framings(),
         }
     )
 
+    context = SessionContext(
+        atv=atv,
+        config=config,
+        configs=configs,
+        storage=storage,
+        pairing=PairingManager(
+            pyatv_pairing_factory(storage),
+            storage,
+            _emit_session_payload,
+            timeout=options.pairing_timeout,
+        ),
+        deadline=options.request_deadline,
+        selector=options.identifier,
+        breakers=breakers,
+        discovery=DiscoveryOptions(
+            timeout=None,
+            protocol=None,
+            identifier=None,
+            storage_path=options.storage_path,
+            use_storage=options.use_storage,
+        ),
+        capabilities=await CapabilityCache.load(loop, options.storage_path),
+        power=await PowerObservations.load(loop, options.storage_path),
+        artwork=await ArtworkCache.load(
+            loop, options.storage_path, options.artwork_cache_bytes
+        ),
+        apps=await AppCache.load(loop, options.storage_path),
+    )
+
+    context.monitor = ConnectionMonitor(
+        lambda: _probe_connection(context.atv),
+        lambda: _reconnect_session(context, options),
+        context.link_lock,
+        options.heartbeat,
+        options.heartbeat_timeout,
+    )
+    _watch_connection(context)
+    context.monitor.start()
+
+    # Warm the app list so the first app picker opens from the cache.
+    listing = context.apps.lookup(context.config.identifier, _build_number(context.atv))
+    if listing is None or listing.stale:
+        _refresh_apps(context)
+
     try:
-        graceful = await _session_loop(atv)
+        graceful = await _session_loop(context)
     finally:
-        atv.close()
+        if context.touch is not None:
+            await context.touch.close()
+        if context.apps_refresh is not None:
+            context.apps_refresh.cancel()
+            await asyncio.gather(context.apps_refresh, return_exceptions=True)
+        await context.monitor.stop()
+        await context.pairing.close()
+        context.atv.close()
+        await context.power.save(loop)
 
     return 0 if graceful else 1
 
 
-async def _session_loop(atv: AppleTV) -> bool:
+async def _session_loop(context: SessionContext) -> bool:
     loop = asyncio.get_running_loop()
     fatal = False
     while True:
-        line = await loop.run_in_executor(None, sys.stdin.readline)
-        if not line:
+        payload = await _next_session_message(loop)
+        if payload is None:
             break
-
-        message = line.strip()
-        if not message:
-            continue
-
-        try:
-            payload = json.loads(message)
-        except json.JSONDecodeError:
-            _emit_session_payload({"status": "error", "error": "invalid json"})
-            continue
+        if _session_recorder is not None:
+            _session_recorder.inbound(payload)
+        context.messages += 1
 
         msg_type = payload.get("type")
         should_continue = True
         if msg_type == "command":
-            should_continue = await _session_handle_command(atv, payload)
+            should_continue = await _with_request_deadline(
+                context, payload, _session_device_request(context, _session_handle_command, payload)
+            )
         elif msg_type == "power":
-            should_continue = await _session_handle_power(atv, payload)
+            should_continue = await _with_request_deadline(
+                context, payload, _session_device_request(context, _session_handle_power, payload)
+            )
+        elif msg_type == "now_playing":
+            should_continue = await _with_request_deadline(
+                context,
+                payload,
+                _session_device_request(context, _session_handle_now_playing, payload),
+            )
+        elif msg_type == "artwork":
+            should_continue = await _with_request_deadline(
+                context, payload, _session_device_request(context, _session_handle_artwork, payload)
+            )
+        elif msg_type == "touch":
+            _session_handle_touch(context, payload, _send_touch_event)
+        elif msg_type == "apps":
+            should_continue = await _with_request_deadline(
+                context, payload, _session_handle_apps(context, payload)
+            )
+        elif msg_type == "launch_app":
+            should_continue = await _with_request_deadline(
+                context,
+                payload,
+                _session_device_request(context, _session_handle_launch_app, payload),
+            )
+        elif msg_type == "health":
+            should_continue = await _with_request_deadline(
+                context, payload, _session_check_health(context)
+            )
+        elif msg_type == "pair_begin":
+            should_continue = await _with_request_deadline(
+                context, payload, _session_handle_pair_begin(context, payload)
+            )
+        elif msg_type == "pair_pin":
+            should_continue = await _with_request_deadline(
+                context, payload, _session_handle_pair_pin(context, payload)
+            )
+        elif msg_type == "framing":
+            should_continue = _session_handle_framing(payload)
+        elif msg_type == "stats":
+            _session_handle_stats(context)
         elif msg_type == "close":
             _emit_session_payload({"status": "closing"})
             break
         else:
             _emit_session_payload({"status": "error", "error": "unknown message type"})
 
+        if _session_recorder is not None:
+            _session_recorder.handled()
+
         if not should_continue:
             fatal = True
             break
@@ -346,7 +1036,113 @@ async def _session_loop(atv: AppleTV) -> bool:
     return not fatal
 
 
-async def _session_handle_command(atv: AppleTV, payload: dict) -> bool:
+async def _with_request_deadline(
+    context: SessionContext, payload: dict, operation: Awaitable[bool]
+) -> bool:
+    """Run a request handler under its deadline, reporting a ``timeout`` status on expiry."""
+
+    msg_type = payload.get("type")
+    try:
+        seconds = parse_deadline(payload.get("deadline"), context.deadline)
+    except ValueError as exc:
+        operation.close()  # type: ignore[attr-defined]
+        _emit_session_payload({"status": "error", "type": msg_type, "error": str(exc)})
+        return True
+
+    try:
+        async with deadline(seconds):
+            return await operation
+    except DeadlineExceeded as exc:
+        response = {"type": msg_type}
+        response.update(exc.payload())
+        _emit_session_payload(response)
+        if context.monitor is not None and msg_type in _CONNECTION_REQUESTS:
+            # The cancelled call may have left the connection mid-request.
+            context.monitor.connection_lost("request deadline exceeded")
+        return True
+
+
+async def _session_device_request(
+    context: SessionContext,
+    handler: Callable[[SessionContext, dict], Awaitable[bool]],
+    payload: dict,
+) -> bool:
+    assert context.monitor is not None
+    if not context.monitor.healthy and context.breakers is not None:
+        # Fail fast instead of waiting for another reconnect to a device that is gone.
+        try:
+            if context.breakers.check(context.selector):
+                await context.breakers.save(asyncio.get_running_loop())
+        except BreakerOpen as exc:
+            response = {"type": payload.get("type")}
+            response.update(exc.payload())
+            _emit_session_payload(response)
+            return True
+
+    await context.monitor.recover()
+    async with context.link_lock:
+        should_continue = await handler(context, payload)
+    context.monitor.touch()
+    return should_continue
+
+
+async def _session_check_health(context: SessionContext) -> bool:
+    assert context.monitor is not None
+    await context.monitor.check()
+    _session_handle_health(context)
+    return True
+
+
+async def _next_session_message(loop: asyncio.AbstractEventLoop) -> Optional[dict]:
+    """Return the next session request, or ``None`` once input is closed."""
+
+    while True:
+        try:
+            return await loop.run_in_executor(None, _session_channel.read)
+        except ChannelError as exc:
+            _emit_session_payload({"status": "error", "error": str(exc)})
+            if exc.fatal:
+                return None
+
+
+def _session_handle_framing(payload: dict) -> bool:
+    framing = str(payload.get("framing", ""))
+    try:
+        _session_channel.validate(framing)
+    except ChannelError as exc:
+        _emit_session_payload({"status": "error", "type": "framing", "error": str(exc)})
+        return True
+
+    # The acknowledgement is the last message written in the old framing.
+    _emit_session_payload({"status": "ok", "type": "framing", "framing": framing})
+    _session_channel.select(framing)
+    return True
+
+
+def _session_handle_health(context: SessionContext) -> None:
+    response = {"status": "ok", "type": "health"}
+    if context.monitor is None:
+        response.update({"healthy": True, "heartbeat": None, "mock": True})
+    else:
+        response.update(context.monitor.report())
+    _emit_session_payload(response)
+
+
+def _session_handle_stats(context: SessionContext) -> None:
+    _emit_session_payload(
+        {
+            "status": "ok",
+            "type": "stats",
+            "messages": context.messages,
+            "uptime": round(time.monotonic() - context.started, 3),
+            "loop": _session_watchdog.stats() if _session_watchdog is not None else None,
+            "artwork": context.artwork.stats() if context.artwork is not None else None,
+            "touch": context.touch.stats() if context.touch is not None else None,
+        }
+    )
+
+
+async def _session_handle_command(context: SessionContext, payload: dict) -> bool:
     command = payload.get("command")
     action_name = payload.get("action", "SingleTap")
 
@@ -354,9 +1150,13 @@ async def _session_handle_command(atv: AppleTV, payload: dict) -> bool:
         _emit_session_payload({"status": "error", "type": "command", "error": "missing command"})
         return True
 
+    capabilities: Optional[DeviceCapabilities] = None
+    if context.capabilities is not None:
+        capabilities = _device_capabilities(context.capabilities, context.config, context.atv)
+
     try:
         action = _parse_action(action_name)
-        await _invoke_remote(atv, command.lower(), action)
+        await _invoke_remote(context.atv, command.lower(), action, capabilities)
     except ControlError as exc:
         _emit_session_payload(
             {
@@ -366,6 +1166,7 @@ async def _session_handle_command(atv: AppleTV, payload: dict) -> bool:
                 "error": str(exc),
             }
         )
+        await _save_capabilities(context)
         return True
     except PYATV_ERROR as exc:  # pragma: no cover - defensive
         _emit_session_payload(
@@ -387,30 +1188,25 @@ async def _session_handle_command(atv: AppleTV, payload: dict) -> bool:
             "action": action.name,
         }
     )
+    await _save_capabilities(context)
     return True
 
 
-async def _session_handle_power(atv: AppleTV, payload: dict) -> bool:
+async def _save_capabilities(context: SessionContext) -> None:
+    # Written after the reply so learning a path never delays the response.
+    if context.capabilities is not None:
+        await context.capabilities.save(asyncio.get_running_loop())
+
+
+async def _session_handle_power(context: SessionContext, payload: dict) -> bool:
+    atv = context.atv
     action = payload.get("action")
     if not action:
         _emit_session_payload({"status": "error", "type": "power", "error": "missing action"})
         return True
 
-    lower_action = str(action).lower()
     try:
-        power = atv.power
-        if lower_action == "on":
-            await power.turn_on()
-            result = {"power": "on"}
-        elif lower_action == "off":
-            await power.turn_off()
-            result = {"power": "off"}
-        elif lower_action == "status":
-            state = await _resolve_power_state(power)
-            value = state.name if isinstance(state, PowerState) else str(state)
-            result = {"power_state": value}
-        else:
-            raise ControlError(f"unknown power action: {action}")
+        result = await _perform_power(atv, action)
     except ControlError as exc:
         _emit_session_payload(
             {
@@ -436,6 +1232,375 @@ async def _session_handle_power(atv: AppleTV, payload: dict) -> bool:
     response = {"status": "ok", "type": "power"}
     response.update(result)
     _emit_session_payload(response)
+    if context.power is not None:
+        context.power.record(context.config.identifier, _observed_power_state(result))
+        await context.power.save(asyncio.get_running_loop())
+    return True
+
+
+async def _session_handle_now_playing(context: SessionContext, payload: dict) -> bool:
+    try:
+        with span("metadata", request="playing"):
+            playing = await context.atv.metadata.playing()
+    except PYATV_ERROR as exc:
+        _emit_session_payload({"status": "error", "type": "now_playing", "error": str(exc)})
+        return True
+
+    response = {"status": "ok", "type": "now_playing"}
+    response.update(_playing_payload(playing))
+    _emit_session_payload(response)
+    return True
+
+
+def _playing_payload(playing: Any) -> dict:
+    """Return the JSON friendly fields of a ``pyatv.interface.Playing``."""
+
+    payload = {}
+    for name in _PLAYING_FIELDS:
+        value = getattr(playing, name, None)
+        payload[name] = value.name if isinstance(value, Enum) else value
+    return payload
+
+
+async def _session_handle_artwork(context: SessionContext, payload: dict) -> bool:
+    """Serve artwork for what is playing from the artwork cache.
+
+    A cached image of the requested size is a hit; otherwise it is resized
+    from a larger cached image, or fetched from the device and cached.
+    Responses carry the cache file ``path``, plus base64 ``data`` when the
+    request sets ``inline``.
+    """
+
+    assert context.artwork is not None
+    loop = asyncio.get_running_loop()
+    try:
+        width = _artwork_dimension(payload, "width", _DEFAULT_ARTWORK_WIDTH)
+        height = _artwork_dimension(payload, "height", None)
+    except ValueError as exc:
+        _emit_session_payload({"status": "error", "type": "artwork", "error": str(exc)})
+        return True
+
+    metadata = context.atv.metadata
+    try:
+        artwork_id = await _artwork_id(metadata)
+        outcome = HIT
+        entry = context.artwork.lookup(artwork_id, width, height) if artwork_id else None
+        if entry is None and artwork_id:
+            outcome = RESIZED
+            entry = await context.artwork.resize(loop, artwork_id, width, height)
+        if entry is None:
+            outcome = MISS
+            entry = await _fetch_artwork(context.artwork, metadata, artwork_id, width, height)
+    except PYATV_ERROR as exc:
+        _emit_session_payload({"status": "error", "type": "artwork", "error": str(exc)})
+        return True
+
+    response: dict = {"status": "ok", "type": "artwork", "available": entry is not None}
+    if entry is not None:
+        response.update(entry.payload())
+        response.update({"artwork_id": artwork_id, "cache": outcome})
+        if payload.get("inline"):
+            data = await loop.run_in_executor(None, entry.path.read_bytes)
+            response["data"] = base64.b64encode(data).decode("ascii")
+    _emit_session_payload(response)
+    await context.artwork.save(loop)
+    return True
+
+
+def _artwork_dimension(payload: dict, name: str, default: Optional[int]) -> Optional[int]:
+    value = payload.get(name, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ValueError(f"{name} must be a positive integer")
+    return value
+
+
+async def _artwork_id(metadata: Any) -> Optional[str]:
+    """Return the identifier of the current artwork, preferring the cached property."""
+
+    try:
+        return metadata.artwork_id or None
+    except (AttributeError, pyatv_exceptions.NotSupportedError):
+        playing = await metadata.playing()
+        return getattr(playing, "hash", None)
+
+
+async def _fetch_artwork(
+    cache: ArtworkCache,
+    metadata: Any,
+    artwork_id: Optional[str],
+    width: Optional[int],
+    height: Optional[int],
+) -> Optional[ArtworkEntry]:
+    with span("metadata", request="artwork", width=width, height=height):
+        artwork = await metadata.artwork(width=width, height=height)
+    if artwork is None or not artwork.bytes:
+        return None
+    return await cache.store(
+        asyncio.get_running_loop(),
+        artwork_id,
+        width,
+        height,
+        artwork.bytes,
+        artwork.mimetype,
+        artwork.width,
+        artwork.height,
+    )
+
+
+def _session_handle_touch(
+    context: SessionContext,
+    payload: dict,
+    send: Callable[[SessionContext, dict], Awaitable[None]],
+) -> None:
+    """Queue touch events without waiting for the device.
+
+    A message carries one event, or a batch under ``events``. Only malformed
+    events and gesture ends (``up``, ``swipe``, ``click``) are answered; see
+    ``gestures.GestureStream``.
+    """
+
+    if context.touch is None:
+        context.touch = GestureStream(lambda event: send(context, event), _emit_session_payload)
+
+    events = payload.get("events")
+    if events is None:
+        events = [payload]
+    elif not isinstance(events, list):
+        _emit_session_payload(
+            {"status": "error", "type": "touch", "error": "events must be a list"}
+        )
+        return
+
+    for event in events:
+        try:
+            context.touch.submit(event if isinstance(event, dict) else {})
+        except ValueError as exc:
+            _emit_session_payload({"status": "error", "type": "touch", "error": str(exc)})
+
+
+async def _send_touch_event(context: SessionContext, event: dict) -> None:
+    assert context.monitor is not None
+    async with context.link_lock:
+        touch = getattr(context.atv, "touch", None)
+        if touch is None:
+            raise ControlError("touch gestures not supported")
+        kind = event["event"]
+        if kind == "swipe":
+            await touch.swipe(
+                event["start_x"],
+                event["start_y"],
+                event["end_x"],
+                event["end_y"],
+                event["duration_ms"],
+            )
+        elif kind == "click":
+            await touch.click(_parse_action(event["action"]))
+        else:
+            await touch.action(event["x"], event["y"], _TOUCH_MODES[kind])
+    context.monitor.touch()
+
+
+async def _send_mock_touch_event(context: SessionContext, event: dict) -> None:
+    if event["event"] == "click":
+        _parse_action(event["action"])
+
+
+async def _session_handle_apps(context: SessionContext, payload: dict) -> bool:
+    """List installed apps from the app cache.
+
+    A fresh list is a ``hit``; a list older than ``APP_LIST_TTL`` is served
+    as ``stale`` while it is refreshed in the background; without a list (or
+    with ``"refresh": true``) it is fetched now, a ``miss``.
+    """
+
+    assert context.apps is not None
+    listing = context.apps.lookup(context.config.identifier, _build_number(context.atv))
+    if listing is None or payload.get("refresh"):
+        outcome = "miss"
+        try:
+            listing = await asyncio.shield(_refresh_apps(context, force=bool(listing)))
+        except (ControlError, PYATV_ERROR) as exc:
+            _emit_session_payload({"status": "error", "type": "apps", "error": str(exc)})
+            return True
+    elif listing.stale:
+        outcome = "stale"
+        _refresh_apps(context)
+    else:
+        outcome = "hit"
+
+    _emit_session_payload(
+        {
+            "status": "ok",
+            "type": "apps",
+            "apps": listing.apps,
+            "cache": outcome,
+            "age": round(listing.age, 3),
+        }
+    )
+    return True
+
+
+def _refresh_apps(context: SessionContext, force: bool = False) -> asyncio.Task:
+    """Return the app list fetch in flight, starting one if there is none.
+
+    With *force* a fetch is started even when one is in flight, since that one
+    may predate the change the caller wants to see.
+    """
+
+    task = context.apps_refresh
+    if task is None or task.done() or force:
+        task = asyncio.get_running_loop().create_task(_fetch_apps(context), name="apps")
+        # Background failures are retried by the next request; do not report them as unhandled.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        context.apps_refresh = task
+    return task
+
+
+async def _fetch_apps(context: SessionContext) -> AppList:
+    assert context.apps is not None
+    if context.monitor is not None:
+        await context.monitor.recover()
+
+    async with context.link_lock:
+        apps = getattr(context.atv, "apps", None)
+        if apps is None:
+            raise ControlError("app list not supported")
+        with span("apps", request="list"):
+            try:
+                installed = await apps.app_list()
+            except pyatv_exceptions.NotSupportedError as exc:
+                raise ControlError("app list not supported") from exc
+        listing = context.apps.store(
+            context.config.identifier, _build_number(context.atv), installed
+        )
+    if context.monitor is not None:
+        context.monitor.touch()
+    await context.apps.save(asyncio.get_running_loop())
+    return listing
+
+
+async def _session_handle_launch_app(context: SessionContext, payload: dict) -> bool:
+    """Launch an app by bundle identifier, URL or name, resolved from the cached list."""
+
+    app = payload.get("app")
+    if not app:
+        _emit_session_payload({"status": "error", "type": "launch_app", "error": "missing app"})
+        return True
+
+    target = _resolve_app(context, str(app))
+    if target is None:
+        _emit_session_payload(
+            {
+                "status": "error",
+                "type": "launch_app",
+                "app": app,
+                "error": "unknown app; request apps to refresh the list",
+            }
+        )
+        return True
+
+    apps = getattr(context.atv, "apps", None)
+    try:
+        if apps is None:
+            raise ControlError("launching apps not supported")
+        with span("apps", request="launch"):
+            await apps.launch_app(target)
+    except (ControlError, PYATV_ERROR) as exc:
+        _emit_session_payload(
+            {"status": "error", "type": "launch_app", "app": app, "error": str(exc)}
+        )
+        return True
+
+    _emit_session_payload({"status": "ok", "type": "launch_app", "app": target})
+    return True
+
+
+def _resolve_app(context: SessionContext, app: str) -> Optional[str]:
+    """Return what to pass to ``launch_app`` for *app*, without fetching the app list."""
+
+    if "://" in app:
+        return app
+
+    listing = None
+    if context.apps is not None:
+        listing = context.apps.lookup(context.config.identifier, _build_number(context.atv))
+    if listing is not None:
+        bundle_id = listing.bundle_id(app)
+        if bundle_id is not None:
+            return bundle_id
+    # Unknown names cannot be launched, but a bundle identifier can be tried as given.
+    return app if "." in app else None
+
+
+async def _session_handle_pair_begin(context: SessionContext, payload: dict) -> bool:
+    protocol = payload.get("protocol")
+    if not protocol:
+        _emit_session_payload(
+            {"status": "error", "type": "pair_begin", "error": "missing protocol"}
+        )
+        return True
+
+    identifier = payload.get("identifier")
+    config = context.config
+    if identifier:
+        config = select_config(context.configs, str(identifier))
+        if config is None and context.discovery is not None:
+            # The session scan only looked for its own target.
+            try:
+                found = await scan_configs(
+                    replace(context.discovery, target=str(identifier)), storage=context.storage
+                )
+            except (PYATV_ERROR, OSError) as exc:
+                _emit_session_payload(
+                    {"status": "error", "type": "pair_begin", "error": str(exc) or "scan failed"}
+                )
+                return True
+            config = select_config(found, str(identifier))
+            if config is not None:
+                context.configs.append(config)
+        if config is None and context.atv is None:
+            config = SimpleNamespace(identifier=str(identifier))
+
+    if config is None:
+        _emit_session_payload(
+            {"status": "error", "type": "pair_begin", "error": "device not found"}
+        )
+        return True
+
+    try:
+        result = await context.pairing.begin(config, str(protocol))
+    except PairingError as exc:
+        _emit_session_payload({"status": "error", "type": "pair_begin", "error": str(exc)})
+        return True
+
+    response = {"type": "pair_begin"}
+    response.update(result)
+    _emit_session_payload(response)
+    return True
+
+
+async def _session_handle_pair_pin(context: SessionContext, payload: dict) -> bool:
+    handle = payload.get("handle")
+    pin = payload.get("pin")
+    if not handle or not pin:
+        _emit_session_payload(
+            {"status": "error", "type": "pair_pin", "error": "missing handle or pin"}
+        )
+        return True
+
+    try:
+        result = await context.pairing.submit_pin(str(handle), str(pin))
+    except PairingError as exc:
+        _emit_session_payload(
+            {"status": "error", "type": "pair_pin", "handle": handle, "error": str(exc)}
+        )
+        return True
+
+    response = {"type": "pair_pin"}
+    response.update(result)
+    _emit_session_payload(response)
     return True
 
 
@@ -465,31 +1630,49 @@ async def _resolve_power_state(power: Any) -> Any:
 
 
 async def _run_mock_session(options: SessionOptions) -> None:
-    loop = asyncio.get_running_loop()
-    power_state = "off"
+    _session_channel.select(JSON_FRAMING)
+    context = SessionContext(
+        atv=None,
+        config=SimpleNamespace(identifier=options.identifier),
+        configs=[],
+        storage=None,
+        pairing=PairingManager(
+            mock_pairing_factory,
+            None,
+            _emit_session_payload,
+            timeout=options.pairing_timeout,
+        ),
+        deadline=options.request_deadline,
+    )
 
     _emit_session_payload(
         {
             "status": "ready",
             "identifier": options.identifier,
+            "framings": available_framings(),
             "mock": True,
         }
     )
 
-    while True:
-        line = await loop.run_in_executor(None, sys.stdin.readline)
-        if not line:
-            break
+    try:
+        await _mock_session_loop(context)
+    finally:
+        if context.touch is not None:
+            await context.touch.close()
+        await context.pairing.close()
 
-        message = line.strip()
-        if not message:
-            continue
 
-        try:
-            payload = json.loads(message)
-        except json.JSONDecodeError:
-            _emit_session_payload({"status": "error", "error": "invalid json"})
-            continue
+async def _mock_session_loop(context: SessionContext) -> None:
+    loop = asyncio.get_running_loop()
+    power_state = "off"
+
+    while True:
+        payload = await _next_session_message(loop)
+        if payload is None:
+            break
+        if _session_recorder is not None:
+            _session_recorder.inbound(payload)
+        context.messages += 1
 
         msg_type = payload.get("type")
         if msg_type == "command":
@@ -517,12 +1700,50 @@ async def _run_mock_session(options: SessionOptions) -> None:
             result = {"status": "ok", "type": "power"}
             result.update(response)
             _emit_session_payload(result)
+        elif msg_type == "pair_begin":
+            await _with_request_deadline(
+                context, payload, _session_handle_pair_begin(context, payload)
+            )
+        elif msg_type == "pair_pin":
+            await _with_request_deadline(
+                context, payload, _session_handle_pair_pin(context, payload)
+            )
+        elif msg_type == "framing":
+            _session_handle_framing(payload)
+        elif msg_type == "now_playing":
+            response = {"status": "ok", "type": "now_playing"}
+            response.update(_playing_payload(SimpleNamespace(device_state=DeviceState.Idle)))
+            response["mock"] = True
+            _emit_session_payload(response)
+        elif msg_type == "artwork":
+            _emit_session_payload(
+                {"status": "ok", "type": "artwork", "available": False, "mock": True}
+            )
+        elif msg_type == "touch":
+            _session_handle_touch(context, payload, _send_mock_touch_event)
+        elif msg_type == "apps":
+            _emit_session_payload(
+                {"status": "ok", "type": "apps", "apps": MOCK_APPS, "cache": "hit", "mock": True}
+            )
+        elif msg_type == "launch_app":
+            _emit_session_payload(
+                {"status": "ok", "type": "launch_app", "app": payload.get("app"), "mock": True}
+            )
+        elif msg_type == "health":
+            _session_handle_health(context)
+        elif msg_type == "stats":
+            _session_handle_stats(context)
         elif msg_type == "close":
             _emit_session_payload({"status": "closing", "mock": True})
             break
         else:
             _emit_session_payload({"status": "error", "error": "unknown message type"})
 
+        if _session_recorder is not None:
+            _session_recorder.handled()
+
 
 def _emit_session_payload(payload: dict) -> None:
-    print(json.dumps(payload, separators=(",", ":")), flush=True)
+    if _session_recorder is not None:
+        _session_recorder.outbound(payload)
+    _session_channel.send(payload)
@@ -0,0 +1,52 @@
+"""Request deadlines enforced by cancellation.
+
+``deadline(seconds)`` cancels the enclosed work once *seconds* have passed
+and raises ``DeadlineExceeded`` instead of ``TimeoutError``, so a deadline is
+never confused with a timeout raised by pyatv itself. Cancellation unwinds
+the ``finally`` blocks that close connections and pairing handlers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs past its deadline."""
+
+    def __init__(self, seconds: float) -> None:
+        super().__init__(f"deadline exceeded after {seconds:g}s")
+        self.seconds = seconds
+
+    def payload(self) -> Dict[str, Any]:
+        return {"status": "timeout", "error": "deadline exceeded", "deadline": self.seconds}
+
+
+@contextlib.asynccontextmanager
+async def deadline(seconds: Optional[float]) -> AsyncIterator[None]:
+    """Cancel the enclosed block after *seconds*; ``None`` means no deadline."""
+
+    if seconds is None:
+        yield
+        return
+
+    scope = asyncio.timeout(seconds)
+    try:
+        async with scope:
+            yield
+    except TimeoutError as exc:
+        if scope.expired():
+            raise DeadlineExceeded(seconds) from exc
+        raise
+
+
+def parse_deadline(value: Any, default: Optional[float]) -> Optional[float]:
+    """Return the deadline requested by a message field, or *default* when absent."""
+
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError("deadline must be a positive number of seconds")
+    return float(value)
@@ -2,14 +2,24 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+import fnmatch
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-from pyatv.interface import BaseConfig
+from .tracing import span
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pyatv.interface import BaseConfig
 
 
 def select_config(configs: List[BaseConfig], identifier: str) -> Optional[BaseConfig]:
     """Find a configuration matching identifier/name/address."""
 
+    with span("select", identifier=identifier):
+        return _find_config(configs, identifier)
+
+
+def _find_config(configs: List[BaseConfig], identifier: str) -> Optional[BaseConfig]:
     target = identifier.lower()
     for config in configs:
         if config.identifier and config.identifier.lower() == target:
@@ -30,3 +40,75 @@ def select_config(configs: List[BaseConfig], identifier: str) -> Optional[BaseCo
             continue
 
     return None
+
+
+@dataclass
+class DeviceSelector:
+    """Selects several devices from one set of discovery results.
+
+    ``name`` and ``model`` are case-insensitive glob patterns; ``model`` is
+    matched against both the model enum name and the human readable model.
+    """
+
+    identifiers: List[str] = field(default_factory=list)
+    all_devices: bool = False
+    name: Optional[str] = None
+    model: Optional[str] = None
+
+    @property
+    def is_single(self) -> bool:
+        """Return True when the selector names exactly one device and nothing else."""
+
+        return (
+            len(self.identifiers) == 1
+            and not self.all_devices
+            and self.name is None
+            and self.model is None
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.identifiers or self.all_devices or self.name or self.model)
+
+
+def select_configs(
+    configs: List[BaseConfig], selector: DeviceSelector
+) -> Tuple[List[BaseConfig], List[str]]:
+    """Return configurations matching *selector* and the identifiers that matched nothing.
+
+    Explicit identifiers are resolved with ``select_config``; the pattern
+    filters then narrow down (or, with ``all_devices``, select from) every config.
+    """
+
+    selected: List[BaseConfig] = []
+    missing: List[str] = []
+
+    for identifier in selector.identifiers:
+        config = select_config(configs, identifier)
+        if config is None:
+            missing.append(identifier)
+        elif config not in selected:
+            selected.append(config)
+
+    if selector.all_devices or selector.name or selector.model:
+        candidates = selected if selector.identifiers else list(configs)
+        selected = [config for config in candidates if _matches_patterns(config, selector)]
+
+    return selected, missing
+
+
+def _matches_patterns(config: BaseConfig, selector: DeviceSelector) -> bool:
+    if selector.name is not None:
+        name = getattr(config, "name", None) or ""
+        if not fnmatch.fnmatch(name.lower(), selector.name.lower()):
+            return False
+
+    if selector.model is not None:
+        info = getattr(config, "device_info", None)
+        model = getattr(getattr(info, "model", None), "name", None)
+        candidates = [value for value in (model, getattr(info, "model_str", None)) if value]
+        pattern = selector.model.lower()
+        if not any(fnmatch.fnmatch(value.lower(), pattern) for value in candidates):
+            return False
+
+    return True
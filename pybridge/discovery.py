@@ -3,30 +3,66 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import ipaddress
+import math
+import time
+from dataclasses import dataclass, field
+from typing import AbstractSet, Any, Dict, List, Optional, Tuple
 
 from pyatv import scan
 from pyatv.const import Protocol
 from pyatv.interface import BaseConfig
 from pyatv.interface import Storage
 
+from .breaker import BreakerPolicy, CircuitBreakers
+from .constants import DEFAULT_TIMEOUT, MIN_TIMEOUT
+from .device_lookup import select_config
+from .mock import MOCK_DEVICES, mock_devices  # noqa: F401 - re-exported
 from .storage import load_storage
+from .telemetry import ScanTelemetry
+from .tracing import span
 
 # Type alias for JSON-friendly payloads
 DiscoveryPayload = Dict[str, Any]
 
+MULTICAST_PATH = "multicast"
+# Upper bound on hosts probed for one scan path (a /22) and probed at once.
+MAX_PATH_HOSTS = 1022
+MAX_CONCURRENT_HOSTS = 64
+
 
 @dataclass
 class DiscoveryOptions:
-    """User-specified options for discovery."""
-
-    timeout: float = 5.0
+    """User-specified options for discovery.
+
+    A ``timeout`` of ``None`` selects the adaptive timeout learned from
+    previous scans. ``target`` is a selector (identifier, name or address)
+    for the device the caller is about to look up; when the device has been
+    seen before the scan stops as soon as it answers. ``paths`` lists scan
+    paths (see ``scan_paths``) that are scanned concurrently and merged.
+    ``fields`` restricts device payloads to those top-level keys (see
+    ``SCAN_FIELDS``); ``None`` returns every key. Without ``use_storage`` no
+    bridge state (scan telemetry, breakers) is read or written either.
+    """
+
+    timeout: Optional[float] = DEFAULT_TIMEOUT
     protocol: Optional[str] = None
     identifier: Optional[str] = None
     storage_path: Optional[str] = None
     use_storage: bool = True
+    target: Optional[str] = None
+    paths: List[str] = field(default_factory=list)
+    fields: Optional[List[str]] = None
+
+
+@dataclass
+class PathTiming:
+    """Timing of a single scan path."""
+
+    path: str
+    elapsed: float
+    devices: int
+    hosts: Optional[int] = None
 
 
 async def discover_devices(options: DiscoveryOptions) -> List[DiscoveryPayload]:
@@ -39,8 +75,48 @@ async def discover_devices(options: DiscoveryOptions) -> List[DiscoveryPayload]:
         storage = await load_storage(loop, options.storage_path)
 
     configs = await scan_configs(options, storage=storage)
+    await _feed_breakers(loop, options, configs)
 
-    return [_config_to_payload(config) for config in configs]
+    fields = _field_set(options.fields)
+    return [_config_to_payload(config, fields) for config in configs]
+
+
+async def discover_paths(
+    options: DiscoveryOptions,
+) -> Tuple[List[DiscoveryPayload], List[PathTiming]]:
+    """Scan ``options.paths`` concurrently and return merged payloads and per-path timing.
+
+    Each payload carries the ``path`` and ``latency`` of the answer that won the merge
+    (``None`` for a multicast answer, see ``scan_paths``).
+    """
+
+    loop = asyncio.get_running_loop()
+
+    storage = None
+    if options.use_storage:
+        storage = await load_storage(loop, options.storage_path)
+
+    merged, timings = await scan_paths(options, storage=storage)
+    await _feed_breakers(loop, options, [config for config, _, _ in merged])
+
+    fields = _field_set(options.fields)
+    payloads = []
+    for config, path, latency in merged:
+        payload = _config_to_payload(config, fields)
+        if fields is None or "path" in fields:
+            payload["path"] = path
+        if fields is None or "latency" in fields:
+            payload["latency"] = None if latency is None else round(latency, 4)
+        payloads.append(payload)
+    return payloads, timings
+
+
+async def scan_statistics(options: DiscoveryOptions) -> Dict[str, Any]:
+    """Return the recorded discovery telemetry."""
+
+    loop = asyncio.get_running_loop()
+    telemetry = await _load_telemetry(loop, options)
+    return telemetry.summary()
 
 
 async def scan_configs(
@@ -63,30 +139,372 @@ async def scan_configs(
         except KeyError as exc:
             raise ValueError(f"unknown protocol: {options.protocol}") from exc
 
-    timeout = max(1, int(round(options.timeout)))
+    if options.paths:
+        merged, _ = await scan_paths(options, storage=storage_to_use)
+        return [config for config, _, _ in merged]
+
+    telemetry = await _load_telemetry(loop, options)
+
+    try:
+        if options.target and not identifier:
+            configs = await _targeted_scan(
+                loop, options, telemetry, protocol, storage_to_use
+            )
+            if configs is not None:
+                return configs
+
+        if options.timeout is not None:
+            timeout = max(MIN_TIMEOUT, float(options.timeout))
+        elif options.target:
+            # The target was not found by a learned scan; do not risk missing it twice.
+            timeout = DEFAULT_TIMEOUT
+        else:
+            timeout = telemetry.adaptive_timeout()
+
+        started = time.monotonic()
+        with span("scan", timeout=timeout, targeted=False):
+            configs = await scan(
+                loop,
+                timeout=timeout,
+                identifier=identifier,
+                protocol=protocol,
+                storage=storage_to_use,
+            )
+        elapsed = time.monotonic() - started
+
+        for config in configs:
+            if identifier:
+                telemetry.record_arrival(config, elapsed)
+            else:
+                telemetry.register(config)
+        if not identifier:
+            telemetry.record_sweep(timeout, elapsed, len(configs))
+    finally:
+        await telemetry.save(loop)
+
+    return configs
+
+
+async def _targeted_scan(
+    loop: asyncio.AbstractEventLoop,
+    options: DiscoveryOptions,
+    telemetry: ScanTelemetry,
+    protocol: Optional[Protocol],
+    storage: Optional[Storage],
+) -> Optional[List[BaseConfig]]:
+    """Scan for a previously seen device, returning ``None`` when it did not answer."""
+
+    main_identifier = telemetry.lookup(options.target)
+    if main_identifier is None:
+        return None
+
+    timeout = telemetry.adaptive_timeout(main_identifier)
+    if options.timeout is not None:
+        timeout = min(timeout, max(MIN_TIMEOUT, float(options.timeout)))
+
+    started = time.monotonic()
+    with span("scan", timeout=timeout, targeted=True):
+        configs = await scan(
+            loop,
+            timeout=timeout,
+            identifier=telemetry.identifiers(main_identifier),
+            protocol=protocol,
+            storage=storage,
+        )
+    elapsed = time.monotonic() - started
+
+    if select_config(configs, options.target) is None:
+        return None
+
+    for config in configs:
+        telemetry.record_arrival(config, elapsed)
+    return configs
+
+
+async def scan_host(
+    host: str,
+    identifiers: AbstractSet[str],
+    timeout: float,
+    storage: Optional[Storage] = None,
+) -> Optional[BaseConfig]:
+    """Unicast-scan *host* for the device with one of *identifiers*.
+
+    Asking the address directly also reaches (and nudges) a device in deep
+    sleep that multicast discovery answers slowly or only partly.
+    """
 
-    return await scan(
-        loop,
-        timeout=timeout,
-        identifier=identifier,
-        protocol=protocol,
-        storage=storage_to_use,
-    )
+    loop = asyncio.get_running_loop()
+    with span("scan", timeout=timeout, host=host):
+        configs = await scan(
+            loop,
+            timeout=max(MIN_TIMEOUT, timeout),
+            identifier=set(identifiers),
+            hosts=[host],
+            storage=storage,
+        )
+    for config in configs:
+        if identifiers & set(config.all_identifiers):
+            return config
+    return None
+
+
+async def locate_known_device(
+    options: DiscoveryOptions, storage: Optional[Storage] = None
+) -> Optional[BaseConfig]:
+    """Find ``options.target`` at the address recorded by earlier scans.
 
+    Returns ``None`` when the device was never seen or did not answer there.
+    """
 
-def _config_to_payload(config: BaseConfig) -> DiscoveryPayload:
-    """Convert a ``pyatv`` configuration to plain JSON data."""
+    loop = asyncio.get_running_loop()
+    telemetry = await _load_telemetry(loop, options)
+    main_identifier = telemetry.lookup(options.target or "")
+    if main_identifier is None:
+        return None
+    address = telemetry.devices[main_identifier].get("address")
+    if not address:
+        return None
+
+    timeout = telemetry.adaptive_timeout(main_identifier)
+    if options.timeout is not None:
+        timeout = min(timeout, float(options.timeout))
+    return await scan_host(address, telemetry.identifiers(main_identifier), timeout, storage)
 
-    info = config.device_info
 
-    payload: DiscoveryPayload = {
-        "name": config.name,
-        "address": str(config.address),
-        "model": info.model_str,
-        "deep_sleep": config.deep_sleep,
-        "identifiers": config.all_identifiers,
-        "main_identifier": config.identifier,
-        "device_info": {
+async def scan_paths(
+    options: DiscoveryOptions, storage: Optional[Storage] = None
+) -> Tuple[List[Tuple[BaseConfig, str, Optional[float]]], List[PathTiming]]:
+    """Scan several network paths concurrently and merge the results.
+
+    A path is ``multicast``, a local interface name (its IPv4 network is
+    probed), a CIDR range or a comma separated list of addresses. Range and
+    address paths are probed with one unicast scan per host so each answer
+    carries its own latency; the per-host timeout is shortened so the whole
+    path fits in the scan timeout. ``pyatv.scan`` only reports multicast
+    answers once the sweep ends, so they carry no latency (``None``).
+    Devices seen on several paths are deduplicated by main identifier,
+    keeping the lowest measured latency and a multicast answer only when no
+    unicast path saw the device.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    protocol = None
+    if options.protocol:
+        try:
+            protocol = Protocol[options.protocol]
+        except KeyError as exc:
+            raise ValueError(f"unknown protocol: {options.protocol}") from exc
+
+    resolved = [(path, _resolve_path_hosts(path)) for path in options.paths]
+
+    telemetry = await _load_telemetry(loop, options)
+    if options.timeout is None:
+        timeout = telemetry.adaptive_timeout()
+    else:
+        timeout = max(MIN_TIMEOUT, float(options.timeout))
+
+    async def _scan_host(
+        host: str, host_timeout: float, semaphore: asyncio.Semaphore
+    ) -> List[Tuple[BaseConfig, Optional[float]]]:
+        async with semaphore:
+            started = time.monotonic()
+            with span("scan", timeout=host_timeout, host=host):
+                configs = await scan(
+                    loop,
+                    timeout=host_timeout,
+                    identifier=options.identifier,
+                    protocol=protocol,
+                    hosts=[host],
+                    storage=storage,
+                )
+            return [(config, time.monotonic() - started) for config in configs]
+
+    async def _scan_path(
+        path: str, hosts: Optional[List[str]]
+    ) -> Tuple[List[Tuple[BaseConfig, Optional[float]]], PathTiming]:
+        started = time.monotonic()
+        if hosts is None:
+            with span("scan", timeout=timeout, path=path):
+                configs = await scan(
+                    loop,
+                    timeout=timeout,
+                    identifier=options.identifier,
+                    protocol=protocol,
+                    storage=storage,
+                )
+            elapsed = time.monotonic() - started
+            found: List[Tuple[BaseConfig, Optional[float]]] = [
+                (config, None) for config in configs
+            ]
+        else:
+            host_timeout, concurrency = _host_plan(timeout, len(hosts))
+            semaphore = asyncio.Semaphore(concurrency)
+            per_host = await asyncio.gather(
+                *[_scan_host(host, host_timeout, semaphore) for host in hosts]
+            )
+            found = [item for answers in per_host for item in answers]
+            elapsed = time.monotonic() - started
+
+        timing = PathTiming(
+            path=path,
+            elapsed=round(elapsed, 4),
+            devices=len(found),
+            hosts=None if hosts is None else len(hosts),
+        )
+        return found, timing
+
+    try:
+        results = await asyncio.gather(
+            *[_scan_path(path, hosts) for path, hosts in resolved]
+        )
+
+        best: Dict[str, Tuple[BaseConfig, str, Optional[float]]] = {}
+        for (path, _), (found, _) in zip(resolved, results):
+            for config, latency in found:
+                if latency is None:
+                    telemetry.register(config)
+                else:
+                    telemetry.record_arrival(config, latency)
+
+                current = best.get(config.identifier)
+                if current is None or _faster(latency, current[2]):
+                    best[config.identifier] = (config, path, latency)
+    finally:
+        await telemetry.save(loop)
+
+    return list(best.values()), [timing for _, timing in results]
+
+
+def _host_plan(timeout: float, hosts: int) -> Tuple[float, int]:
+    """Return the per-host timeout and concurrency that sweep *hosts* within *timeout*.
+
+    Hosts are probed ``MAX_CONCURRENT_HOSTS`` at a time, so a /24 takes four
+    rounds; a device that is up answers a unicast query well within
+    ``MIN_TIMEOUT``, which bounds the shortening. When that floor would push
+    the sweep past *timeout* (a /22 needs sixteen rounds), fewer, wider rounds
+    are used instead.
+    """
+
+    rounds = max(1, math.ceil(hosts / MAX_CONCURRENT_HOSTS))
+    rounds = max(1, min(rounds, math.floor(timeout / MIN_TIMEOUT)))
+    return timeout / rounds, max(1, math.ceil(hosts / rounds))
+
+
+def _faster(latency: Optional[float], other: Optional[float]) -> bool:
+    """Return whether *latency* beats *other*; a measured latency beats none."""
+
+    if latency is None:
+        return False
+    return other is None or latency < other
+
+
+async def _load_telemetry(
+    loop: asyncio.AbstractEventLoop, options: DiscoveryOptions
+) -> ScanTelemetry:
+    """Load the scan telemetry; with storage disabled it is kept in memory only."""
+
+    if not options.use_storage:
+        return ScanTelemetry()
+    return await ScanTelemetry.load(loop, options.storage_path)
+
+
+async def _feed_breakers(
+    loop: asyncio.AbstractEventLoop, options: DiscoveryOptions, configs: List[BaseConfig]
+) -> None:
+    """Let devices that answered a scan be probed even if their breaker is open."""
+
+    if not options.use_storage:
+        return
+
+    breakers = await CircuitBreakers.load(
+        loop, options.storage_path, BreakerPolicy(threshold=0)
+    )
+    if breakers.observe(configs):
+        await breakers.save(loop)
+
+
+def _resolve_path_hosts(path: str) -> Optional[List[str]]:
+    """Return the unicast hosts of a scan path, or ``None`` for multicast."""
+
+    value = path.strip()
+    if value.lower() == MULTICAST_PATH:
+        return None
+
+    if "/" not in value and "," not in value:
+        network = _interface_network(value)
+        if network is not None:
+            value = network
+
+    try:
+        if "/" in value:
+            network = ipaddress.IPv4Network(value, strict=False)
+            if network.num_addresses > MAX_PATH_HOSTS + 2:
+                raise ValueError(f"scan path too large: {path}")
+            hosts = [str(host) for host in network.hosts()] or [str(network.network_address)]
+        else:
+            hosts = [
+                str(ipaddress.IPv4Address(item.strip()))
+                for item in value.split(",")
+                if item.strip()
+            ]
+    except ipaddress.AddressValueError as exc:
+        raise ValueError(f"invalid scan path: {path}") from exc
+    except ipaddress.NetmaskValueError as exc:
+        raise ValueError(f"invalid scan path: {path}") from exc
+
+    if not hosts:
+        raise ValueError(f"invalid scan path: {path}")
+    return hosts
+
+
+def _interface_network(name: str) -> Optional[str]:
+    """Return the IPv4 network (CIDR) of local interface *name*, if it exists."""
+
+    import ifaddr  # pyatv dependency; only needed for interface paths
+
+    for adapter in ifaddr.get_adapters():
+        if name not in (adapter.name, adapter.nice_name):
+            continue
+        for address in adapter.ips:
+            if isinstance(address.ip, str):
+                return f"{address.ip}/{address.network_prefix}"
+    return None
+
+
+def _field_set(fields: Optional[List[str]]) -> Optional[AbstractSet[str]]:
+    return None if fields is None else frozenset(fields)
+
+
+def _config_to_payload(
+    config: BaseConfig, fields: Optional[AbstractSet[str]] = None
+) -> DiscoveryPayload:
+    """Convert a ``pyatv`` configuration to plain JSON data.
+
+    When *fields* is given only those keys are built, so callers that do not
+    need ``device_info`` or ``protocols`` skip the per-service work entirely.
+    """
+
+    def wanted(name: str) -> bool:
+        return fields is None or name in fields
+
+    info = config.device_info if wanted("model") or wanted("device_info") else None
+    payload: DiscoveryPayload = {}
+
+    if wanted("name"):
+        payload["name"] = config.name
+    if wanted("address"):
+        payload["address"] = str(config.address)
+    if wanted("model"):
+        payload["model"] = info.model_str
+    if wanted("deep_sleep"):
+        payload["deep_sleep"] = config.deep_sleep
+    if wanted("identifiers"):
+        payload["identifiers"] = config.all_identifiers
+    if wanted("main_identifier"):
+        payload["main_identifier"] = config.identifier
+    if wanted("device_info"):
+        payload["device_info"] = {
             "operating_system": info.operating_system.name,
             "version": info.version,
             "build_number": info.build_number,
@@ -94,8 +512,9 @@ def _config_to_payload(config: BaseConfig) -> DiscoveryPayload:
             "model_str": info.model_str,
             "raw_model": info.raw_model,
             "mac": info.mac,
-        },
-        "protocols": [
+        }
+    if wanted("protocols"):
+        payload["protocols"] = [
             {
                 "protocol": service.protocol.name,
                 "identifier": service.identifier,
@@ -107,56 +526,6 @@ def _config_to_payload(config: BaseConfig) -> DiscoveryPayload:
                 "enabled": service.enabled,
             }
             for service in config.services
-        ],
-    }
+        ]
 
     return payload
-
-
-MOCK_DEVICES: List[DiscoveryPayload] = [
-    {
-        "name": "Living Room",
-        "address": "10.0.0.10",
-        "deep_sleep": False,
-        "identifiers": ["00:11:22:33:44:55", "11223344-5566-7788-9900-112233445566"],
-        "main_identifier": "11223344-5566-7788-9900-112233445566",
-        "device_info": {
-            "operating_system": "TvOS",
-            "version": "17.5",
-            "build_number": "21L570",
-            "model": "AppleTV4KGen3",
-            "model_str": "Apple TV 4K (3rd generation)",
-            "raw_model": None,
-            "mac": "aa:bb:cc:dd:ee:ff",
-        },
-        "protocols": [
-            {
-                "protocol": "Companion",
-                "identifier": "11223344-5566-7788-9900-112233445566",
-                "port": 49153,
-                "requires_password": False,
-                "pairing": "Mandatory",
-                "credentials_present": True,
-                "password_present": False,
-                "enabled": True,
-            },
-            {
-                "protocol": "AirPlay",
-                "identifier": "00:11:22:33:44:55",
-                "port": 7000,
-                "requires_password": False,
-                "pairing": "Mandatory",
-                "credentials_present": True,
-                "password_present": False,
-                "enabled": True,
-            },
-        ],
-    }
-]
-
-
-def mock_devices() -> List[DiscoveryPayload]:
-    """Return deterministic mock discovery data."""
-
-    # Return a deep copy to avoid accidental mutation across tests or runs
-    return json.loads(json.dumps(MOCK_DEVICES))
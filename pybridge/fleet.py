@@ -0,0 +1,412 @@
+"""Fan-out of command and power operations across many devices."""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pyatv.interface import AppleTV, BaseConfig, Storage
+
+from .constants import (
+    DEFAULT_FLEET_CONCURRENCY,
+    DEFAULT_POWER_CONFIDENCE,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WAKE_TIMEOUT,
+)
+from .control import (
+    PYATV_ERROR,
+    ControlError,
+    _connect_device,
+    _infer_power,
+    _invoke_remote,
+    _observed_power_state,
+    _parse_action,
+    _perform_power,
+    _wake_config,
+)
+from .device_lookup import DeviceSelector, select_configs
+from .discovery import DiscoveryOptions, scan_configs
+from .mock import mock_configs
+from .power_inference import SOURCE_DEVICE, SOURCE_DISCOVERY, PowerObservations
+from .storage import load_storage
+
+Emitter = Callable[[Dict[str, Any]], None]
+
+
+@dataclass
+class FleetOptions:
+    """Options shared by every fan-out operation."""
+
+    selector: DeviceSelector
+    concurrency: int = DEFAULT_FLEET_CONCURRENCY
+    timeout: float = DEFAULT_TIMEOUT
+    storage_path: Optional[str] = None
+    use_storage: bool = True
+    mock: bool = False
+
+
+@dataclass
+class FleetSummary:
+    """Final line emitted once every device has been handled."""
+
+    status: str
+    succeeded: int
+    failed: int
+    elapsed: float
+
+
+@dataclass
+class GroupMember:
+    """Outcome of a synchronized operation on one group member.
+
+    Offsets are seconds since the barrier was released.
+    """
+
+    identifier: str
+    name: Optional[str]
+    status: str
+    dispatched: Optional[float] = None
+    completed: Optional[float] = None
+    error: Optional[str] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class GroupResult:
+    """Result of a synchronized group operation."""
+
+    status: str
+    operation: Dict[str, Any]
+    members: List[GroupMember]
+    connect_elapsed: float
+    dispatch_skew: Optional[float]
+    completion_skew: Optional[float]
+    elapsed: float
+
+
+class FleetOperation(abc.ABC):
+    """An operation applied to each selected device.
+
+    ``fields`` describe the operation in every per-device result. ``run_fleet``
+    calls ``prepare`` once before and ``finish`` once after the fan-out, and
+    ``apply`` for every device: it skips the connection for devices ``resolve``
+    can answer from their config, otherwise connects and calls ``run``.
+    """
+
+    def __init__(self, fields: Dict[str, Any]) -> None:
+        self.fields = fields
+
+    async def prepare(self, loop: asyncio.AbstractEventLoop, storage_path: Optional[str]) -> None:
+        pass
+
+    def resolve(self, config: BaseConfig) -> Optional[Dict[str, Any]]:
+        return None
+
+    async def apply(
+        self,
+        config: BaseConfig,
+        loop: asyncio.AbstractEventLoop,
+        storage: Optional[Storage],
+    ) -> Dict[str, Any]:
+        resolved = self.resolve(config)
+        if resolved is not None:
+            return resolved
+
+        atv = await _connect_device(config, loop, storage)
+        try:
+            result = await self.run(atv)
+        finally:
+            atv.close()
+        self.completed(config, result)
+        return result
+
+    @abc.abstractmethod
+    async def run(self, atv: AppleTV) -> Dict[str, Any]:
+        """Perform the operation on a connected device and return its result fields."""
+
+    def completed(self, config: BaseConfig, result: Dict[str, Any]) -> None:
+        pass
+
+    async def finish(self, loop: asyncio.AbstractEventLoop) -> None:
+        pass
+
+
+class CommandOperation(FleetOperation):
+    """Send a remote control command."""
+
+    def __init__(self, command: str, action: str = "SingleTap") -> None:
+        self.command = command.lower()
+        self.action = _parse_action(action)
+        super().__init__({"command": self.command, "action": self.action.name})
+
+    async def run(self, atv: AppleTV) -> Dict[str, Any]:
+        await _invoke_remote(atv, self.command, self.action)
+        return {}
+
+
+class PowerOperation(FleetOperation):
+    """Turn devices on or off, or read their power state.
+
+    With a *source* other than ``device`` the status is inferred from the
+    scan (see ``power_inference``), so a fleet-wide status costs one scan;
+    ``auto`` still connects to devices below *min_confidence*. With *wake*,
+    ``on`` goes through ``control._wake_config``, retrying each device for up
+    to *wake_timeout* seconds and reporting its time to on.
+    """
+
+    def __init__(
+        self,
+        action: str,
+        source: str = SOURCE_DEVICE,
+        min_confidence: float = DEFAULT_POWER_CONFIDENCE,
+        wake: bool = False,
+        wake_timeout: float = DEFAULT_WAKE_TIMEOUT,
+    ) -> None:
+        self.action = action.lower()
+        if self.action not in {"on", "off", "status"}:
+            raise ControlError(f"unknown power action: {action}")
+        self.source = source
+        self.min_confidence = min_confidence
+        self.wake = wake and self.action == "on"
+        self.wake_timeout = wake_timeout
+        self.observations: Optional[PowerObservations] = None
+        super().__init__({"action": self.action})
+
+    @property
+    def inferred(self) -> bool:
+        return self.action == "status" and self.source != SOURCE_DEVICE
+
+    async def prepare(self, loop: asyncio.AbstractEventLoop, storage_path: Optional[str]) -> None:
+        self.observations = await PowerObservations.load(loop, storage_path)
+
+    def resolve(self, config: BaseConfig) -> Optional[Dict[str, Any]]:
+        if not self.inferred or self.observations is None:
+            return None
+        inference = _infer_power(config, self.observations)
+        if self.source == SOURCE_DISCOVERY or inference.confidence >= self.min_confidence:
+            return inference.payload()
+        return None
+
+    async def apply(
+        self,
+        config: BaseConfig,
+        loop: asyncio.AbstractEventLoop,
+        storage: Optional[Storage],
+    ) -> Dict[str, Any]:
+        if not self.wake:
+            return await super().apply(config, loop, storage)
+
+        result = await _wake_config(config, loop, storage, self.wake_timeout, time.monotonic())
+        if result["confirmed"]:
+            self.completed(config, result)
+        return result
+
+    async def run(self, atv: AppleTV) -> Dict[str, Any]:
+        result = await _perform_power(atv, self.action)
+        if self.inferred:
+            result.update({"confidence": 1.0, "source": SOURCE_DEVICE})
+        return result
+
+    def completed(self, config: BaseConfig, result: Dict[str, Any]) -> None:
+        if self.observations is not None:
+            self.observations.record(config.identifier, _observed_power_state(result))
+
+    async def finish(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self.observations is not None:
+            await self.observations.save(loop)
+
+
+async def run_fleet(
+    options: FleetOptions, operation: FleetOperation, emit: Emitter
+) -> FleetSummary:
+    """Resolve the selector against one scan and apply *operation* concurrently.
+
+    Per-device results are passed to *emit* as they complete.
+    """
+
+    if options.selector.is_empty:
+        raise ControlError("no devices selected")
+
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+
+    storage: Optional[Storage] = None
+    if options.mock:
+        configs: List[Any] = mock_configs()
+    else:
+        if options.use_storage:
+            storage = await load_storage(loop, options.storage_path)
+
+        configs = await scan_configs(
+            DiscoveryOptions(
+                timeout=options.timeout,
+                protocol=None,
+                identifier=None,
+                storage_path=options.storage_path,
+                use_storage=options.use_storage,
+            ),
+            storage=storage,
+        )
+
+    selected, missing = select_configs(configs, options.selector)
+    if not options.mock:
+        await operation.prepare(loop, options.storage_path)
+
+    succeeded = 0
+    failed = 0
+    for identifier in missing:
+        failed += 1
+        emit({"status": "error", "identifier": identifier, "error": "device not found"})
+
+    semaphore = asyncio.Semaphore(max(1, options.concurrency))
+
+    async def _run_device(config: BaseConfig) -> None:
+        nonlocal succeeded, failed
+        async with semaphore:
+            device_started = time.monotonic()
+            payload: Dict[str, Any] = {
+                "status": "ok",
+                "identifier": config.identifier,
+                "name": getattr(config, "name", None),
+            }
+            payload.update(operation.fields)
+            try:
+                if options.mock:
+                    payload["mock"] = True
+                else:
+                    payload.update(await operation.apply(config, loop, storage))
+            except (ControlError, PYATV_ERROR) as exc:
+                failed += 1
+                payload.update({"status": "error", "error": str(exc)})
+            else:
+                succeeded += 1
+            payload["elapsed"] = round(time.monotonic() - device_started, 4)
+            emit(payload)
+
+    await asyncio.gather(*[_run_device(config) for config in selected])
+    if not options.mock:
+        await operation.finish(loop)
+
+    return FleetSummary(
+        status="complete",
+        succeeded=succeeded,
+        failed=failed,
+        elapsed=round(time.monotonic() - started, 4),
+    )
+
+
+async def run_group(options: FleetOptions, operation: FleetOperation) -> GroupResult:
+    """Apply *operation* to every selected device as close to simultaneously as possible.
+
+    All members are connected first; the operation is then dispatched to the
+    connected members behind a barrier and the spread between the first and
+    last dispatch (and completion) is reported.
+    """
+
+    if options.selector.is_empty:
+        raise ControlError("no devices selected")
+
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+
+    storage: Optional[Storage] = None
+    if options.mock:
+        configs: List[Any] = mock_configs()
+    else:
+        if options.use_storage:
+            storage = await load_storage(loop, options.storage_path)
+
+        configs = await scan_configs(
+            DiscoveryOptions(
+                timeout=options.timeout,
+                protocol=None,
+                identifier=None,
+                storage_path=options.storage_path,
+                use_storage=options.use_storage,
+            ),
+            storage=storage,
+        )
+
+    selected, missing = select_configs(configs, options.selector)
+    members = [
+        GroupMember(identifier=identifier, name=None, status="error", error="device not found")
+        for identifier in missing
+    ]
+
+    semaphore = asyncio.Semaphore(max(1, options.concurrency))
+
+    async def _connect(config: BaseConfig) -> Tuple[BaseConfig, Optional[AppleTV], Optional[str]]:
+        if options.mock:
+            return config, None, None
+        async with semaphore:
+            try:
+                return config, await _connect_device(config, loop, storage), None
+            except ControlError as exc:
+                return config, None, str(exc)
+
+    connect_started = time.monotonic()
+    connections = await asyncio.gather(*[_connect(config) for config in selected])
+    connect_elapsed = round(time.monotonic() - connect_started, 4)
+
+    barrier = asyncio.Event()
+    released = 0.0
+
+    async def _dispatch(config: BaseConfig, atv: Optional[AppleTV]) -> GroupMember:
+        member = GroupMember(
+            identifier=config.identifier, name=getattr(config, "name", None), status="ok"
+        )
+        await barrier.wait()
+        member.dispatched = round(time.monotonic() - released, 6)
+        try:
+            member.result = {"mock": True} if atv is None else await operation.run(atv)
+        except (ControlError, PYATV_ERROR) as exc:
+            member.status = "error"
+            member.error = str(exc)
+        member.completed = round(time.monotonic() - released, 6)
+        return member
+
+    ready = []
+    try:
+        for config, atv, error in connections:
+            if error is not None:
+                members.append(
+                    GroupMember(
+                        identifier=config.identifier,
+                        name=getattr(config, "name", None),
+                        status="error",
+                        error=error,
+                    )
+                )
+            else:
+                ready.append(asyncio.ensure_future(_dispatch(config, atv)))
+
+        # Let every dispatcher reach the barrier before releasing them together.
+        await asyncio.sleep(0)
+        released = time.monotonic()
+        barrier.set()
+        dispatched = list(await asyncio.gather(*ready))
+    finally:
+        for _, atv, _ in connections:
+            if atv is not None:
+                atv.close()
+
+    members = dispatched + members
+    return GroupResult(
+        status="ok" if all(member.status == "ok" for member in members) else "partial",
+        operation=dict(operation.fields),
+        members=members,
+        connect_elapsed=connect_elapsed,
+        dispatch_skew=_spread([member.dispatched for member in dispatched]),
+        completion_skew=_spread([member.completed for member in dispatched]),
+        elapsed=round(time.monotonic() - started, 4),
+    )
+
+
+def _spread(offsets: List[Optional[float]]) -> Optional[float]:
+    values = [value for value in offsets if value is not None]
+    if not values:
+        return None
+    return round(max(values) - min(values), 6)
@@ -0,0 +1,243 @@
+"""Touch gesture streaming for persistent sessions.
+
+Trackpad input arrives far faster than one device round trip per event, so
+``GestureStream`` decouples the session reader from the device: ``submit``
+queues an event and returns at once, and a sender task delivers the queue in
+order. Under backpressure a queued ``move`` is replaced by the next one (the
+device only needs the latest position), while ``down``, ``up``, ``swipe`` and
+``click`` are never dropped. When the link keeps up, a large jump between
+moves is filled with interpolated points so the path stays continuous.
+Latency is measured per event from receipt to delivery; the caller supplies
+the send coroutine.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import math
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+# Touch coordinates range over [0, COORDINATE_MAX] on both axes, as in pyatv.
+COORDINATE_MAX = 1000
+EVENTS = ("down", "move", "up", "swipe", "click")
+# Events that end a gesture and are acknowledged with its summary.
+_FINAL_EVENTS = {"up", "swipe", "click"}
+# Moves further apart than this are interpolated, with at most MAX_INTERPOLATED extra points.
+INTERPOLATION_STEP = 40
+MAX_INTERPOLATED = 4
+# Queued events beyond which the oldest moves are dropped.
+MAX_PENDING = 256
+# Latency samples kept for statistics.
+MAX_SAMPLES = 2048
+# Seconds ``close`` waits for queued events (e.g. a final ``up``) to be delivered.
+DRAIN_TIMEOUT = 0.5
+
+Event = Dict[str, Any]
+
+
+class GestureStream:
+    """Deliver touch events to a device in order, coalescing stale moves."""
+
+    def __init__(
+        self,
+        send: Callable[[Event], Awaitable[None]],
+        report: Callable[[Dict[str, Any]], None],
+    ) -> None:
+        self._send = send
+        self._report = report
+        self._queue: Deque[Event] = collections.deque()
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+        self._last: Optional[Event] = None
+        self._latencies: Deque[float] = collections.deque(maxlen=MAX_SAMPLES)
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+        self.interpolated = 0
+        self.errors = 0
+        self._gesture = {"events": 0, "dropped": 0, "interpolated": 0}
+
+    def submit(self, payload: Dict[str, Any]) -> None:
+        """Queue one event; raises ``ValueError`` for a malformed one."""
+
+        event = _normalise(payload)
+        event["received"] = time.monotonic()
+        self.received += 1
+
+        if event["event"] == "move" and self._queue and self._queue[-1]["event"] == "move":
+            # The device has not seen the queued move yet; only the newest position matters.
+            self._queue[-1] = event
+            self._dropped()
+        else:
+            self._queue.append(event)
+            while len(self._queue) > MAX_PENDING and self._drop_oldest_move():
+                pass
+
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="gestures")
+        self._idle.clear()
+        self._wake.set()
+
+    async def close(self) -> None:
+        """Deliver what is queued (bounded by ``DRAIN_TIMEOUT``), then stop."""
+
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies)
+
+        def rank(fraction: float) -> Optional[float]:
+            if not ordered:
+                return None
+            index = min(len(ordered) - 1, int(fraction * len(ordered)))
+            return round(ordered[index] * 1000, 3)
+
+        return {
+            "received": self.received,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "interpolated": self.interpolated,
+            "errors": self.errors,
+            "pending": len(self._queue),
+            "latency_p50_ms": rank(0.5),
+            "latency_p99_ms": rank(0.99),
+            "latency_max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue:
+                self._idle.set()
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+
+            event = self._queue.popleft()
+            try:
+                if event["event"] == "move" and not self._queue:
+                    for point in _interpolate(self._last, event):
+                        await self._send(point)
+                        self.interpolated += 1
+                        self._gesture["interpolated"] += 1
+                await self._send(event)
+            except Exception as exc:  # noqa: BLE001 - reported, the stream carries on
+                self.errors += 1
+                self._report(
+                    {
+                        "status": "error",
+                        "type": "touch",
+                        "event": event["event"],
+                        "error": str(exc) or type(exc).__name__,
+                    }
+                )
+                self._drop_queued_moves()
+                self._reset_gesture()
+                continue
+
+            latency = time.monotonic() - event["received"]
+            self._latencies.append(latency)
+            self.sent += 1
+            self._gesture["events"] += 1
+            self._last = event if event["event"] in ("down", "move") else None
+            if event["event"] in _FINAL_EVENTS:
+                self._report(
+                    {
+                        "status": "ok",
+                        "type": "touch",
+                        "event": event["event"],
+                        "latency_ms": round(latency * 1000, 3),
+                        "gesture": dict(self._gesture),
+                    }
+                )
+                self._reset_gesture()
+
+    def _dropped(self) -> None:
+        self.dropped += 1
+        self._gesture["dropped"] += 1
+
+    def _drop_oldest_move(self) -> bool:
+        for index, queued in enumerate(self._queue):
+            if queued["event"] == "move":
+                del self._queue[index]
+                self._dropped()
+                return True
+        return False
+
+    def _drop_queued_moves(self) -> None:
+        while self._drop_oldest_move():
+            pass
+
+    def _reset_gesture(self) -> None:
+        self._gesture = {"events": 0, "dropped": 0, "interpolated": 0}
+
+
+def _normalise(payload: Dict[str, Any]) -> Event:
+    kind = payload.get("event")
+    if kind not in EVENTS:
+        raise ValueError(f"touch event must be one of: {', '.join(EVENTS)}")
+
+    if kind == "click":
+        return {"event": kind, "action": str(payload.get("action", "SingleTap"))}
+
+    if kind == "swipe":
+        duration = payload.get("duration_ms", 200)
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration <= 0:
+            raise ValueError("duration_ms must be a positive number")
+        start_x, start_y = _point(payload.get("start"), "start")
+        end_x, end_y = _point(payload.get("end"), "end")
+        return {
+            "event": kind,
+            "start_x": start_x,
+            "start_y": start_y,
+            "end_x": end_x,
+            "end_y": end_y,
+            "duration_ms": int(duration),
+        }
+
+    x, y = _point([payload.get("x"), payload.get("y")], "x/y")
+    return {"event": kind, "x": x, "y": y}
+
+
+def _point(value: Any, name: str) -> Tuple[int, int]:
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"{name} must be a pair of coordinates")
+    coordinates = []
+    for item in value:
+        if isinstance(item, bool) or not isinstance(item, (int, float)):
+            raise ValueError(f"{name} must be a pair of coordinates")
+        # Trackpads overshoot the edges; clamp instead of rejecting the event.
+        coordinates.append(min(COORDINATE_MAX, max(0, int(round(item)))))
+    return coordinates[0], coordinates[1]
+
+
+def _interpolate(previous: Optional[Event], event: Event) -> List[Event]:
+    """Return the intermediate moves between *previous* and *event*."""
+
+    if previous is None:
+        return []
+    dx = event["x"] - previous["x"]
+    dy = event["y"] - previous["y"]
+    steps = min(MAX_INTERPOLATED + 1, math.ceil(math.hypot(dx, dy) / INTERPOLATION_STEP))
+    return [
+        {
+            "event": "move",
+            "x": previous["x"] + round(dx * step / steps),
+            "y": previous["y"] + round(dy * step / steps),
+        }
+        for step in range(1, steps)
+    ]
@@ -0,0 +1,181 @@
+"""Keepalive probing of idle session connections.
+
+``ConnectionMonitor`` runs a cheap round trip on a connection once it has
+been idle for the heartbeat interval, keeps a smoothed RTT (the RFC 6298
+estimator used for TCP retransmission timers) and calls the reconnect hook as
+soon as a probe fails or the connection reports that it was lost, so the next
+user request finds a working link. Probes and reconnects hold the session's
+connection lock, so they never interleave with a request. The caller
+supplies the probe and reconnect coroutines.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Gains of the RFC 6298 smoothed RTT and RTT variance estimators.
+RTT_ALPHA = 0.125
+RTT_BETA = 0.25
+# Upper bound, in seconds, of the delay between failed reconnect attempts.
+MAX_RECONNECT_BACKOFF = 30.0
+
+
+class ConnectionMonitor:
+    """Track the health and round-trip time of one session connection."""
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[Any]],
+        reconnect: Callable[[], Awaitable[None]],
+        lock: asyncio.Lock,
+        interval: Optional[float],
+        timeout: float,
+    ) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.healthy = True
+        self.rtt: Optional[float] = None
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.probes = 0
+        self.failures = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self._probe = probe
+        self._reconnect = reconnect
+        self._lock = lock
+        self._last_activity = time.monotonic()
+        self._reconnect_attempts = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start background probing when a heartbeat interval is configured."""
+
+        if self.interval is not None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="heartbeat")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def touch(self) -> None:
+        """Note traffic on the connection; the next probe waits a full interval."""
+
+        self._last_activity = time.monotonic()
+
+    def connection_lost(self, error: Optional[str] = None) -> None:
+        """Mark the connection broken and reconnect without waiting for the interval."""
+
+        self.healthy = False
+        self.last_error = error or "connection lost"
+        self._wake.set()
+
+    async def check(self) -> None:
+        """Probe now (reconnecting when needed), e.g. for an explicit health request."""
+
+        async with self._lock:
+            await self._check_locked()
+
+    async def recover(self) -> None:
+        """Reconnect first if the connection is known to be broken."""
+
+        if self.healthy:
+            return
+        async with self._lock:
+            if not self.healthy:
+                await self._reconnect_once()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "heartbeat": self.interval,
+            "rtt_ms": _millis(self.rtt),
+            "srtt_ms": _millis(self.srtt),
+            "rttvar_ms": _millis(self.rttvar),
+            "probes": self.probes,
+            "failures": self.failures,
+            "reconnects": self.reconnects,
+            "idle": round(time.monotonic() - self._last_activity, 3),
+            "last_error": self.last_error,
+        }
+
+    async def _run(self) -> None:
+        assert self.interval is not None
+        while True:
+            if self.healthy:
+                remaining = self._last_activity + self.interval - time.monotonic()
+                if remaining > 0:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    continue
+
+            async with self._lock:
+                await self._check_locked()
+            if not self.healthy:
+                await asyncio.sleep(self._backoff())
+
+    async def _check_locked(self) -> None:
+        if self.healthy:
+            await self._probe_once()
+        if not self.healthy:
+            await self._reconnect_once()
+        self.touch()
+
+    async def _probe_once(self) -> None:
+        self.probes += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._probe(), self.timeout)
+        except asyncio.TimeoutError:
+            self._probe_failed("heartbeat timed out")
+            return
+        except Exception as exc:  # noqa: BLE001 - any failure means the link is unusable
+            self._probe_failed(str(exc) or type(exc).__name__)
+            return
+        self._record_rtt(time.monotonic() - started)
+
+    def _probe_failed(self, error: str) -> None:
+        self.failures += 1
+        self.healthy = False
+        self.last_error = error
+
+    async def _reconnect_once(self) -> None:
+        try:
+            await self._reconnect()
+        except Exception as exc:  # noqa: BLE001 - retried with backoff
+            self._reconnect_attempts += 1
+            self.last_error = str(exc) or type(exc).__name__
+            return
+        self.reconnects += 1
+        self._reconnect_attempts = 0
+        self.healthy = True
+        self._wake.clear()
+
+    def _backoff(self) -> float:
+        assert self.interval is not None
+        exponent = max(0, self._reconnect_attempts - 1)
+        return min(MAX_RECONNECT_BACKOFF, self.interval * (2**exponent))
+
+    def _record_rtt(self, sample: float) -> None:
+        self.rtt = sample
+        if self.srtt is None or self.rttvar is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+            return
+        self.rttvar = (1 - RTT_BETA) * self.rttvar + RTT_BETA * abs(self.srtt - sample)
+        self.srtt = (1 - RTT_ALPHA) * self.srtt + RTT_ALPHA * sample
+
+
+def _millis(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 3)
@@ -0,0 +1,87 @@
+"""Deterministic mock data for ``--mock`` runs.
+
+Kept free of pyatv imports so mock invocations start quickly.
+"""
+
+from __future__ import annotations
+
+import copy
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+# Type alias for JSON-friendly payloads
+DiscoveryPayload = Dict[str, Any]
+
+
+MOCK_DEVICES: List[DiscoveryPayload] = [
+    {
+        "name": "Living Room",
+        "address": "10.0.0.10",
+        "deep_sleep": False,
+        "identifiers": ["00:11:22:33:44:55", "11223344-5566-7788-9900-112233445566"],
+        "main_identifier": "11223344-5566-7788-9900-112233445566",
+        "device_info": {
+            "operating_system": "TvOS",
+            "version": "17.5",
+            "build_number": "21L570",
+            "model": "AppleTV4KGen3",
+            "model_str": "Apple TV 4K (3rd generation)",
+            "raw_model": None,
+            "mac": "aa:bb:cc:dd:ee:ff",
+        },
+        "protocols": [
+            {
+                "protocol": "Companion",
+                "identifier": "11223344-5566-7788-9900-112233445566",
+                "port": 49153,
+                "requires_password": False,
+                "pairing": "Mandatory",
+                "credentials_present": True,
+                "password_present": False,
+                "enabled": True,
+            },
+            {
+                "protocol": "AirPlay",
+                "identifier": "00:11:22:33:44:55",
+                "port": 7000,
+                "requires_password": False,
+                "pairing": "Mandatory",
+                "credentials_present": True,
+                "password_present": False,
+                "enabled": True,
+            },
+        ],
+    }
+]
+
+# Installed apps reported by mock sessions.
+MOCK_APPS: List[Dict[str, str]] = [
+    {"name": "Music", "identifier": "com.apple.TVMusic"},
+    {"name": "Settings", "identifier": "com.apple.TVSettings"},
+    {"name": "TV", "identifier": "com.apple.TVWatchList"},
+]
+
+
+def mock_devices() -> List[DiscoveryPayload]:
+    """Return deterministic mock discovery data."""
+
+    # Return a deep copy to avoid accidental mutation across tests or runs
+    return copy.deepcopy(MOCK_DEVICES)
+
+
+def mock_configs() -> List[Any]:
+    """Return config-like objects for the mock devices, for selector matching."""
+
+    return [
+        SimpleNamespace(
+            identifier=device["main_identifier"],
+            all_identifiers=list(device["identifiers"]),
+            name=device["name"],
+            address=device["address"],
+            device_info=SimpleNamespace(
+                model=SimpleNamespace(name=device["device_info"]["model"]),
+                model_str=device["device_info"]["model_str"],
+            ),
+        )
+        for device in MOCK_DEVICES
+    ]
@@ -0,0 +1,69 @@
+"""JSON encoding for everything the bridge writes to stdout.
+
+Uses ``orjson`` when it is installed and falls back to the standard library
+otherwise; both produce compact UTF-8 JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .tracing import span
+
+try:  # pragma: no cover - depends on the environment
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(payload: Any) -> str:
+    """Encode *payload* as compact JSON."""
+
+    if orjson is not None:
+        return orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode one JSON document."""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def emit(payload: Any, flush: bool = False) -> None:
+    """Write *payload* to stdout as one JSON line."""
+
+    with span("serialize"):
+        line = dumps(payload) + "\n"
+    sys.stdout.write(line)
+    if flush:
+        sys.stdout.flush()
+
+
+def project(payload: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Return only the requested top-level *fields* of *payload*.
+
+    ``None`` keeps every field.
+    """
+
+    if fields is None:
+        return payload
+    return {name: payload[name] for name in fields if name in payload}
+
+
+def parse_fields(value: str, allowed: Iterable[str]) -> List[str]:
+    """Parse a comma-separated field list, rejecting names outside *allowed*."""
+
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    if not fields:
+        raise ValueError("no fields given")
+    return fields
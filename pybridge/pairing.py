@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
-from typing import Any, Optional
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from pyatv import exceptions as pyatv_exceptions
 PYATV_ERROR = getattr(
@@ -16,6 +18,11 @@ from pyatv import pair as pyatv_pair
 from pyatv.const import Protocol
 from pyatv.interface import BaseConfig, Storage
 
+from .constants import (
+    DEFAULT_BULK_CONCURRENCY,
+    DEFAULT_PAIRING_HANDLE_TIMEOUT,
+    DEFAULT_TIMEOUT,
+)
 from .discovery import DiscoveryOptions, scan_configs
 from .device_lookup import select_config
 from .storage import load_storage
@@ -83,6 +90,34 @@ class UnpairResult:
     credentials_removed: bool
 
 
+@dataclass
+class BulkPairingOptions:
+    """Options for pairing many devices and protocols from a single scan."""
+
+    identifiers: List[str]
+    protocols: List[str]
+    all_devices: bool = False
+    concurrency: int = DEFAULT_BULK_CONCURRENCY
+    timeout: float = DEFAULT_TIMEOUT
+    display_name: str = "pyatv-bridge"
+    storage_path: Optional[str] = None
+    use_storage: bool = True
+    mock: bool = False
+    pin_timeout: float = DEFAULT_PAIRING_HANDLE_TIMEOUT
+
+
+@dataclass
+class BulkPairingSummary:
+    """Final result emitted once every bulk pairing job has finished."""
+
+    status: str
+    paired: int
+    failed: int
+    credentials_saved: bool
+    elapsed: float
+    failures: List[Dict[str, Optional[str]]] = field(default_factory=list)
+
+
 @dataclass
 class PairingSession:
     """Active pairing session state for interactive flows."""
@@ -185,11 +220,12 @@ async def unpair_device(options: UnpairOptions) -> UnpairResult:
 
     configs = await scan_configs(
         DiscoveryOptions(
-            timeout=5,
+            timeout=None,
             protocol=None,
             identifier=None,
             storage_path=options.storage_path,
             use_storage=options.use_storage,
+            target=options.identifier,
         ),
         storage=storage,
     )
@@ -264,11 +300,12 @@ async def create_pairing_session(options: PairingOptions) -> PairingSession:
 
     configs = await scan_configs(
         DiscoveryOptions(
-            timeout=5,
+            timeout=None,
             protocol=None,
             identifier=None,
             storage_path=options.storage_path,
             use_storage=options.use_storage,
+            target=options.identifier,
         ),
         storage=storage,
     )
@@ -289,3 +326,467 @@ async def create_pairing_session(options: PairingOptions) -> PairingSession:
         raise PairingError(str(exc)) from exc
 
     return PairingSession(pairing=pairing, config=config, protocol=protocol, storage=storage)
+
+
+PairingFactory = Callable[[Any, Protocol], Awaitable[Any]]
+
+
+class PairingManager:
+    """Handle based pairing driven from inside a long-running bridge process.
+
+    ``begin`` starts a pairing and returns a handle when a PIN is needed;
+    ``submit_pin`` completes it. Handles that receive no PIN within
+    ``timeout`` seconds are closed and reported through *on_expired*.
+    """
+
+    def __init__(
+        self,
+        factory: PairingFactory,
+        storage: Optional[Storage],
+        on_expired: Callable[[Dict[str, Any]], None],
+        timeout: float = DEFAULT_PAIRING_HANDLE_TIMEOUT,
+    ) -> None:
+        self._factory = factory
+        self._storage = storage
+        self._on_expired = on_expired
+        self._timeout = timeout
+        self._handles: Dict[str, Tuple[Any, Any, Protocol, asyncio.TimerHandle]] = {}
+        self._counter = 0
+
+    @property
+    def handles(self) -> List[str]:
+        return list(self._handles)
+
+    async def begin(self, config: Any, protocol_name: str) -> Dict[str, Any]:
+        """Start pairing *config*; returns a ``pin_required`` payload with a handle or the result."""
+
+        protocol = _parse_protocol(protocol_name)
+        try:
+            pairing = await self._factory(config, protocol)
+        except (PYATV_ERROR, OSError) as exc:
+            raise PairingError(str(exc) or type(exc).__name__) from exc
+
+        try:
+            await pairing.begin()
+        except BaseException as exc:
+            await pairing.close()
+            if isinstance(exc, (PYATV_ERROR, OSError)):
+                raise PairingError(str(exc) or type(exc).__name__) from exc
+            raise
+
+        if not pairing.device_provides_pin:
+            return await self._finish(pairing, config, protocol, DEFAULT_PIN)
+
+        self._counter += 1
+        handle = f"pair-{self._counter}"
+        timer = asyncio.get_running_loop().call_later(
+            self._timeout, lambda: asyncio.ensure_future(self._expire(handle))
+        )
+        self._handles[handle] = (pairing, config, protocol, timer)
+
+        payload = asdict(
+            PinRequiredResult(
+                status="pin_required",
+                identifier=config.identifier,
+                protocol=protocol.name,
+                message="Enter the PIN shown on the Apple TV screen.",
+            )
+        )
+        payload["handle"] = handle
+        return payload
+
+    async def submit_pin(self, handle: str, pin: str) -> Dict[str, Any]:
+        """Complete the pairing behind *handle* with *pin*."""
+
+        entry = self._handles.pop(handle, None)
+        if entry is None:
+            raise PairingError(f"unknown pairing handle: {handle}")
+
+        pairing, config, protocol, timer = entry
+        timer.cancel()
+        payload = await self._finish(pairing, config, protocol, pin)
+        payload["handle"] = handle
+        return payload
+
+    async def close(self) -> None:
+        """Abandon every open handle."""
+
+        for handle in list(self._handles):
+            pairing, _, _, timer = self._handles.pop(handle)
+            timer.cancel()
+            await pairing.close()
+
+    async def _finish(
+        self, pairing: Any, config: Any, protocol: Protocol, pin: str
+    ) -> Dict[str, Any]:
+        try:
+            pairing.pin(pin)
+            await pairing.finish()
+
+            if not pairing.has_paired:
+                raise PairingError("pairing failed")
+
+            if self._storage is not None:
+                await self._storage.save()
+
+            return asdict(
+                PairingResult(
+                    status="paired",
+                    identifier=config.identifier,
+                    protocol=protocol.name,
+                    credentials_saved=self._storage is not None,
+                    credentials=pairing.service.credentials,
+                )
+            )
+        except PairingError:
+            raise
+        except (PYATV_ERROR, OSError) as exc:
+            raise PairingError(str(exc) or type(exc).__name__) from exc
+        finally:
+            await pairing.close()
+
+    async def _expire(self, handle: str) -> None:
+        entry = self._handles.pop(handle, None)
+        if entry is None:
+            return
+
+        pairing, config, protocol, _ = entry
+        await pairing.close()
+        self._on_expired(
+            {
+                "status": "error",
+                "type": "pair",
+                "handle": handle,
+                "identifier": config.identifier,
+                "protocol": protocol.name,
+                "error": "pairing timed out",
+            }
+        )
+
+
+def pyatv_pairing_factory(
+    storage: Optional[Storage], display_name: str = "pyatv-bridge"
+) -> PairingFactory:
+    """Return a factory creating pyatv pairing handlers that share *storage*."""
+
+    async def _create(config: Any, protocol: Protocol) -> Any:
+        loop = asyncio.get_running_loop()
+        return await pyatv_pair(config, protocol, loop, storage=storage, name=display_name)
+
+    return _create
+
+
+async def mock_pairing_factory(_config: Any, _protocol: Protocol) -> Any:
+    """Create a deterministic pairing handler for ``--mock`` runs."""
+
+    return _MockPairingHandler()
+
+
+class PinRouter:
+    """Route PINs read from one input stream to pending pairing sessions."""
+
+    def __init__(self) -> None:
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._changed = asyncio.Event()
+
+    @property
+    def pending(self) -> List[Tuple[str, str]]:
+        return list(self._pending)
+
+    def expect(self, identifier: str, protocol: str) -> asyncio.Future:
+        """Register a session waiting for a PIN and return the future to await."""
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[(identifier.lower(), protocol.lower())] = future
+        self._changed.set()
+        return future
+
+    def deliver(
+        self, pin: str, identifier: Optional[str] = None, protocol: Optional[str] = None
+    ) -> bool:
+        """Complete a pending session, returning ``False`` when none matches.
+
+        Without *identifier* the PIN is only accepted if exactly one session is
+        pending (optionally narrowed down by *protocol*).
+        """
+
+        if identifier is None:
+            candidates = [
+                key for key in self._pending if protocol is None or key[1] == protocol.lower()
+            ]
+            if len(candidates) != 1:
+                return False
+            key = candidates[0]
+        else:
+            key = (identifier.lower(), (protocol or "").lower())
+            if key not in self._pending:
+                matches = [item for item in self._pending if item[0] == key[0]]
+                if protocol is not None or len(matches) != 1:
+                    return False
+                key = matches[0]
+
+        future = self._pending.pop(key)
+        if not future.done():
+            future.set_result(pin)
+        return True
+
+    def discard(self, identifier: str, protocol: str) -> None:
+        self._pending.pop((identifier.lower(), protocol.lower()), None)
+
+    def abort(self, message: str = "pin entry aborted") -> None:
+        """Fail every pending session."""
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(PairingError(message))
+        self._pending.clear()
+
+    async def wait_pending(self) -> None:
+        """Wait until at least one session is waiting for a PIN."""
+
+        while not self._pending:
+            self._changed.clear()
+            await self._changed.wait()
+
+
+async def pair_bulk(
+    options: BulkPairingOptions,
+    emit: Callable[[Dict[str, Any]], None],
+    read_line: Callable[[], Awaitable[Optional[str]]],
+) -> BulkPairingSummary:
+    """Pair several devices and protocols concurrently from a single scan.
+
+    ``pin_required`` prompts and per-job results are passed to *emit* as they
+    happen. PINs are read with *read_line*, only while a session is waiting,
+    as JSON objects ``{"identifier": ..., "protocol": ..., "pin": ...}`` or a
+    bare PIN when a single session is pending; a session without a PIN after
+    ``pin_timeout`` seconds fails. Devices that are not found or cannot be
+    reached fail on their own while the others carry on. Storage is saved once
+    at the end.
+    """
+
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+    protocols = [_parse_protocol(value) for value in options.protocols]
+
+    storage: Optional[Storage] = None
+    missing: List[str] = []
+    if options.mock:
+        targets: List[Any] = [_MockConfig(identifier) for identifier in options.identifiers]
+    else:
+        if options.use_storage:
+            storage = await load_storage(loop, options.storage_path)
+
+        configs = await scan_configs(
+            DiscoveryOptions(
+                timeout=options.timeout,
+                protocol=None,
+                identifier=None,
+                storage_path=options.storage_path,
+                use_storage=options.use_storage,
+            ),
+            storage=storage,
+        )
+        targets, missing = _select_bulk_targets(configs, options)
+
+    router = PinRouter()
+    semaphore = asyncio.Semaphore(max(1, options.concurrency))
+    failures: List[Dict[str, Optional[str]]] = []
+    paired = 0
+
+    def _fail(identifier: str, protocol: Protocol, error: str) -> None:
+        failure = {
+            "status": "error",
+            "identifier": identifier,
+            "protocol": protocol.name,
+            "error": error,
+        }
+        failures.append(failure)
+        emit(failure)
+
+    for identifier in missing:
+        for protocol in protocols:
+            _fail(identifier, protocol, "device not found")
+
+    async def _run_job(config: Any, protocol: Protocol) -> None:
+        nonlocal paired
+        async with semaphore:
+            try:
+                credentials = await _pair_job(
+                    config, protocol, options, storage, router, emit, loop
+                )
+            except (PairingError, PYATV_ERROR, OSError) as exc:
+                router.discard(config.identifier, protocol.name)
+                _fail(config.identifier, protocol, str(exc) or type(exc).__name__)
+                return
+
+        paired += 1
+        emit(
+            asdict(
+                PairingResult(
+                    status="paired",
+                    identifier=config.identifier,
+                    protocol=protocol.name,
+                    credentials_saved=storage is not None or options.mock,
+                    credentials=credentials,
+                )
+            )
+        )
+
+    async def _read_pins() -> None:
+        while True:
+            await router.wait_pending()
+            line = await read_line()
+            if line is None:
+                router.abort()
+                continue
+            if not _route_pin_line(router, line):
+                emit({"status": "error", "error": "no pending pairing matches input"})
+
+    reader = asyncio.ensure_future(_read_pins())
+    try:
+        await asyncio.gather(
+            *[_run_job(config, protocol) for config in targets for protocol in protocols]
+        )
+    finally:
+        reader.cancel()
+
+    saved = False
+    if storage is not None and paired:
+        await storage.save()
+        saved = True
+
+    return BulkPairingSummary(
+        status="complete",
+        paired=paired,
+        failed=len(failures),
+        credentials_saved=saved or (options.mock and paired > 0),
+        elapsed=round(time.monotonic() - started, 3),
+        failures=failures,
+    )
+
+
+async def _pair_job(
+    config: Any,
+    protocol: Protocol,
+    options: BulkPairingOptions,
+    storage: Optional[Storage],
+    router: PinRouter,
+    emit: Callable[[Dict[str, Any]], None],
+    loop: asyncio.AbstractEventLoop,
+) -> Optional[str]:
+    if options.mock:
+        pairing: Any = _MockPairingHandler()
+    else:
+        pairing = await pyatv_pair(
+            config,
+            protocol,
+            loop,
+            storage=storage,
+            name=options.display_name,
+        )
+
+    try:
+        await pairing.begin()
+
+        if pairing.device_provides_pin:
+            waiter = router.expect(config.identifier, protocol.name)
+            emit(
+                asdict(
+                    PinRequiredResult(
+                        status="pin_required",
+                        identifier=config.identifier,
+                        protocol=protocol.name,
+                        message="Enter the PIN shown on the Apple TV screen.",
+                    )
+                )
+            )
+            try:
+                pin = await asyncio.wait_for(waiter, options.pin_timeout)
+            except asyncio.TimeoutError:
+                raise PairingError("pairing timed out") from None
+            pairing.pin(pin)
+        else:
+            pairing.pin(DEFAULT_PIN)
+
+        await pairing.finish()
+
+        if not pairing.has_paired:
+            raise PairingError("pairing failed")
+
+        return pairing.service.credentials
+    except pyatv_exceptions.PairingError as exc:
+        raise PairingError(str(exc)) from exc
+    finally:
+        await pairing.close()
+
+
+def _select_bulk_targets(
+    configs: List[BaseConfig], options: BulkPairingOptions
+) -> Tuple[List[BaseConfig], List[str]]:
+    """Return the configs to pair and the requested identifiers that were not found."""
+
+    if options.all_devices:
+        return list(configs), []
+
+    targets: List[BaseConfig] = []
+    missing: List[str] = []
+    for identifier in options.identifiers:
+        config = select_config(configs, identifier)
+        if config is None:
+            missing.append(identifier)
+        elif config not in targets:
+            targets.append(config)
+    return targets, missing
+
+
+def _route_pin_line(router: PinRouter, line: str) -> bool:
+    message = line.strip()
+    if not message:
+        return True
+
+    if not message.startswith("{"):
+        return router.deliver(message)
+
+    try:
+        payload = json.loads(message)
+    except ValueError:
+        return False
+
+    if not isinstance(payload, dict):
+        return False
+
+    pin = payload.get("pin")
+    if not pin:
+        return False
+
+    return router.deliver(str(pin), payload.get("identifier"), payload.get("protocol"))
+
+
+class _MockConfig:
+    def __init__(self, identifier: str) -> None:
+        self.identifier = identifier
+
+
+class _MockPairingHandler:
+    """Deterministic stand-in for a pyatv pairing handler in ``--mock`` runs."""
+
+    device_provides_pin = True
+
+    def __init__(self) -> None:
+        self.has_paired = False
+        self.service = type("MockService", (), {"credentials": None})()
+        self._pin: Optional[str] = None
+
+    async def begin(self) -> None:
+        return None
+
+    def pin(self, pin: str) -> None:
+        self._pin = str(pin)
+
+    async def finish(self) -> None:
+        self.has_paired = bool(self._pin)
+        self.service.credentials = "mock-credentials"
+
+    async def close(self) -> None:
+        return None
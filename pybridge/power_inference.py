@@ -0,0 +1,107 @@
+"""Power state inferred from discovery, without connecting.
+
+Answering ``power --action status`` authoritatively costs a scan and a
+connect per device. Discovery already tells whether a device is in deep
+sleep, which is a strong sign that it is off; an awake announcement is a
+weaker sign that it is on, since a device in light standby still answers.
+States observed over a connection (status requests, power actions and the
+push updates a session receives) are remembered per main identifier and
+sharpen the guess while they are fresh.
+
+``infer_power_state`` returns the state together with a confidence in
+``[0, 1]`` and the source it came from, so callers can decide whether to pay
+for a connection. Observations are persisted beside the storage file
+(``state_path(..., "power")``).
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .storage import BridgeState
+
+# Values of ``source`` in a status answer.
+SOURCE_DEVICE = "device"
+SOURCE_OBSERVED = "observed"
+SOURCE_DISCOVERY = "discovery"
+# Source of an observation pushed to a session by the device.
+SOURCE_PUSH = "push"
+
+DEEP_SLEEP_CONFIDENCE = 0.9
+AWAKE_CONFIDENCE = 0.6
+# Confidence of a state observed just now; it decays to AWAKE_CONFIDENCE over OBSERVATION_TTL.
+OBSERVED_CONFIDENCE = 0.95
+# Seconds after which an observed state no longer informs the inference.
+OBSERVATION_TTL = 900.0
+
+
+@dataclass
+class PowerInference:
+    """A power state and how far it can be trusted."""
+
+    power_state: str
+    confidence: float
+    source: str
+
+    def payload(self) -> Dict[str, Any]:
+        return {
+            "power_state": self.power_state,
+            "confidence": self.confidence,
+            "source": self.source,
+        }
+
+
+class PowerObservations(BridgeState):
+    """Last power state seen over a connection for every device."""
+
+    STATE_NAME = "power"
+
+    def __init__(self, path: Optional[Path] = None, data: Optional[Dict[str, Any]] = None):
+        super().__init__(path)
+        self.devices: Dict[str, Dict[str, Any]] = dict((data or {}).get("devices", {}))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"devices": self.devices}
+
+    def record(self, identifier: str, power_state: str, source: str = SOURCE_DEVICE) -> None:
+        self.devices[identifier] = {
+            "power_state": power_state,
+            "source": source,
+            "observed_at": round(time.time(), 3),
+        }
+        self.dirty = True
+
+    def get(self, identifier: str) -> Optional[Dict[str, Any]]:
+        return self.devices.get(identifier)
+
+
+def infer_power_state(
+    deep_sleep: bool, observation: Optional[Dict[str, Any]] = None
+) -> PowerInference:
+    """Infer the power state of a device from its discovery record.
+
+    *observation* is the device's entry in ``PowerObservations``; it is used
+    while younger than ``OBSERVATION_TTL`` and names a known state.
+    """
+
+    observed: Optional[str] = None
+    observed_confidence = 0.0
+    if observation is not None and observation.get("power_state") in ("On", "Off"):
+        age = max(0.0, time.time() - float(observation.get("observed_at", 0)))
+        if age < OBSERVATION_TTL:
+            observed = observation["power_state"]
+            decay = (OBSERVED_CONFIDENCE - AWAKE_CONFIDENCE) * age / OBSERVATION_TTL
+            observed_confidence = round(OBSERVED_CONFIDENCE - decay, 3)
+
+    if deep_sleep:
+        # Deep sleep is current; an older "On" observation is simply outdated.
+        if observed == "Off" and observed_confidence > DEEP_SLEEP_CONFIDENCE:
+            return PowerInference("Off", observed_confidence, SOURCE_OBSERVED)
+        return PowerInference("Off", DEEP_SLEEP_CONFIDENCE, SOURCE_DISCOVERY)
+
+    if observed is not None:
+        return PowerInference(observed, observed_confidence, SOURCE_OBSERVED)
+    return PowerInference("On", AWAKE_CONFIDENCE, SOURCE_DISCOVERY)
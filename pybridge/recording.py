@@ -0,0 +1,369 @@
+"""Recording and replay of ``session`` traffic.
+
+A trace is newline-delimited JSON: a header line followed by one record per
+message, ``{"t": seconds, "dir": "in"|"out", ...}``, with ``t`` measured on
+the monotonic clock from the start of the session. Inbound records carry a
+``seq`` number; outbound records carry ``reply_to``, the ``seq`` of the
+request being handled when they were written (``null`` for unsolicited
+messages such as ``ready`` or pairing expiry). The ``pin``, ``credentials``
+and ``password`` fields are masked wherever they appear, and the file is
+created readable by its owner only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from .output import dumps
+
+TRACE_VERSION = 1
+# Requests that cannot be replayed over a JSON session.
+_UNREPLAYABLE = {"framing"}
+# Seconds a fast replay waits for a reply before sending the next request anyway.
+REPLY_TIMEOUT = 10.0
+# Payload fields replaced by ``MASK`` before they reach a trace.
+_SECRET_FIELDS = {"pin", "credentials", "password"}
+MASK = "***"
+
+
+class RecordingError(Exception):
+    """Raised when a trace cannot be written, read or replayed."""
+
+
+class SessionRecorder:
+    """Append session traffic to a trace file."""
+
+    def __init__(self, handle: IO[str], identifier: str) -> None:
+        self._handle = handle
+        self._started = time.monotonic()
+        self._seq = 0
+        self._current: Optional[int] = None
+        self._write(
+            {
+                "type": "header",
+                "version": TRACE_VERSION,
+                "identifier": identifier,
+                "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+        )
+
+    @classmethod
+    def open(cls, path: str, identifier: str) -> "SessionRecorder":
+        try:
+            descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            handle = os.fdopen(descriptor, "w", encoding="utf-8")
+        except OSError as exc:
+            raise RecordingError(f"unable to open recording: {exc}") from exc
+        return cls(handle, identifier)
+
+    def inbound(self, payload: Dict[str, Any]) -> None:
+        """Record a request; following output is attributed to it until ``handled``."""
+
+        self._seq += 1
+        self._current = self._seq
+        self._write(
+            {"t": self._elapsed(), "dir": "in", "seq": self._seq, "payload": _masked(payload)}
+        )
+
+    def handled(self) -> None:
+        self._current = None
+
+    def outbound(self, payload: Dict[str, Any]) -> None:
+        self._write(
+            {
+                "t": self._elapsed(),
+                "dir": "out",
+                "reply_to": None if _unsolicited(payload) else self._current,
+                "payload": _masked(payload),
+            }
+        )
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def _elapsed(self) -> float:
+        return round(time.monotonic() - self._started, 6)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._handle.write(dumps(record) + "\n")
+
+
+def _unsolicited(payload: Dict[str, Any]) -> bool:
+    # Pairing handle expiry and gesture acknowledgements are emitted by
+    # background tasks, whatever request happens to be in progress.
+    if payload.get("type") == "pair" and payload.get("status") == "error":
+        return True
+    return payload.get("type") == "touch" and "event" in payload
+
+
+def _masked(value: Any) -> Any:
+    """Return a copy of *value* with secret fields masked at any depth."""
+
+    if isinstance(value, dict):
+        return {
+            key: MASK if key in _SECRET_FIELDS and item is not None else _masked(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_masked(item) for item in value]
+    return value
+
+
+@dataclass
+class TraceRequest:
+    """One recorded request and how long its first reply took."""
+
+    seq: int
+    offset: float
+    payload: Dict[str, Any]
+    latency: Optional[float] = None
+
+    @property
+    def expects_reply(self) -> bool:
+        """Whether the recorded session answered this request (touch ``down`` is not)."""
+
+        return self.latency is not None
+
+
+@dataclass
+class Trace:
+    """Requests of a recorded session, with offsets relative to ``ready``.
+
+    ``replies`` holds the ``reply_to`` of every outbound record, in the order
+    the lines were written.
+    """
+
+    identifier: Optional[str]
+    requests: List[TraceRequest] = field(default_factory=list)
+    replies: List[Optional[int]] = field(default_factory=list)
+    skipped: int = 0
+
+
+def load_trace(path: str) -> Trace:
+    """Read a trace written by ``SessionRecorder``."""
+
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            records = [json.loads(line) for line in handle if line.strip()]
+    except (OSError, ValueError) as exc:
+        raise RecordingError(f"unable to read trace: {exc}") from exc
+
+    if not records or records[0].get("type") != "header":
+        raise RecordingError("trace has no header")
+    if records[0].get("version") != TRACE_VERSION:
+        raise RecordingError(f"unsupported trace version: {records[0].get('version')}")
+
+    trace = Trace(identifier=records[0].get("identifier"))
+    base = 0.0
+    by_seq: Dict[int, TraceRequest] = {}
+    for record in records[1:]:
+        payload = record.get("payload") or {}
+        if record.get("dir") == "out":
+            trace.replies.append(record.get("reply_to"))
+            if record.get("reply_to") is None:
+                if payload.get("status") == "ready":
+                    base = record["t"]
+                continue
+            request = by_seq.get(record["reply_to"])
+            if request is not None and request.latency is None:
+                request.latency = round(record["t"] - base - request.offset, 6)
+            continue
+
+        if payload.get("type") in _UNREPLAYABLE:
+            trace.skipped += 1
+            continue
+        request = TraceRequest(seq=record["seq"], offset=record["t"] - base, payload=payload)
+        by_seq[request.seq] = request
+        trace.requests.append(request)
+
+    return trace
+
+
+@dataclass
+class ReplayResult:
+    """Latency of a replayed trace compared with the recording, in milliseconds."""
+
+    status: str
+    mode: str
+    messages: int
+    skipped: int
+    unanswered: int
+    recorded: Dict[str, Any]
+    replayed: Dict[str, Any]
+    delta: Dict[str, Any]
+    round_trip: Dict[str, Any]
+    elapsed: float
+
+
+async def replay_trace(
+    trace: Trace,
+    session_argv: List[str],
+    paced: bool,
+    env: Optional[Dict[str, str]] = None,
+) -> ReplayResult:
+    """Feed *trace* to a session started with *session_argv* and compare latencies.
+
+    With *paced* requests are sent at their recorded offsets; otherwise each
+    request is sent as soon as the previous one has been answered, without
+    waiting for requests the recorded session did not answer. The replayed
+    session records its own trace, so ``replayed`` latencies are measured
+    exactly like the recorded ones (request read to first reply);
+    ``round_trip`` is what this process observed through the pipes, with
+    output lines matched to requests by the ``reply_to`` of the replayed
+    trace.
+    """
+
+    started = time.monotonic()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        replay_path = os.path.join(tmpdir, "replay.ndjson")
+        sent_at, arrivals = await _drive_session(
+            trace, [*session_argv, "--record", replay_path], paced, env
+        )
+        replayed_trace = load_trace(replay_path)
+
+    recorded: List[float] = []
+    replayed: List[float] = []
+    deltas: List[float] = []
+    for request, replay in zip(trace.requests, replayed_trace.requests):
+        if replay.latency is None:
+            continue
+        replayed.append(replay.latency)
+        if request.latency is not None:
+            recorded.append(request.latency)
+            deltas.append(replay.latency - request.latency)
+
+    # Replayed requests are numbered from 1 in the order they were sent.
+    first_reply: Dict[int, float] = {}
+    for reply_to, arrived in zip(replayed_trace.replies, arrivals):
+        if reply_to is not None and reply_to not in first_reply:
+            first_reply[reply_to] = arrived
+    round_trips = [
+        first_reply[seq] - sent for seq, sent in enumerate(sent_at, start=1) if seq in first_reply
+    ]
+
+    unanswered = sum(
+        1
+        for seq, request in enumerate(trace.requests, start=1)
+        if request.expects_reply and seq not in first_reply
+    )
+    return ReplayResult(
+        status="ok" if unanswered == 0 else "incomplete",
+        mode="paced" if paced else "fast",
+        messages=len(trace.requests),
+        skipped=trace.skipped,
+        unanswered=unanswered,
+        recorded=_summary(recorded),
+        replayed=_summary(replayed),
+        delta=_summary(deltas),
+        round_trip=_summary(round_trips),
+        elapsed=round(time.monotonic() - started, 4),
+    )
+
+
+async def _drive_session(
+    trace: Trace, argv: List[str], paced: bool, env: Optional[Dict[str, str]]
+) -> Tuple[List[float], List[float]]:
+    """Send the requests of *trace* to a new session.
+
+    Returns when each request was sent and when each output line (``ready``
+    included) arrived.
+    """
+
+    process = await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        env=env,
+    )
+    assert process.stdin is not None and process.stdout is not None
+
+    sent_at: List[float] = []
+    arrivals: List[float] = []
+    try:
+        ready = await _read_payload(process.stdout)
+        if ready is None or ready.get("status") != "ready":
+            raise RecordingError(f"session failed to start: {ready}")
+        arrivals.append(time.monotonic())
+
+        answers: "asyncio.Queue[None]" = asyncio.Queue()
+        reader = asyncio.ensure_future(_collect_output(process.stdout, arrivals, answers))
+        replay_started = time.monotonic()
+
+        for request in trace.requests:
+            if paced:
+                delay = replay_started + request.offset - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            while not answers.empty():
+                answers.get_nowait()
+            sent_at.append(time.monotonic())
+            try:
+                process.stdin.write((dumps(request.payload) + "\n").encode("utf-8"))
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                break  # the session ended (e.g. after a recorded close)
+            if not paced and request.expects_reply:
+                answer = asyncio.ensure_future(answers.get())
+                await asyncio.wait(
+                    [answer, reader], timeout=REPLY_TIMEOUT, return_when=asyncio.FIRST_COMPLETED
+                )
+                answer.cancel()
+
+        process.stdin.close()
+        await reader
+        await process.wait()
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    return sent_at, arrivals
+
+
+async def _read_payload(stream: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    line = await stream.readline()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return {}
+
+
+async def _collect_output(
+    stream: asyncio.StreamReader, arrivals: List[float], answers: "asyncio.Queue[None]"
+) -> None:
+    """Note when each line arrives; signal *answers* for lines that answer a request."""
+
+    while True:
+        payload = await _read_payload(stream)
+        if payload is None:
+            return
+        arrivals.append(time.monotonic())
+        if not _unsolicited(payload):
+            answers.put_nowait(None)
+
+
+def _summary(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+
+    def rank(fraction: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": rank(0.5),
+        "p99_ms": rank(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
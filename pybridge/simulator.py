@@ -0,0 +1,477 @@
+"""Simulated Apple TV fleet for load testing without Apple hardware.
+
+``--simulate`` swaps the pyatv entry points used by ``discovery``,
+``control`` and ``pairing`` (``scan``, ``connect`` and ``pair``) for a
+simulator, so every command runs its real code path against N virtual
+devices. A profile sets the device count and the distributions for
+discovery arrival, connect and command latency, plus power state,
+dropped connections and the pairing PIN.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import ipaddress
+import json
+import math
+import random
+from dataclasses import dataclass, field, fields
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+from pyatv import conf
+from pyatv import exceptions as pyatv_exceptions
+from pyatv.const import (
+    DeviceModel,
+    DeviceState,
+    InputAction,
+    OperatingSystem,
+    PairingRequirement,
+    PowerState,
+    Protocol,
+)
+from pyatv.interface import BaseConfig, DeviceInfo, Storage
+
+# Normal quantile of the 99th percentile, used to fit log-normal latencies.
+_Z99 = 2.326
+
+_MODELS = (DeviceModel.AppleTV4KGen3, DeviceModel.AppleTV4KGen2, DeviceModel.Gen4)
+_SERVICES = ((Protocol.Companion, 49153), (Protocol.AirPlay, 7000))
+
+
+class SimulationError(Exception):
+    """Raised when a simulation profile is invalid."""
+
+
+@dataclass
+class LatencyDistribution:
+    """Log-normal latency described by its median and 99th percentile, in seconds."""
+
+    p50: float = 0.0
+    p99: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.p50 <= 0:
+            return 0.0
+        if self.p99 <= self.p50:
+            return self.p50
+        sigma = math.log(self.p99 / self.p50) / _Z99
+        return rng.lognormvariate(math.log(self.p50), sigma)
+
+
+@dataclass
+class SimulationProfile:
+    """Behaviour of the simulated fleet.
+
+    ``command_latency`` maps command names (``home``, ``turn_on``, ...) to
+    distributions; ``default`` applies to every other command.
+    ``connect_failure_rate`` and ``drop_rate`` are probabilities per connect
+    and per command; a dropped connection fails every later call.
+    """
+
+    devices: int = 1
+    arrival: LatencyDistribution = field(default_factory=lambda: LatencyDistribution(0.2, 1.0))
+    connect_latency: LatencyDistribution = field(
+        default_factory=lambda: LatencyDistribution(0.15, 0.6)
+    )
+    command_latency: Dict[str, LatencyDistribution] = field(
+        default_factory=lambda: {"default": LatencyDistribution(0.02, 0.1)}
+    )
+    power_on_fraction: float = 1.0
+    connect_failure_rate: float = 0.0
+    drop_rate: float = 0.0
+    pin: str = "1234"
+    seed: Optional[int] = None
+
+    def command_distribution(self, command: str) -> LatencyDistribution:
+        return self.command_latency.get(
+            command, self.command_latency.get("default", LatencyDistribution())
+        )
+
+
+def load_profile(spec: str) -> SimulationProfile:
+    """Return a profile from a device count or the path of a JSON profile."""
+
+    if spec.isdigit():
+        return _validated(SimulationProfile(devices=int(spec)))
+
+    try:
+        with open(spec, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise SimulationError(f"unable to read simulation profile: {exc}") from exc
+
+    if not isinstance(data, dict):
+        raise SimulationError("simulation profile must be an object")
+
+    known = {item.name for item in fields(SimulationProfile)}
+    unknown = sorted(set(data) - known)
+    if unknown:
+        raise SimulationError(f"unknown simulation settings: {', '.join(unknown)}")
+
+    values: Dict[str, Any] = dict(data)
+    try:
+        for name in ("arrival", "connect_latency"):
+            if name in values:
+                values[name] = _distribution(values[name])
+        if "command_latency" in values:
+            commands = values["command_latency"]
+            if not isinstance(commands, dict):
+                commands = {"default": commands}
+            values["command_latency"] = {
+                str(command): _distribution(value) for command, value in commands.items()
+            }
+        profile = SimulationProfile(**values)
+    except (TypeError, ValueError) as exc:
+        raise SimulationError(f"invalid simulation profile: {exc}") from exc
+
+    return _validated(profile)
+
+
+def _distribution(value: Union[float, int, Dict[str, float]]) -> LatencyDistribution:
+    if isinstance(value, dict):
+        return LatencyDistribution(float(value.get("p50", 0.0)), float(value.get("p99", 0.0)))
+    return LatencyDistribution(float(value), float(value))
+
+
+def _validated(profile: SimulationProfile) -> SimulationProfile:
+    if profile.devices < 1:
+        raise SimulationError("simulation needs at least one device")
+    for name in ("power_on_fraction", "connect_failure_rate", "drop_rate"):
+        value = getattr(profile, name)
+        if not 0.0 <= value <= 1.0:
+            raise SimulationError(f"{name} must be between 0 and 1")
+    return profile
+
+
+@dataclass
+class SimulatedDevice:
+    """State of one virtual device that persists across connections."""
+
+    index: int
+    name: str
+    address: str
+    identifier: str
+    mac: str
+    model: DeviceModel
+    power_on: bool
+    playing: bool = False
+    credentials: Dict[Protocol, str] = field(default_factory=dict)
+
+    @property
+    def identifiers(self) -> Set[str]:
+        return {self.identifier, self.mac}
+
+
+class SimulatedFleet:
+    """Virtual devices plus drop-in replacements for ``scan``, ``connect`` and ``pair``."""
+
+    def __init__(self, profile: SimulationProfile) -> None:
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self.devices = [self._create_device(index) for index in range(profile.devices)]
+        self._by_identifier = {
+            identifier: device for device in self.devices for identifier in device.identifiers
+        }
+
+    def _create_device(self, index: int) -> SimulatedDevice:
+        mac = "02:" + ":".join(f"{(index >> shift) & 0xFF:02x}" for shift in (32, 24, 16, 8, 0))
+        return SimulatedDevice(
+            index=index,
+            name=f"Simulated {index + 1:03d}",
+            address=str(ipaddress.IPv4Address(0x0A100000 + index + 1)),
+            identifier=f"00000000-0000-4000-8000-{index:012X}",
+            mac=mac,
+            model=_MODELS[index % len(_MODELS)],
+            power_on=self.rng.random() < self.profile.power_on_fraction,
+        )
+
+    def device(self, identifier: str) -> SimulatedDevice:
+        try:
+            return self._by_identifier[identifier]
+        except KeyError as exc:
+            raise pyatv_exceptions.DeviceIdMissingError(f"unknown device: {identifier}") from exc
+
+    async def scan(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        timeout: float = 5,
+        identifier: Union[str, Set[str], None] = None,
+        protocol: Union[Protocol, Set[Protocol], None] = None,
+        hosts: Optional[List[str]] = None,
+        storage: Optional[Storage] = None,
+        **_kwargs: Any,
+    ) -> List[BaseConfig]:
+        """Answer like ``pyatv.scan``: wait for arrivals, stop early for identifiers."""
+
+        candidates = self.devices
+        if hosts is not None:
+            wanted_hosts = {str(host) for host in hosts}
+            candidates = [device for device in candidates if device.address in wanted_hosts]
+        if protocol is not None:
+            protocols = protocol if isinstance(protocol, set) else {protocol}
+            offered = {service for service, _ in _SERVICES}
+            if not protocols & offered:
+                candidates = []
+
+        arrivals = {device.index: self.profile.arrival.sample(self.rng) for device in candidates}
+
+        if identifier is not None:
+            # pyatv stops scanning as soon as the requested device answers.
+            identifiers = identifier if isinstance(identifier, set) else {identifier}
+            seen = [
+                device
+                for device in candidates
+                if device.identifiers & identifiers and arrivals[device.index] <= timeout
+            ]
+            if seen:
+                first = min(seen, key=lambda device: arrivals[device.index])
+                await asyncio.sleep(arrivals[first.index])
+                found = [first]
+            else:
+                await asyncio.sleep(timeout)
+                found = []
+        else:
+            await asyncio.sleep(timeout)
+            found = [device for device in candidates if arrivals[device.index] <= timeout]
+
+        configs = [self.config(device) for device in found]
+        if storage is not None:
+            for config in configs:
+                await _apply_stored_credentials(config, storage)
+        return configs
+
+    def config(self, device: SimulatedDevice) -> BaseConfig:
+        """Return a fresh pyatv configuration describing *device*."""
+
+        device_info = DeviceInfo(
+            {
+                DeviceInfo.OPERATING_SYSTEM: OperatingSystem.TvOS,
+                DeviceInfo.VERSION: "17.5",
+                DeviceInfo.BUILD_NUMBER: "21L570",
+                DeviceInfo.MODEL: device.model,
+                DeviceInfo.MAC: device.mac,
+            }
+        )
+        config = conf.AppleTV(
+            ipaddress.IPv4Address(device.address),
+            device.name,
+            deep_sleep=not device.power_on,
+            device_info=device_info,
+        )
+        for protocol, port in _SERVICES:
+            config.add_service(
+                conf.ManualService(
+                    device.identifier if protocol == Protocol.Companion else device.mac,
+                    protocol,
+                    port,
+                    {},
+                    credentials=device.credentials.get(protocol),
+                    pairing_requirement=PairingRequirement.Mandatory,
+                )
+            )
+        return config
+
+    async def connect(
+        self,
+        config: BaseConfig,
+        loop: asyncio.AbstractEventLoop,
+        protocol: Optional[Protocol] = None,
+        session: Any = None,
+        storage: Optional[Storage] = None,
+    ) -> "SimulatedAppleTV":
+        device = self.device(config.identifier)
+        await asyncio.sleep(self.profile.connect_latency.sample(self.rng))
+        if self.rng.random() < self.profile.connect_failure_rate:
+            raise pyatv_exceptions.ConnectionFailedError(
+                f"simulated connection failure: {device.name}"
+            )
+        return SimulatedAppleTV(self, device)
+
+    async def pair(
+        self,
+        config: BaseConfig,
+        protocol: Protocol,
+        loop: asyncio.AbstractEventLoop,
+        session: Any = None,
+        storage: Optional[Storage] = None,
+        **_kwargs: Any,
+    ) -> "SimulatedPairingHandler":
+        device = self.device(config.identifier)
+        return SimulatedPairingHandler(self, device, config, protocol, storage)
+
+    async def delay(self, command: str) -> None:
+        await asyncio.sleep(self.profile.command_distribution(command).sample(self.rng))
+
+
+async def _apply_stored_credentials(config: BaseConfig, storage: Storage) -> None:
+    settings = await storage.get_settings(config)
+    for service in config.services:
+        protocol_settings = getattr(settings.protocols, service.protocol.name.lower(), None)
+        if protocol_settings is not None and protocol_settings.credentials:
+            service.credentials = protocol_settings.credentials
+
+
+class SimulatedAppleTV:
+    """Connection to a simulated device exposing the parts of ``AppleTV`` the bridge uses."""
+
+    def __init__(self, fleet: SimulatedFleet, device: SimulatedDevice) -> None:
+        self.fleet = fleet
+        self.device = device
+        self.dropped = False
+        self.closed = False
+        self.listener: Any = None
+        self.remote_control = _SimulatedRemote(self)
+        self.power = _SimulatedPower(self)
+        self.metadata = _SimulatedMetadata(self)
+
+    async def call(self, command: str) -> None:
+        """Apply command latency and the drop rate to one call."""
+
+        if self.closed or self.dropped:
+            raise pyatv_exceptions.ConnectionLostError("connection closed")
+        await self.fleet.delay(command)
+        if self.fleet.rng.random() < self.fleet.profile.drop_rate:
+            self.dropped = True
+            error = pyatv_exceptions.ConnectionLostError(
+                f"simulated connection drop: {self.device.name}"
+            )
+            if self.listener is not None:
+                self.listener.connection_lost(error)
+            raise error
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _SimulatedRemote:
+    def __init__(self, atv: SimulatedAppleTV) -> None:
+        self._atv = atv
+        self.protocol = _SimulatedMrpProtocol(atv)
+
+    def get(self, protocol: Protocol) -> Any:
+        """Return the MRP implementation, as pyatv's facade does, for the session heartbeat."""
+
+        return self if protocol is Protocol.MRP else None
+
+    def __getattr__(self, command: str) -> Any:
+        if command.startswith("_"):
+            raise AttributeError(command)
+
+        async def _press(action: InputAction = InputAction.SingleTap) -> None:
+            await self._atv.call(command)
+
+        return _press
+
+    async def play_pause(self) -> None:
+        await self._atv.call("play_pause")
+        self._atv.device.playing = not self._atv.device.playing
+
+    async def play(self) -> None:
+        await self._atv.call("play")
+        self._atv.device.playing = True
+
+    async def pause(self) -> None:
+        await self._atv.call("pause")
+        self._atv.device.playing = False
+
+
+class _SimulatedMrpProtocol:
+    def __init__(self, atv: SimulatedAppleTV) -> None:
+        self._atv = atv
+
+    async def send_and_receive(self, message: Any) -> Any:
+        await self._atv.call("heartbeat")
+        return message
+
+
+class _SimulatedPower:
+    def __init__(self, atv: SimulatedAppleTV) -> None:
+        self._atv = atv
+
+    async def turn_on(self, await_new_state: bool = False) -> None:
+        await self._atv.call("turn_on")
+        self._atv.device.power_on = True
+
+    async def turn_off(self, await_new_state: bool = False) -> None:
+        await self._atv.call("turn_off")
+        self._atv.device.power_on = False
+        self._atv.device.playing = False
+
+    @property
+    def power_state(self) -> PowerState:
+        return PowerState.On if self._atv.device.power_on else PowerState.Off
+
+
+class _SimulatedMetadata:
+    def __init__(self, atv: SimulatedAppleTV) -> None:
+        self._atv = atv
+
+    async def playing(self) -> Any:
+        await self._atv.call("playing")
+        state = DeviceState.Playing if self._atv.device.playing else DeviceState.Paused
+        return SimpleNamespace(device_state=state)
+
+
+class SimulatedPairingHandler:
+    """PIN pairing against a simulated device; only the profile PIN succeeds."""
+
+    device_provides_pin = True
+
+    def __init__(
+        self,
+        fleet: SimulatedFleet,
+        device: SimulatedDevice,
+        config: BaseConfig,
+        protocol: Protocol,
+        storage: Optional[Storage],
+    ) -> None:
+        self.fleet = fleet
+        self.device = device
+        self.config = config
+        self.protocol = protocol
+        self.storage = storage
+        self.service = config.get_service(protocol)
+        self.has_paired = False
+        self._pin: Optional[str] = None
+
+    async def begin(self) -> None:
+        await self.fleet.delay("pair_begin")
+
+    def pin(self, pin: Union[str, int]) -> None:
+        self._pin = str(pin)
+
+    async def finish(self) -> None:
+        await self.fleet.delay("pair_finish")
+        if self._pin != self.fleet.profile.pin:
+            raise pyatv_exceptions.PairingError("simulated pairing rejected the PIN")
+
+        credentials = f"simulated-{self.protocol.name.lower()}-{self.device.index}"
+        self.device.credentials[self.protocol] = credentials
+        self.service.credentials = credentials
+        self.has_paired = True
+
+        if self.storage is not None:
+            settings = await self.storage.get_settings(self.config)
+            getattr(settings.protocols, self.protocol.name.lower()).credentials = credentials
+
+    async def close(self) -> None:
+        return None
+
+
+@contextlib.contextmanager
+def simulated(profile: SimulationProfile) -> Iterator[SimulatedFleet]:
+    """Route discovery, connections and pairing to a simulated fleet while active."""
+
+    from . import control, discovery, pairing
+
+    fleet = SimulatedFleet(profile)
+    originals = (discovery.scan, control.connect, pairing.pyatv_pair)
+    discovery.scan = fleet.scan
+    control.connect = fleet.connect
+    pairing.pyatv_pair = fleet.pair
+    try:
+        yield fleet
+    finally:
+        discovery.scan, control.connect, pairing.pyatv_pair = originals
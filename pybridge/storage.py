@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+import abc
 import asyncio
+import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Type, TypeVar
 
 import os
 
-from pyatv.interface import Storage
-from pyatv.storage.file_storage import FileStorage
+from .tracing import span
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pyatv.interface import Storage
 
 
 class StorageError(Exception):
@@ -43,9 +47,13 @@ async def load_storage(
         StorageError: If storage cannot be created or loaded.
     """
 
+    # Imported lazily so commands that never touch credentials skip loading pyatv.
+    from pyatv.storage.file_storage import FileStorage
+
     try:
-        storage = FileStorage(path, loop) if path else FileStorage.default_storage(loop)
-        await storage.load()
+        with span("storage.load"):
+            storage = FileStorage(path, loop) if path else FileStorage.default_storage(loop)
+            await storage.load()
     except Exception as exc:  # noqa: BLE001 - surface as StorageError
         raise StorageError("unable to initialize pyatv storage") from exc
 
@@ -60,7 +68,7 @@ async def clear_storage(
     The default location is ``$HOME/.pyatv.conf`` when *path* is omitted.
     """
 
-    target = Path(path) if path else Path.home() / ".pyatv.conf"
+    target = Path(path) if path else _default_storage_path()
 
     def _remove_file() -> bool:
         try:
@@ -76,3 +84,106 @@ async def clear_storage(
 
     status = "cleared" if removed else "missing"
     return ClearStorageResult(status=status, cleared=removed, path=target.as_posix())
+
+
+def state_path(storage_path: Optional[str], name: str) -> Path:
+    """Return the path of bridge state file *name* kept beside the storage file.
+
+    With the default storage this resolves to e.g. ``$HOME/.pyatv.scan.json``.
+    """
+
+    base = Path(storage_path) if storage_path else _default_storage_path()
+    return base.with_name(f"{base.stem}.{name}.json")
+
+
+def read_state(path: Path) -> Dict[str, Any]:
+    """Read a JSON state file, returning an empty mapping when absent or unreadable."""
+
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def write_state(path: Path, data: Dict[str, Any]) -> None:
+    """Atomically write a JSON state file."""
+
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+async def load_state(loop: asyncio.AbstractEventLoop, path: Path) -> Dict[str, Any]:
+    """Load a JSON state file without blocking the loop; see ``read_state``."""
+
+    return await loop.run_in_executor(None, read_state, path)
+
+
+async def save_state(
+    loop: asyncio.AbstractEventLoop, path: Path, data: Dict[str, Any]
+) -> None:
+    """Atomically write a JSON state file without blocking the loop."""
+
+    try:
+        await loop.run_in_executor(None, write_state, path, data)
+    except Exception as exc:  # noqa: BLE001 - surface as StorageError
+        raise StorageError(f"unable to write bridge state: {path}") from exc
+
+
+StateT = TypeVar("StateT", bound="BridgeState")
+
+
+class BridgeState(abc.ABC):
+    """Bridge state persisted as JSON beside the storage file.
+
+    Subclasses name their file with ``STATE_NAME``, accept its contents as the
+    ``data`` keyword of their constructor and set ``dirty`` when they change.
+    The state only saves work, so an absent or unreadable file loads as empty
+    and write errors are ignored. Without a ``path`` it is kept in memory.
+    """
+
+    STATE_NAME = ""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.dirty = False
+
+    @classmethod
+    def state_file(cls, storage_path: Optional[str]) -> Path:
+        return state_path(storage_path, cls.STATE_NAME)
+
+    @classmethod
+    async def load(
+        cls: Type[StateT],
+        loop: asyncio.AbstractEventLoop,
+        storage_path: Optional[str],
+        *args: Any,
+        **kwargs: Any,
+    ) -> StateT:
+        """Load the state; extra arguments are passed on to the constructor."""
+
+        path = cls.state_file(storage_path)
+        return cls(*args, path=path, data=await load_state(loop, path), **kwargs)
+
+    async def save(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Write the state when it changed since it was loaded or last saved."""
+
+        if self.path is None or not self.dirty:
+            return
+
+        try:
+            await save_state(loop, self.path, self.to_state())
+        except StorageError:
+            pass
+        self.dirty = False
+
+    @abc.abstractmethod
+    def to_state(self) -> Dict[str, Any]:
+        """Return the JSON-friendly data to persist."""
+
+
+def _default_storage_path() -> Path:
+    return Path.home() / ".pyatv.conf"
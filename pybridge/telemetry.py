@@ -0,0 +1,146 @@
+"""Discovery arrival telemetry used to size scan timeouts."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+from .constants import DEFAULT_TIMEOUT, MIN_TIMEOUT
+from .storage import BridgeState
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pyatv.interface import BaseConfig
+
+# Adaptive timeouts are only trusted once this many arrivals have been observed.
+MIN_ADAPTIVE_SAMPLES = 3
+ADAPTIVE_PERCENTILE = 0.99
+ADAPTIVE_MARGIN = 0.25
+MAX_ARRIVAL_SAMPLES = 50
+MAX_SWEEP_SAMPLES = 20
+
+
+class ScanTelemetry(BridgeState):
+    """Per-device discovery arrival history persisted beside the storage file.
+
+    ``pyatv.scan`` only reports once the scan completes, so arrival times are
+    sampled from identifier-targeted scans, which return as soon as the device
+    answers. Every scan also refreshes the name/address/identifier registry
+    used to turn a selector into such a targeted scan.
+    """
+
+    STATE_NAME = "scan"
+
+    def __init__(self, path: Optional[Path] = None, data: Optional[Dict[str, Any]] = None):
+        super().__init__(path)
+        data = data or {}
+        self.devices: Dict[str, Dict[str, Any]] = dict(data.get("devices", {}))
+        self.sweeps: List[Dict[str, Any]] = list(data.get("sweeps", []))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"devices": self.devices, "sweeps": self.sweeps}
+
+    def register(self, config: BaseConfig) -> Dict[str, Any]:
+        """Record the latest name, address and identifiers of a device."""
+
+        entry = self.devices.setdefault(config.identifier, {"arrivals": {}})
+        entry["name"] = getattr(config, "name", None)
+        entry["address"] = str(config.address)
+        entry["identifiers"] = [value for value in config.all_identifiers if value]
+        self.dirty = True
+        return entry
+
+    def record_arrival(self, config: BaseConfig, seconds: float) -> None:
+        """Record how long *config* took to answer, for every protocol it advertised."""
+
+        arrivals = self.register(config)["arrivals"]
+        for service in config.services:
+            samples = arrivals.setdefault(service.protocol.name, [])
+            samples.append(round(seconds, 4))
+            del samples[:-MAX_ARRIVAL_SAMPLES]
+
+    def record_sweep(self, timeout: float, elapsed: float, found: int) -> None:
+        self.sweeps.append(
+            {"timeout": round(timeout, 4), "elapsed": round(elapsed, 4), "devices": found}
+        )
+        del self.sweeps[:-MAX_SWEEP_SAMPLES]
+        self.dirty = True
+
+    def lookup(self, selector: str) -> Optional[str]:
+        """Return the main identifier of the known device matching *selector*."""
+
+        target = selector.lower()
+        for identifier, entry in self.devices.items():
+            candidates = [identifier, entry.get("name"), *entry.get("identifiers", [])]
+            if any(value and value.lower() == target for value in candidates):
+                return identifier
+            if entry.get("address") == selector:
+                return identifier
+        return None
+
+    def identifiers(self, identifier: str) -> Set[str]:
+        """Return every recorded identifier of a known device."""
+
+        return {identifier, *self.devices.get(identifier, {}).get("identifiers", [])}
+
+    def adaptive_timeout(self, identifier: Optional[str] = None) -> float:
+        """Return the p99 arrival time plus a margin, or the default timeout.
+
+        With *identifier* only that device's arrivals are considered.
+        """
+
+        samples = self._samples(identifier)
+        if len(samples) < MIN_ADAPTIVE_SAMPLES:
+            return DEFAULT_TIMEOUT
+
+        learned = _percentile(samples, ADAPTIVE_PERCENTILE) + ADAPTIVE_MARGIN
+        return round(min(DEFAULT_TIMEOUT, max(MIN_TIMEOUT, learned)), 3)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return JSON friendly statistics for ``scan --stats``."""
+
+        devices = {}
+        for identifier, entry in self.devices.items():
+            devices[identifier] = {
+                "name": entry.get("name"),
+                "address": entry.get("address"),
+                "adaptive_timeout": self.adaptive_timeout(identifier),
+                "protocols": {
+                    protocol: _sample_stats(samples)
+                    for protocol, samples in entry.get("arrivals", {}).items()
+                },
+            }
+
+        return {
+            "adaptive_timeout": self.adaptive_timeout(),
+            "samples": len(self._samples()),
+            "devices": devices,
+            "sweeps": list(self.sweeps),
+        }
+
+    def _samples(self, identifier: Optional[str] = None) -> List[float]:
+        entries = (
+            [self.devices.get(identifier, {})] if identifier else list(self.devices.values())
+        )
+        return [
+            sample
+            for entry in entries
+            for samples in entry.get("arrivals", {}).values()
+            for sample in samples
+        ]
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of *samples*."""
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _sample_stats(samples: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(samples),
+        "p50": _percentile(samples, 0.5) if samples else None,
+        "p99": _percentile(samples, 0.99) if samples else None,
+        "max": max(samples) if samples else None,
+    }
@@ -0,0 +1,115 @@
+"""Lightweight spans exported as Chrome trace-event JSON.
+
+Wrap a phase in ``with span("connect", identifier=...):``. Spans cost one
+global lookup unless ``--trace-events`` is active, in which case they are
+collected and written on exit in the trace-event format understood by
+``chrome://tracing`` and Perfetto. Each asyncio task gets its own track so
+concurrent work does not overlap on one row.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+import weakref
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+_NULL_SPAN: ContextManager[None] = contextlib.nullcontext()
+
+
+class Tracer:
+    """Collects complete ("X") trace events."""
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._tracks: "weakref.WeakKeyDictionary[asyncio.Task, int]" = weakref.WeakKeyDictionary()
+        self._threads: Dict[int, int] = {}
+        self._next_track = 1
+
+    def record(self, name: str, started: float, finished: float, args: Dict[str, Any]) -> None:
+        event: Dict[str, Any] = {
+            "name": name,
+            "ph": "X",
+            "ts": round((started - self._origin) * 1e6, 3),
+            "dur": round((finished - started) * 1e6, 3),
+            "pid": self._pid,
+            "tid": self._track(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def _track(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+
+        if task is None:
+            ident = threading.get_ident()
+            if ident not in self._threads:
+                self._threads[ident] = self._name_track(threading.current_thread().name)
+            return self._threads[ident]
+
+        track = self._tracks.get(task)
+        if track is None:
+            track = self._tracks[task] = self._name_track(task.get_name())
+        return track
+
+    def _name_track(self, name: str) -> int:
+        track = self._next_track
+        self._next_track += 1
+        self.events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": track,
+                "args": {"name": name},
+            }
+        )
+        return track
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, handle)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """Time the enclosed block as *name* when tracing is enabled."""
+
+    if _tracer is None:
+        return _NULL_SPAN
+    return _recording_span(_tracer, name, args)
+
+
+@contextlib.contextmanager
+def _recording_span(tracer: Tracer, name: str, args: Dict[str, Any]) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.record(name, started, time.perf_counter(), args)
+
+
+@contextlib.contextmanager
+def tracing() -> Iterator[Tracer]:
+    """Collect spans into the yielded tracer while active."""
+
+    global _tracer
+
+    tracer = Tracer()
+    _tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = None
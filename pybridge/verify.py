@@ -0,0 +1,258 @@
+"""Concurrent health checks for stored pyatv credentials."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pyatv import exceptions as pyatv_exceptions
+from pyatv.const import Protocol
+from pyatv.interface import BaseConfig, Storage
+
+from .constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_TIMEOUT, DEFAULT_VERIFY_CONCURRENCY
+from .control import ControlError, _connect_device
+from .device_lookup import select_config
+from .discovery import DiscoveryOptions, scan_configs
+from .storage import load_storage
+
+VALID = "valid"
+STALE = "stale"
+UNREACHABLE = "unreachable"
+
+# Errors raised while connecting that mean the device rejected the credentials.
+STALE_ERRORS = (
+    pyatv_exceptions.AuthenticationError,
+    pyatv_exceptions.InvalidCredentialsError,
+    pyatv_exceptions.NoCredentialsError,
+    pyatv_exceptions.PairingError,
+)
+
+_SETTINGS_PROTOCOLS = {
+    "airplay": Protocol.AirPlay,
+    "companion": Protocol.Companion,
+    "dmap": Protocol.DMAP,
+    "mrp": Protocol.MRP,
+    "raop": Protocol.RAOP,
+}
+
+
+class VerifyError(Exception):
+    """Raised when the credential health check cannot run."""
+
+
+@dataclass
+class VerifyOptions:
+    """Options for verifying every stored credential."""
+
+    concurrency: int = DEFAULT_VERIFY_CONCURRENCY
+    timeout: float = DEFAULT_TIMEOUT
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    storage_path: Optional[str] = None
+    use_storage: bool = True
+    mock: bool = False
+
+
+@dataclass
+class ProtocolHealth:
+    """Verification result for the credentials of one protocol."""
+
+    protocol: str
+    status: str
+    elapsed: Optional[float]
+    error: Optional[str] = None
+
+
+@dataclass
+class DeviceHealth:
+    """Verification results for one stored device."""
+
+    identifier: str
+    name: Optional[str]
+    address: Optional[str]
+    status: str
+    protocols: List[ProtocolHealth] = field(default_factory=list)
+
+
+@dataclass
+class VerifyResult:
+    """Fleet-wide credential health report."""
+
+    status: str
+    devices: List[DeviceHealth]
+    valid: int
+    stale: int
+    unreachable: int
+    elapsed: float
+
+
+async def verify_credentials(options: VerifyOptions) -> VerifyResult:
+    """Connect to every device with stored credentials and classify them.
+
+    Each protocol is checked with its own connection restricted to that
+    protocol; connecting runs the protocol's credential verification
+    handshake, so a successful connect proves the credentials are valid.
+    """
+
+    started = time.monotonic()
+
+    if options.mock:
+        return _mock_result(started)
+
+    if not options.use_storage:
+        raise VerifyError("storage is required to verify credentials")
+
+    loop = asyncio.get_running_loop()
+    storage = await load_storage(loop, options.storage_path)
+
+    stored = _stored_devices(storage)
+    if not stored:
+        return _summarise([], started)
+
+    configs = await scan_configs(
+        DiscoveryOptions(
+            timeout=options.timeout,
+            protocol=None,
+            identifier=None,
+            storage_path=options.storage_path,
+            use_storage=options.use_storage,
+        ),
+        storage=storage,
+    )
+
+    semaphore = asyncio.Semaphore(max(1, options.concurrency))
+
+    async def _check(config: BaseConfig, protocol: Protocol) -> ProtocolHealth:
+        async with semaphore:
+            return await _verify_protocol(config, protocol, loop, storage, options)
+
+    async def _check_device(identifiers: List[str], protocols: List[Protocol]) -> DeviceHealth:
+        config = _match_config(configs, identifiers)
+        if config is None:
+            return DeviceHealth(
+                identifier=identifiers[0],
+                name=None,
+                address=None,
+                status=UNREACHABLE,
+                protocols=[
+                    ProtocolHealth(protocol.name, UNREACHABLE, None, "device not found")
+                    for protocol in protocols
+                ],
+            )
+
+        results = await asyncio.gather(*[_check(config, protocol) for protocol in protocols])
+        return DeviceHealth(
+            identifier=config.identifier,
+            name=getattr(config, "name", None),
+            address=str(config.address),
+            status=_worst(results),
+            protocols=list(results),
+        )
+
+    devices = await asyncio.gather(
+        *[_check_device(identifiers, protocols) for identifiers, protocols in stored]
+    )
+    return _summarise(list(devices), started)
+
+
+async def _verify_protocol(
+    config: BaseConfig,
+    protocol: Protocol,
+    loop: asyncio.AbstractEventLoop,
+    storage: Storage,
+    options: VerifyOptions,
+) -> ProtocolHealth:
+    if config.get_service(protocol) is None:
+        return ProtocolHealth(protocol.name, UNREACHABLE, None, "service not advertised")
+
+    started = time.monotonic()
+    atv = None
+    try:
+        atv = await asyncio.wait_for(
+            _connect_device(config, loop, storage, protocol), options.connect_timeout
+        )
+    except asyncio.TimeoutError:
+        return ProtocolHealth(protocol.name, UNREACHABLE, _since(started), "connect timed out")
+    except OSError as exc:
+        error = str(exc) or type(exc).__name__
+        return ProtocolHealth(protocol.name, UNREACHABLE, _since(started), error)
+    except ControlError as exc:
+        status = STALE if isinstance(exc.__cause__, STALE_ERRORS) else UNREACHABLE
+        return ProtocolHealth(protocol.name, status, _since(started), str(exc) or None)
+    finally:
+        if atv is not None:
+            atv.close()
+
+    return ProtocolHealth(protocol.name, VALID, _since(started))
+
+
+def _stored_devices(storage: Storage) -> List[Tuple[List[str], List[Protocol]]]:
+    """Return the identifiers and credentialed protocols of every stored device."""
+
+    devices = []
+    for settings in storage.settings:
+        identifiers: List[str] = []
+        protocols: List[Protocol] = []
+        for attribute, protocol in _SETTINGS_PROTOCOLS.items():
+            protocol_settings = getattr(settings.protocols, attribute)
+            if protocol_settings.identifier:
+                identifiers.append(protocol_settings.identifier)
+            if protocol_settings.credentials:
+                protocols.append(protocol)
+
+        if identifiers and protocols:
+            devices.append((identifiers, protocols))
+    return devices
+
+
+def _match_config(configs: List[BaseConfig], identifiers: List[str]) -> Optional[BaseConfig]:
+    for identifier in identifiers:
+        config = select_config(configs, identifier)
+        if config is not None:
+            return config
+    return None
+
+
+def _worst(results: List[ProtocolHealth]) -> str:
+    statuses = {result.status for result in results}
+    for status in (STALE, UNREACHABLE):
+        if status in statuses:
+            return status
+    return VALID
+
+
+def _summarise(devices: List[DeviceHealth], started: float) -> VerifyResult:
+    counts: Dict[str, int] = {VALID: 0, STALE: 0, UNREACHABLE: 0}
+    for device in devices:
+        counts[device.status] += 1
+
+    return VerifyResult(
+        status="ok",
+        devices=devices,
+        valid=counts[VALID],
+        stale=counts[STALE],
+        unreachable=counts[UNREACHABLE],
+        elapsed=_since(started),
+    )
+
+
+def _since(started: float) -> float:
+    return round(time.monotonic() - started, 4)
+
+
+def _mock_result(started: float) -> VerifyResult:
+    device: Dict[str, Any] = {
+        "identifier": "11223344-5566-7788-9900-112233445566",
+        "name": "Living Room",
+        "address": "10.0.0.10",
+    }
+    health = DeviceHealth(
+        status=VALID,
+        protocols=[
+            ProtocolHealth(Protocol.Companion.name, VALID, 0.0),
+            ProtocolHealth(Protocol.AirPlay.name, VALID, 0.0),
+        ],
+        **device,
+    )
+    return _summarise([health], started)
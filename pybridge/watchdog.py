@@ -0,0 +1,154 @@
+"""Event-loop stall detection for long-running sessions.
+
+``LoopWatchdog`` measures loop lag with a ticker task that sleeps for a
+fixed interval and records how late it wakes up. A daemon thread watches the
+ticker's heartbeat; when the loop has not run the ticker for longer than the
+threshold it snapshots the loop thread's stack and the task that is running,
+which points at the blocking call while it is still blocking.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import sys
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+# Seconds between lag samples.
+TICK_INTERVAL = 0.05
+# Lag samples and stalls kept for statistics.
+MAX_SAMPLES = 4096
+MAX_STALLS = 16
+# Innermost frames kept in a stall's stack snapshot.
+MAX_STACK_DEPTH = 12
+
+
+@dataclass
+class Stall:
+    """A period in which the loop did not run the ticker for over the threshold."""
+
+    at: float
+    lag_ms: float
+    task: Optional[str]
+    stack: List[str]
+
+
+class LoopWatchdog:
+    """Sample event-loop lag and capture stacks of stalls longer than *threshold* seconds."""
+
+    def __init__(self, threshold: float, interval: float = TICK_INTERVAL) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.stall_count = 0
+        self._samples: Deque[float] = collections.deque(maxlen=MAX_SAMPLES)
+        self._stalls: Deque[Stall] = collections.deque(maxlen=MAX_STALLS)
+        self._started = time.monotonic()
+        self._beat = self._started
+        self._pending: Optional[Stall] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ticker: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+
+    def start(self) -> None:
+        """Start watching the running loop."""
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._ticker = self._loop.create_task(self._tick(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lag percentiles (milliseconds) and the most recent stalls."""
+
+        with self._lock:
+            ordered = sorted(self._samples)
+            stalls = list(self._stalls)
+            # A stall that just ended is pending until the ticker runs again.
+            if self._pending is not None:
+                stalls.append(self._pending)
+            count = self.stall_count + (self._pending is not None)
+
+        def rank(fraction: float) -> Optional[float]:
+            if not ordered:
+                return None
+            index = min(len(ordered) - 1, int(fraction * len(ordered)))
+            return round(ordered[index] * 1000, 3)
+
+        return {
+            "threshold_ms": round(self.threshold * 1000, 3),
+            "samples": len(ordered),
+            "lag_p50_ms": rank(0.5),
+            "lag_p99_ms": rank(0.99),
+            "lag_max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+            "stalls": count,
+            "recent_stalls": [asdict(stall) for stall in stalls[-MAX_STALLS:]],
+        }
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self._lock:
+                self._beat = now
+                self._samples.append(lag)
+                stall, self._pending = self._pending, None
+                if stall is None and lag > self.threshold:
+                    # The sampler thread missed this one (e.g. it was shorter
+                    # than a sampling period); record it without a stack.
+                    stall = Stall(
+                        at=round(expected - self._started, 3), lag_ms=0.0, task=None, stack=[]
+                    )
+                if stall is not None:
+                    stall.lag_ms = round(lag * 1000, 3)
+                    self._stalls.append(stall)
+                    self.stall_count += 1
+
+    def _watch(self) -> None:
+        period = max(0.005, self.threshold / 2)
+        while not self._stop.wait(period):
+            with self._lock:
+                overdue = time.monotonic() - self._beat - self.interval
+                if overdue <= self.threshold or self._pending is not None:
+                    continue
+                self._pending = Stall(
+                    at=round(self._beat + self.interval - self._started, 3),
+                    lag_ms=round(overdue * 1000, 3),
+                    task=self._current_task(),
+                    stack=self._loop_stack(),
+                )
+
+    def _current_task(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:  # pragma: no cover - loop closed underneath us
+            return None
+        return task.get_name() if task is not None else None
+
+    def _loop_stack(self) -> List[str]:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:  # pragma: no cover - loop thread exited
+            return []
+        summary = traceback.extract_stack(frame)[-MAX_STACK_DEPTH:]
+        return [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in summary]
@@ -0,0 +1,233 @@
+"""Fake pyatv devices and a CLI test case shared by the device-facing tests."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from unittest.mock import AsyncMock, patch
+
+from pyatv.const import DeviceState, InputAction, PowerState, Protocol, TouchAction
+
+from pybridge import cli
+
+
+class FakeMrpProtocol:
+    """MRP protocol answering heartbeats, or failing or stalling when told to."""
+
+    def __init__(self) -> None:
+        self.heartbeats = 0
+        self.side_effect: Optional[Exception] = None
+        self.stalled = False
+
+    async def send_and_receive(self, message):
+        self.heartbeats += 1
+        if self.side_effect is not None:
+            raise self.side_effect
+        if self.stalled:
+            await asyncio.Event().wait()
+        return message
+
+
+class FakeRemote:
+    def __init__(self):
+        self.calls = []
+        self.play_pause_side_effect: Optional[Exception] = None
+        self.protocol = FakeMrpProtocol()
+
+    def get(self, protocol: Protocol):
+        return self if protocol is Protocol.MRP else None
+
+    async def home(self, action: InputAction) -> None:
+        self.calls.append(("home", action))
+
+    async def menu(self, action: InputAction) -> None:
+        self.calls.append(("menu", action))
+
+    async def select(self, action: InputAction) -> None:
+        self.calls.append(("select", action))
+
+    async def up(self, action: InputAction) -> None:
+        self.calls.append(("up", action))
+
+    async def down(self, action: InputAction) -> None:
+        self.calls.append(("down", action))
+
+    async def left(self, action: InputAction) -> None:
+        self.calls.append(("left", action))
+
+    async def right(self, action: InputAction) -> None:
+        self.calls.append(("right", action))
+
+    async def play_pause(self) -> None:
+        if self.play_pause_side_effect is not None:
+            raise self.play_pause_side_effect
+        self.calls.append(("play_pause", None))
+
+    async def play(self) -> None:
+        self.calls.append(("play", None))
+
+    async def pause(self) -> None:
+        self.calls.append(("pause", None))
+
+
+class FakePower:
+    def __init__(self, property_style: bool = False):
+        self.turn_on_called = False
+        self.turn_off_called = False
+        self.state = PowerState.On
+        self.property_style = property_style
+
+    async def turn_on(self) -> None:
+        self.turn_on_called = True
+
+    async def turn_off(self) -> None:
+        self.turn_off_called = True
+
+    async def _power_state_async(self) -> PowerState:
+        return self.state
+
+    @property
+    def power_state(self):  # type: ignore[override]
+        if self.property_style:
+            return self.state
+        return self._power_state_async
+
+
+class FakeConfig:
+    def __init__(self):
+        self.identifier = "11223344-5566-7788-9900-112233445566"
+        self.all_identifiers = [self.identifier, "00:11:22:33:44:55"]
+        self.name = "Living Room"
+        self.address = "10.0.0.10"
+        self.device_info = type(
+            "FakeDeviceInfo",
+            (),
+            {
+                "model": type("FakeModel", (), {"name": "AppleTV4KGen3"})(),
+                "model_str": "Apple TV 4K (3rd generation)",
+            },
+        )()
+
+
+class FakeMetadata:
+    def __init__(self) -> None:
+        self.state = DeviceState.Paused
+
+    async def playing(self):
+        class _FakePlaying:
+            def __init__(self, device_state: DeviceState) -> None:
+                self.device_state = device_state
+
+        return _FakePlaying(self.state)
+
+
+class FakeAppleTV:
+    def __init__(self, power: FakePower | None = None):
+        self.remote_control = FakeRemote()
+        self.power = power or FakePower()
+        self.metadata = FakeMetadata()
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeTouch:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls = []
+
+    async def action(self, x: int, y: int, mode: TouchAction) -> None:
+        await asyncio.sleep(self.delay)
+        self.calls.append((mode, x, y))
+
+    async def swipe(self, start_x, start_y, end_x, end_y, duration_ms) -> None:
+        self.calls.append(("swipe", start_x, start_y, end_x, end_y, duration_ms))
+
+    async def click(self, action: InputAction) -> None:
+        self.calls.append(("click", action))
+
+
+class PausedInput:
+    """Stdin replacement returning each line after a delay, like a client thinking."""
+
+    def __init__(self, *lines):
+        self._lines = list(lines)
+
+    def readline(self) -> str:
+        if not self._lines:
+            return ""
+        delay, payload = self._lines.pop(0)
+        time.sleep(delay)
+        return json.dumps(payload) + "\n"
+
+
+def request_lines(*requests: Dict[str, Any]) -> io.StringIO:
+    """Return a stdin replacement holding one NDJSON line per request."""
+
+    return io.StringIO("".join(json.dumps(request) + "\n" for request in requests))
+
+
+class DeviceTestCase(unittest.TestCase):
+    """Run the CLI against ``apple_tv``, found as ``config`` by every scan.
+
+    Bridge state files are kept in a temporary directory that also holds the
+    storage path ``storage``; ``scan`` and ``connect`` are the patched mocks.
+    """
+
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = Path(tmpdir.name)
+        self.storage = str(self.tmpdir / "pyatv.conf")
+        self.config = FakeConfig()
+        self.apple_tv = FakeAppleTV()
+        self.scan = AsyncMock(return_value=[self.config])
+        self.connect = AsyncMock(return_value=self.apple_tv)
+        self.stderr = io.StringIO()
+
+        self.stack = contextlib.ExitStack()
+        self.addCleanup(self.stack.close)
+        for target, value in (
+            ("pybridge.storage._default_storage_path", lambda: Path(self.storage)),
+            ("pybridge.control.scan_configs", self.scan),
+            ("pybridge.fleet.scan_configs", self.scan),
+            ("pybridge.control.load_storage", AsyncMock(return_value=None)),
+            ("pybridge.fleet.load_storage", AsyncMock(return_value=None)),
+            ("pybridge.control.connect", self.connect),
+        ):
+            self.stack.enter_context(patch(target, value))
+
+    def state_file(self, name: str) -> Path:
+        """Return the path of bridge state file *name* beside the storage file."""
+
+        return self.tmpdir / f"pyatv.{name}.json"
+
+    def run_cli(self, *argv: str, stdin: Any = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """Run ``cli.main`` and return its exit code and JSON output lines."""
+
+        stdout = io.StringIO()
+        self.stderr = io.StringIO()
+        with contextlib.ExitStack() as stack:
+            if stdin is not None:
+                stack.enter_context(patch("sys.stdin", stdin))
+            stack.enter_context(contextlib.redirect_stdout(stdout))
+            stack.enter_context(contextlib.redirect_stderr(self.stderr))
+            exit_code = cli.main(list(argv))
+        return exit_code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def run_session(
+        self, stdin: Any, *options: str, global_options: Sequence[str] = ()
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Run a session reading *stdin*, with session *options* and *global_options*."""
+
+        return self.run_cli(
+            *global_options, "session", "--identifier", "Living Room", *options, stdin=stdin
+        )
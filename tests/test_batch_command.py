@@ -0,0 +1,255 @@
+"""Unit tests for the pybridge CLI batch command."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from pyatv import exceptions as pyatv_exceptions
+from pyatv.const import InputAction, PowerState
+
+from pybridge import cli
+from pybridge.storage import StorageError
+
+
+class FakeRemote:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        async def _press(action: InputAction) -> None:
+            self.calls.append(name)
+
+        return _press
+
+
+class LosingRemote(FakeRemote):
+    def __getattr__(self, name):
+        if not self.calls:
+            return super().__getattr__(name)
+
+        async def _lost(action: InputAction) -> None:
+            raise pyatv_exceptions.ConnectionLostError("connection lost")
+
+        return _lost
+
+
+class FakePower:
+    def __init__(self):
+        self.turn_off_called = False
+
+    async def turn_off(self) -> None:
+        self.turn_off_called = True
+
+    @property
+    def power_state(self):
+        return PowerState.On
+
+
+class FakeAppleTV:
+    def __init__(self):
+        self.remote_control = FakeRemote()
+        self.power = FakePower()
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeConfig:
+    def __init__(self, identifier: str, name: str):
+        self.identifier = identifier
+        self.all_identifiers = [identifier]
+        self.name = name
+        self.address = "10.0.0.10"
+
+
+class FakeSettings:
+    def __init__(self):
+        companion = type("Companion", (), {"credentials": "token"})()
+        self.protocols = type("Protocols", (), {"companion": companion})()
+
+
+class WaitingInput:
+    """Stdin replacement that holds back EOF until *output* shows a result."""
+
+    def __init__(self, line: str, output: io.StringIO) -> None:
+        self._lines = [line]
+        self._output = output
+        self.answered_before_eof = False
+
+    def readline(self) -> str:
+        if self._lines:
+            return self._lines.pop(0)
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline and not self._output.getvalue():
+            time.sleep(0.01)
+        self.answered_before_eof = bool(self._output.getvalue())
+        return ""
+
+
+class BatchCommandTests(unittest.TestCase):
+    """Verify batched operations share discovery and connections."""
+
+    def _run(
+        self, stdin, stdout: io.StringIO, *argv: str, connect=None, storage=None
+    ) -> int:
+        configs = [
+            FakeConfig("living-room-id", "Living Room"),
+            FakeConfig("bedroom-id", "Bedroom"),
+        ]
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                patch("pybridge.batch.scan_configs", AsyncMock(return_value=configs))
+            )
+            stack.enter_context(
+                patch("pybridge.batch.load_storage", AsyncMock(return_value=storage))
+            )
+            stack.enter_context(
+                patch("pybridge.control.connect", AsyncMock(side_effect=connect))
+            )
+            stack.enter_context(patch("sys.stdin", stdin))
+            stack.enter_context(contextlib.redirect_stdout(stdout))
+            return cli.main(["batch", *argv])
+
+    def test_batch_runs_mixed_operations(self) -> None:
+        living_room = FakeConfig("living-room-id", "Living Room")
+        bedroom = FakeConfig("bedroom-id", "Bedroom")
+        connections = {}
+
+        async def fake_connect(config, _loop, storage=None):
+            atv = FakeAppleTV()
+            connections.setdefault(config.identifier, []).append(atv)
+            return atv
+
+        storage = AsyncMock()
+        storage.get_settings = AsyncMock(return_value=FakeSettings())
+
+        operations = [
+            {"op": "command", "identifier": "Living Room", "command": "home", "id": 1},
+            {"op": "power", "identifier": "Bedroom", "action": "off"},
+            {"op": "status", "identifier": "Living Room"},
+            {"op": "command", "identifier": "Living Room", "command": "up"},
+            {"op": "unpair", "identifier": "Bedroom", "protocol": "Companion"},
+            {"op": "power", "identifier": "Kitchen", "action": "off"},
+        ]
+        stdin = io.StringIO(
+            "\n".join([json.dumps(item) for item in operations] + ["not json", ""])
+        )
+        scan_mock = AsyncMock(return_value=[living_room, bedroom])
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(patch("pybridge.batch.scan_configs", scan_mock))
+            stack.enter_context(
+                patch("pybridge.batch.load_storage", AsyncMock(return_value=storage))
+            )
+            stack.enter_context(
+                patch("pybridge.control.connect", AsyncMock(side_effect=fake_connect))
+            )
+            stack.enter_context(patch("sys.stdin", stdin))
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(["batch"])
+
+        self.assertEqual(exit_code, 1)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        by_line = {line.get("line"): line for line in lines[:-1]}
+
+        self.assertEqual(scan_mock.await_count, 1)
+        self.assertEqual(len(connections["living-room-id"]), 1)
+        self.assertEqual(len(connections["bedroom-id"]), 1)
+        self.assertEqual(connections["living-room-id"][0].remote_control.calls, ["home", "up"])
+        self.assertTrue(connections["bedroom-id"][0].power.turn_off_called)
+        self.assertTrue(all(atv.closed for atvs in connections.values() for atv in atvs))
+
+        self.assertEqual(by_line[1]["id"], 1)
+        self.assertEqual(by_line[3]["power_state"], PowerState.On.name)
+        self.assertTrue(by_line[5]["credentials_removed"])
+        self.assertEqual(by_line[6]["error"], "device not found")
+        self.assertEqual(by_line[7]["error"], "invalid json")
+        storage.save.assert_awaited_once()
+
+        summary = lines[-1]
+        self.assertEqual((summary["succeeded"], summary["failed"]), (5, 2))
+
+    def test_batch_answers_before_input_ends(self) -> None:
+        stdout = io.StringIO()
+        stdin = WaitingInput(
+            json.dumps({"op": "command", "identifier": "Bedroom", "command": "home"}) + "\n",
+            stdout,
+        )
+
+        exit_code = self._run(stdin, stdout, connect=lambda *_args, **_kwargs: FakeAppleTV())
+
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(stdin.answered_before_eof)
+        self.assertEqual(json.loads(stdout.getvalue().splitlines()[0])["status"], "ok")
+
+    def test_batch_keeps_connections_within_concurrency(self) -> None:
+        connections = []
+        open_at_connect = []
+
+        async def fake_connect(config, _loop, storage=None):
+            open_at_connect.append(sum(not atv.closed for _, atv in connections))
+            atv = FakeAppleTV()
+            connections.append((config.identifier, atv))
+            return atv
+
+        operations = [
+            {"op": "command", "identifier": name, "command": "home"}
+            for name in ("Living Room", "Bedroom", "Living Room")
+        ]
+        stdin = io.StringIO("".join(json.dumps(item) + "\n" for item in operations))
+        stdout = io.StringIO()
+
+        exit_code = self._run(stdin, stdout, "--concurrency", "1", connect=fake_connect)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(open_at_connect, [0, 0, 0])
+        self.assertTrue(all(atv.closed for _, atv in connections))
+        self.assertEqual(
+            sorted(identifier for identifier, _ in connections),
+            ["bedroom-id", "living-room-id", "living-room-id"],
+        )
+
+    def test_batch_replaces_lost_connection_and_reports_item_errors(self) -> None:
+        connections = []
+
+        async def fake_connect(config, _loop, storage=None):
+            atv = FakeAppleTV()
+            if not connections:
+                # The first connection is lost after its first command.
+                atv.remote_control = LosingRemote()
+            connections.append(atv)
+            return atv
+
+        storage = AsyncMock()
+        storage.get_settings = AsyncMock(side_effect=StorageError("storage unreadable"))
+        operations = [
+            {"op": "command", "identifier": "Living Room", "command": "home"},
+            {"op": "command", "identifier": "Living Room", "command": "up"},
+            {"op": "unpair", "identifier": "Living Room", "protocol": "Companion"},
+            {"op": "status", "identifier": "Living Room"},
+        ]
+        stdin = io.StringIO("".join(json.dumps(item) + "\n" for item in operations))
+        stdout = io.StringIO()
+
+        exit_code = self._run(stdin, stdout, connect=fake_connect, storage=storage)
+
+        self.assertEqual(exit_code, 1)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        by_line = {line["line"]: line for line in lines[:-1]}
+        self.assertEqual([by_line[number]["status"] for number in (1, 2, 4)], ["ok"] * 3)
+        self.assertEqual(by_line[3]["error"], "storage unreadable")
+        self.assertEqual(len(connections), 2)
+        self.assertEqual(connections[1].remote_control.calls, ["up"])
+        self.assertTrue(all(atv.closed for atv in connections))
+        self.assertEqual((lines[-1]["succeeded"], lines[-1]["failed"]), (3, 1))
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Tests for the per-device circuit breaker (--breaker)."""
+
+from __future__ import annotations
+
+import json
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from bridge_fixtures import DeviceTestCase, FakeAppleTV
+
+
+class CircuitBreakerTests(DeviceTestCase):
+    """Verify unreachable devices fail fast once their breaker opens."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.scan.return_value = []
+        self.connect.side_effect = lambda *args, **kwargs: FakeAppleTV()
+
+    def _command(self, *options: str):
+        return self.run_cli(
+            "--storage",
+            self.storage,
+            "--breaker",
+            "2",
+            *options,
+            "command",
+            "--identifier",
+            "Living Room",
+            "--command",
+            "home",
+        )
+
+    def test_breaker_opens_after_consecutive_failures(self) -> None:
+        self.assertEqual(self._command()[0], 2)
+        self.assertEqual(self._command()[0], 2)
+
+        exit_code, lines = self._command()
+
+        self.assertEqual(exit_code, 4)
+        result = lines[0]
+        self.assertEqual(result["status"], "unavailable")
+        self.assertEqual((result["failures"], result["last_error"]), (2, "device not found"))
+        self.assertGreater(result["retry_after"], 0)
+        self.assertEqual(self.scan.await_count, 2)
+
+    def test_half_open_probe_closes_breaker(self) -> None:
+        self._command("--breaker-cooldown", "0.05")
+        self._command("--breaker-cooldown", "0.05")
+        time.sleep(0.1)
+        self.scan.return_value = [self.config]
+
+        exit_code, lines = self._command("--breaker-cooldown", "0.05")
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(lines[0]["status"], "ok")
+        self.assertEqual(json.loads(self.state_file("breaker").read_text())["devices"], {})
+
+    def test_scan_sighting_makes_breaker_due(self) -> None:
+        self._command()
+        self._command()
+
+        with patch("pybridge.discovery.scan_configs", AsyncMock(return_value=[self.config])):
+            self.run_cli("--storage", self.storage, "scan", "--fields", "name")
+        self.scan.return_value = [self.config]
+
+        self.assertEqual(self._command()[0], 0)
+
+    def test_breaker_is_rejected_for_fan_outs(self) -> None:
+        for command in (
+            ["command", "--all", "--command", "home"],
+            ["group", "--all", "--command", "home"],
+        ):
+            with self.subTest(command=command[0]):
+                exit_code, lines = self.run_cli(
+                    "--storage", self.storage, "--breaker", "2", *command
+                )
+
+                self.assertEqual((exit_code, lines), (2, []))
+                self.assertIn("--breaker only applies to a single device", self.stderr.getvalue())
+        self.scan.assert_not_awaited()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Tests for the per-device play/pause capability cache."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from pyatv import exceptions as pyatv_exceptions
+from pyatv.const import FeatureState
+
+from bridge_fixtures import DeviceTestCase
+
+
+class CapabilityCacheTests(DeviceTestCase):
+    """Verify play/pause goes straight to the path that works on a device."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.apple_tv.device_info = SimpleNamespace(build_number="21K69")
+        self.toggle = AsyncMock(side_effect=pyatv_exceptions.CommandError("unsupported"))
+        self.apple_tv.remote_control.play_pause = self.toggle
+
+    def _play_pause(self) -> int:
+        exit_code, _ = self.run_cli(
+            "command", "--identifier", "Living Room", "--command", "play_pause"
+        )
+        return exit_code
+
+    def test_learned_fallback_skips_toggle(self) -> None:
+        self.assertEqual(self._play_pause(), 0)
+        self.assertEqual(self._play_pause(), 0)
+
+        self.assertEqual(self.toggle.await_count, 1)
+        self.assertEqual(self.apple_tv.remote_control.calls, [("play", None), ("play", None)])
+        cache = json.loads(self.state_file("capabilities").read_text(encoding="utf-8"))
+        entry = cache["devices"][self.config.identifier]
+        self.assertEqual(entry["build_number"], "21K69")
+        self.assertEqual(entry["capabilities"]["play_pause"]["value"], "fallback")
+
+    def test_firmware_change_revalidates(self) -> None:
+        self._play_pause()
+        self.apple_tv.device_info = SimpleNamespace(build_number="22A3354")
+        self.toggle.side_effect = None
+
+        self._play_pause()
+        self._play_pause()
+
+        self.assertEqual(self.toggle.await_count, 3)
+        self.assertEqual(self.apple_tv.remote_control.calls, [("play", None)])
+
+    def test_unsupported_feature_uses_fallback_first(self) -> None:
+        feature = SimpleNamespace(state=FeatureState.Unsupported)
+        self.apple_tv.features = SimpleNamespace(get_feature=lambda name: feature)
+
+        self.assertEqual(self._play_pause(), 0)
+
+        self.toggle.assert_not_awaited()
+        self.assertEqual(self.apple_tv.remote_control.calls, [("play", None)])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
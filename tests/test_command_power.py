@@ -5,113 +5,33 @@ from __future__ import annotations
 import contextlib
 import io
 import json
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import AsyncMock, patch
-from typing import Optional
 
 from pyatv import exceptions as pyatv_exceptions
 from pyatv.const import DeviceState, InputAction, PowerState
 
+from bridge_fixtures import FakeAppleTV, FakeConfig, FakePower
 from pybridge import cli
 
 
-class FakeRemote:
-    def __init__(self):
-        self.calls = []
-        self.play_pause_side_effect: Optional[Exception] = None
-
-    async def home(self, action: InputAction) -> None:
-        self.calls.append(("home", action))
-
-    async def menu(self, action: InputAction) -> None:
-        self.calls.append(("menu", action))
-
-    async def select(self, action: InputAction) -> None:
-        self.calls.append(("select", action))
-
-    async def up(self, action: InputAction) -> None:
-        self.calls.append(("up", action))
-
-    async def down(self, action: InputAction) -> None:
-        self.calls.append(("down", action))
-
-    async def left(self, action: InputAction) -> None:
-        self.calls.append(("left", action))
-
-    async def right(self, action: InputAction) -> None:
-        self.calls.append(("right", action))
-
-    async def play_pause(self) -> None:
-        if self.play_pause_side_effect is not None:
-            raise self.play_pause_side_effect
-        self.calls.append(("play_pause", None))
-
-    async def play(self) -> None:
-        self.calls.append(("play", None))
-
-    async def pause(self) -> None:
-        self.calls.append(("pause", None))
-
-
-class FakePower:
-    def __init__(self, property_style: bool = False):
-        self.turn_on_called = False
-        self.turn_off_called = False
-        self.state = PowerState.On
-        self.property_style = property_style
-
-    async def turn_on(self) -> None:
-        self.turn_on_called = True
-
-    async def turn_off(self) -> None:
-        self.turn_off_called = True
-
-    async def _power_state_async(self) -> PowerState:
-        return self.state
-
-    @property
-    def power_state(self):  # type: ignore[override]
-        if self.property_style:
-            return self.state
-        return self._power_state_async
-
-
-class FakeConfig:
-    def __init__(self):
-        self.identifier = "11223344-5566-7788-9900-112233445566"
-        self.all_identifiers = [self.identifier, "00:11:22:33:44:55"]
-        self.name = "Living Room"
-        self.address = "10.0.0.10"
-
-
-class FakeMetadata:
-    def __init__(self) -> None:
-        self.state = DeviceState.Paused
-
-    async def playing(self):
-        class _FakePlaying:
-            def __init__(self, device_state: DeviceState) -> None:
-                self.device_state = device_state
-
-        return _FakePlaying(self.state)
-
-
-class FakeAppleTV:
-    def __init__(self, power: FakePower | None = None):
-        self.remote_control = FakeRemote()
-        self.power = power or FakePower()
-        self.metadata = FakeMetadata()
-        self.closed = False
-
-    def close(self) -> None:
-        self.closed = True
-
-
 class CommandPowerTests(unittest.TestCase):
     def setUp(self) -> None:
         self.config = FakeConfig()
         self.apple_tv = FakeAppleTV()
 
+        # Keep bridge state files (e.g. the capability cache) out of the home directory.
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        state_patch = patch(
+            "pybridge.storage._default_storage_path",
+            return_value=Path(tmpdir.name) / "pyatv.conf",
+        )
+        state_patch.start()
+        self.addCleanup(state_patch.stop)
+
         self.scan_patch = patch(
             "pybridge.control.scan_configs",
             AsyncMock(return_value=[self.config]),
@@ -0,0 +1,65 @@
+"""Tests for the --deadline option and per-request session deadlines."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+
+from pyatv.const import InputAction
+
+from bridge_fixtures import DeviceTestCase, FakeAppleTV, request_lines
+
+
+class DeadlineTests(DeviceTestCase):
+    """Verify deadlines cancel hung calls and report a timeout status."""
+
+    def test_one_shot_command_times_out_in_connect(self) -> None:
+        async def hung_connect(*args, **kwargs):
+            await asyncio.sleep(30)
+
+        self.connect.side_effect = hung_connect
+        started = time.monotonic()
+        exit_code, lines = self.run_cli(
+            "--deadline", "0.1", "command", "--identifier", "Living Room", "--command", "home"
+        )
+
+        self.assertEqual(exit_code, 3)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(
+            lines, [{"status": "timeout", "error": "deadline exceeded", "deadline": 0.1}]
+        )
+        self.assertIn("deadline exceeded after 0.1s", self.stderr.getvalue())
+
+    def test_session_request_times_out_and_connection_is_replaced(self) -> None:
+        hung = FakeAppleTV()
+
+        async def hung_home(action: InputAction) -> None:
+            await asyncio.sleep(30)
+
+        hung.remote_control.home = hung_home
+        fresh = FakeAppleTV()
+        self.connect.side_effect = [hung, fresh]
+        stdin = request_lines(
+            {"type": "command", "command": "home", "deadline": 0.1},
+            {"type": "command", "command": "home"},
+            {"type": "power", "action": "on", "deadline": "soon"},
+            {"type": "close"},
+        )
+
+        exit_code, responses = self.run_session(stdin, global_options=["--deadline", "5"])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            responses[1],
+            {"type": "command", "status": "timeout", "error": "deadline exceeded", "deadline": 0.1},
+        )
+        self.assertEqual(responses[2]["status"], "ok")
+        self.assertTrue(hung.closed)
+        self.assertEqual(fresh.remote_control.calls, [("home", InputAction.SingleTap)])
+        self.assertEqual(responses[3]["error"], "deadline must be a positive number of seconds")
+        self.assertEqual(responses[4]["status"], "closing")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
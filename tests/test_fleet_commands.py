@@ -0,0 +1,125 @@
+"""Tests for fan-out of command, power and group across several devices."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import unittest
+
+from pyatv.const import InputAction
+
+from bridge_fixtures import DeviceTestCase, FakeAppleTV, FakeConfig
+from pybridge import cli
+
+
+class FleetTests(DeviceTestCase):
+    """Verify fan-out of command and power across several devices."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.living_room = self.config
+        self.bedroom = FakeConfig()
+        self.bedroom.identifier = "aabbccdd-0000-0000-0000-000000000000"
+        self.bedroom.all_identifiers = [self.bedroom.identifier]
+        self.bedroom.name = "Bedroom"
+        self.bedroom.address = "10.0.0.11"
+        self.bedroom.device_info.model = type("FakeModel", (), {"name": "AppleTVHD"})()
+        self.bedroom.device_info.model_str = "Apple TV HD"
+        self.apple_tvs = {}
+
+        async def fake_connect(config, _loop, storage=None):
+            atv = FakeAppleTV()
+            self.apple_tvs[config.identifier] = atv
+            return atv
+
+        self.scan.return_value = [self.living_room, self.bedroom]
+        self.connect.side_effect = fake_connect
+
+    def test_power_off_all_devices_streams_results_and_summary(self) -> None:
+        exit_code, lines = self.run_cli("power", "--all", "--action", "off")
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.scan.await_count, 1)
+        results, summary = lines[:-1], lines[-1]
+        self.assertEqual(
+            sorted(line["identifier"] for line in results),
+            sorted([self.living_room.identifier, self.bedroom.identifier]),
+        )
+        self.assertTrue(all(line["power"] == "off" for line in results))
+        self.assertEqual(summary["status"], "complete")
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 0))
+        self.assertTrue(all(atv.power.turn_off_called for atv in self.apple_tvs.values()))
+        self.assertTrue(all(atv.closed for atv in self.apple_tvs.values()))
+
+    def test_command_model_filter_and_missing_identifier(self) -> None:
+        exit_code, lines = self.run_cli(
+            "command",
+            "--identifier",
+            "Bedroom",
+            "--identifier",
+            "Kitchen",
+            "--model",
+            "*hd*",
+            "--command",
+            "home",
+        )
+
+        self.assertEqual(exit_code, 1)
+        statuses = {line.get("identifier"): line["status"] for line in lines[:-1]}
+        self.assertEqual(statuses, {"Kitchen": "error", self.bedroom.identifier: "ok"})
+        self.assertEqual(list(self.apple_tvs), [self.bedroom.identifier])
+        self.assertEqual((lines[-1]["succeeded"], lines[-1]["failed"]), (1, 1))
+
+    def test_group_connects_all_before_dispatch_and_reports_skew(self) -> None:
+        exit_code, lines = self.run_cli("group", "--all", "--command", "home")
+
+        self.assertEqual(exit_code, 0)
+        result = lines[0]
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["operation"], {"command": "home", "action": "SingleTap"})
+        self.assertEqual(len(self.apple_tvs), 2)
+        expected_calls = [("home", InputAction.SingleTap)]
+        self.assertTrue(
+            all(atv.remote_control.calls == expected_calls for atv in self.apple_tvs.values())
+        )
+        self.assertTrue(all(atv.closed for atv in self.apple_tvs.values()))
+        offsets = [member["dispatched"] for member in result["members"]]
+        self.assertAlmostEqual(result["dispatch_skew"], max(offsets) - min(offsets), places=5)
+        self.assertGreaterEqual(result["completion_skew"], 0.0)
+
+    def test_group_reports_connect_failures(self) -> None:
+        async def failing_connect(config, _loop, storage=None):
+            if config.identifier == self.bedroom.identifier:
+                raise RuntimeError("unreachable")
+            atv = FakeAppleTV()
+            self.apple_tvs[config.identifier] = atv
+            return atv
+
+        self.connect.side_effect = failing_connect
+        exit_code, lines = self.run_cli("group", "--all", "--command", "up")
+
+        self.assertEqual(exit_code, 1)
+        statuses = {member["identifier"]: member["status"] for member in lines[0]["members"]}
+        self.assertEqual(
+            statuses, {self.living_room.identifier: "ok", self.bedroom.identifier: "error"}
+        )
+        self.assertEqual(lines[0]["status"], "partial")
+        self.assertEqual(lines[0]["dispatch_skew"], 0.0)
+
+    def test_mock_fleet_selects_by_name(self) -> None:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = cli.main(
+                ["--mock", "command", "--name", "living*", "--command", "menu"]
+            )
+
+        self.assertEqual(exit_code, 0)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(lines[0]["name"], "Living Room")
+        self.assertTrue(lines[0]["mock"])
+        self.assertEqual(lines[-1]["succeeded"], 1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
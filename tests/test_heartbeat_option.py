@@ -0,0 +1,78 @@
+"""Tests for the session heartbeat and the health message."""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import AsyncMock
+
+from pyatv import exceptions as pyatv_exceptions
+from pyatv.const import InputAction
+
+from bridge_fixtures import DeviceTestCase, FakeAppleTV, PausedInput, request_lines
+
+
+class SessionHeartbeatTests(DeviceTestCase):
+    """Verify idle connections are probed and replaced before the next request."""
+
+    def test_health_probes_on_request(self) -> None:
+        exit_code, responses = self.run_session(request_lines({"type": "health"}))
+
+        self.assertEqual(exit_code, 0)
+        health = responses[1]
+        self.assertEqual((health["type"], health["healthy"]), ("health", True))
+        self.assertIsNone(health["heartbeat"])
+        self.assertEqual((health["probes"], health["reconnects"]), (1, 0))
+        self.assertIsNotNone(health["rtt_ms"])
+        self.assertEqual(self.apple_tv.remote_control.protocol.heartbeats, 1)
+
+    def test_heartbeat_replaces_dead_connection_while_idle(self) -> None:
+        dead = FakeAppleTV()
+        dead.remote_control.protocol.side_effect = pyatv_exceptions.ConnectionLostError("gone")
+        fresh = FakeAppleTV()
+        self.connect.side_effect = [dead, fresh]
+        stdin = PausedInput(
+            (0.3, {"type": "health"}),
+            (0, {"type": "command", "command": "home"}),
+            (0, {"type": "close"}),
+        )
+
+        exit_code, responses = self.run_session(stdin, "--heartbeat", "0.05")
+
+        self.assertEqual(exit_code, 0)
+        health = responses[1]
+        self.assertTrue(health["healthy"])
+        self.assertEqual((health["reconnects"], health["failures"]), (1, 1))
+        self.assertEqual(health["last_error"], "gone")
+        self.assertIsNotNone(health["srtt_ms"])
+        self.assertEqual(responses[2]["status"], "ok")
+        self.assertTrue(dead.closed)
+        self.assertEqual(fresh.remote_control.calls, [("home", InputAction.SingleTap)])
+
+    def test_heartbeat_replaces_stalled_connection(self) -> None:
+        stalled = FakeAppleTV()
+        stalled.remote_control.protocol.stalled = True
+        stalled.metadata.playing = AsyncMock(return_value=None)
+        fresh = FakeAppleTV()
+        self.connect.side_effect = [stalled, fresh]
+        stdin = PausedInput(
+            (0.4, {"type": "health"}),
+            (0, {"type": "command", "command": "home"}),
+            (0, {"type": "close"}),
+        )
+
+        exit_code, responses = self.run_session(
+            stdin, "--heartbeat", "0.05", "--heartbeat-timeout", "0.1"
+        )
+
+        self.assertEqual(exit_code, 0)
+        health = responses[1]
+        self.assertTrue(health["healthy"])
+        self.assertEqual((health["reconnects"], health["failures"]), (1, 1))
+        self.assertEqual(health["last_error"], "heartbeat timed out")
+        self.assertTrue(stalled.closed)
+        self.assertEqual(stalled.metadata.playing.await_count, 0)
+        self.assertEqual(fresh.remote_control.calls, [("home", InputAction.SingleTap)])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import io
 import json
+import time
 import unittest
 from unittest.mock import AsyncMock, patch
 
+from pyatv import exceptions as pyatv_exceptions
+
 from pybridge import cli
-from pybridge.pairing import DEFAULT_PIN
+from pybridge.pairing import DEFAULT_PIN, PairingManager
 
 
 class FakeConfig:
@@ -55,12 +59,19 @@ class FakePairingHandler:
         self.close_called = True
 
 
+class FakeAppleTV:
+    def close(self) -> None:
+        return None
+
+
 class FakeStorage:
     def __init__(self):
         self.saved = False
+        self.save_count = 0
 
     async def save(self):
         self.saved = True
+        self.save_count += 1
 
 
 class PairCommandTests(unittest.TestCase):
@@ -162,6 +173,320 @@ class PairCommandTests(unittest.TestCase):
         self.assertTrue(storage.saved)
         self.assertEqual(handler.pin_value, DEFAULT_PIN)
 
+    def test_pair_bulk_routes_pins_and_saves_once(self) -> None:
+        second = FakeConfig()
+        second.identifier = "aabbccdd-0000-0000-0000-000000000000"
+        second.all_identifiers = [second.identifier]
+        second.name = "Bedroom"
+        second.address = "10.0.0.11"
+
+        handlers = []
+
+        def _new_handler(*_args, **_kwargs):
+            handler = FakePairingHandler(device_provides_pin=True)
+            handlers.append(handler)
+            return handler
+
+        storage = FakeStorage()
+        pins = [
+            {"identifier": FakeConfig().identifier, "protocol": "Companion", "pin": "1111"},
+            {"identifier": FakeConfig().identifier, "protocol": "AirPlay", "pin": "2222"},
+            {"identifier": second.identifier, "protocol": "Companion", "pin": "3333"},
+            {"identifier": second.identifier, "protocol": "AirPlay", "pin": "4444"},
+        ]
+        stdin_buffer = io.StringIO("".join(json.dumps(pin) + "\n" for pin in pins))
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                patch("pybridge.pairing.load_storage", AsyncMock(return_value=storage))
+            )
+            stack.enter_context(
+                patch(
+                    "pybridge.pairing.scan_configs",
+                    AsyncMock(return_value=[FakeConfig(), second]),
+                )
+            )
+            stack.enter_context(
+                patch("pybridge.pairing.pyatv_pair", AsyncMock(side_effect=_new_handler))
+            )
+            stack.enter_context(patch("sys.stdin", stdin_buffer))
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(
+                    [
+                        "pair-bulk",
+                        "--identifier",
+                        "Living Room",
+                        "--identifier",
+                        "Bedroom",
+                        "--protocol",
+                        "Companion",
+                        "--protocol",
+                        "AirPlay",
+                    ]
+                )
+
+        self.assertEqual(exit_code, 0)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        prompts = [line for line in lines if line["status"] == "pin_required"]
+        paired = {
+            (line["identifier"], line["protocol"]): line["credentials"]
+            for line in lines
+            if line["status"] == "paired"
+        }
+        self.assertEqual(len(prompts), 4)
+        self.assertEqual(paired[(second.identifier, "AirPlay")], "cred-4444")
+        self.assertEqual(paired[(FakeConfig().identifier, "Companion")], "cred-1111")
+        self.assertEqual(lines[-1]["status"], "complete")
+        self.assertEqual(lines[-1]["paired"], 4)
+        self.assertEqual(storage.save_count, 1)
+        self.assertTrue(all(handler.close_called for handler in handlers))
+
+    def test_pair_bulk_reports_failures_per_device(self) -> None:
+        bedroom = FakeConfig()
+        bedroom.identifier = "aabbccdd-0000-0000-0000-000000000000"
+        bedroom.all_identifiers = [bedroom.identifier]
+        bedroom.name = "Bedroom"
+        waiting = FakePairingHandler(device_provides_pin=True)
+
+        async def _pair(config, *_args, **_kwargs):
+            if config.identifier == bedroom.identifier:
+                return waiting
+            raise OSError("host unreachable")
+
+        class SilentInput:
+            # The client never answers the prompt but keeps stdin open a while.
+            def readline(self) -> str:
+                time.sleep(0.3)
+                return ""
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                patch("pybridge.pairing.load_storage", AsyncMock(return_value=FakeStorage()))
+            )
+            stack.enter_context(
+                patch(
+                    "pybridge.pairing.scan_configs",
+                    AsyncMock(return_value=[FakeConfig(), bedroom]),
+                )
+            )
+            stack.enter_context(patch("pybridge.pairing.pyatv_pair", side_effect=_pair))
+            stack.enter_context(patch("sys.stdin", SilentInput()))
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(
+                    [
+                        "pair-bulk",
+                        "--identifier",
+                        "Living Room",
+                        "--identifier",
+                        "Bedroom",
+                        "--identifier",
+                        "Kitchen",
+                        "--protocol",
+                        "Companion",
+                        "--pairing-timeout",
+                        "0.05",
+                    ]
+                )
+
+        self.assertEqual(exit_code, 1)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        errors = {line["identifier"]: line["error"] for line in lines if line["status"] == "error"}
+        self.assertEqual(
+            errors,
+            {
+                "Kitchen": "device not found",
+                FakeConfig().identifier: "host unreachable",
+                bedroom.identifier: "pairing timed out",
+            },
+        )
+        self.assertTrue(waiting.close_called)
+        self.assertFalse(waiting.finish_called)
+        self.assertEqual((lines[-1]["paired"], lines[-1]["failed"]), (0, 3))
+
+    def test_mock_pair_bulk_accepts_bare_pin(self) -> None:
+        stdin_buffer = io.StringIO("1234\n")
+        stdout = io.StringIO()
+        with patch("sys.stdin", stdin_buffer), contextlib.redirect_stdout(stdout):
+            exit_code = cli.main(
+                ["--mock", "pair-bulk", "--all", "--protocol", "Companion"]
+            )
+
+        self.assertEqual(exit_code, 0)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(lines[0]["status"], "pin_required")
+        self.assertEqual(lines[-1]["paired"], 1)
+
+    def test_session_pairs_with_handle(self) -> None:
+        handler = FakePairingHandler(device_provides_pin=True)
+        storage = FakeStorage()
+        commands = "\n".join(
+            [
+                json.dumps({"type": "pair_begin", "protocol": "Companion"}),
+                json.dumps({"type": "pair_pin", "handle": "pair-1", "pin": "4021"}),
+                json.dumps({"type": "close"}),
+                "",
+            ]
+        )
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                patch("pybridge.control.load_storage", AsyncMock(return_value=storage))
+            )
+            scan_mock = stack.enter_context(
+                patch(
+                    "pybridge.control.scan_configs",
+                    AsyncMock(return_value=[FakeConfig()]),
+                )
+            )
+            stack.enter_context(
+                patch("pybridge.control.connect", AsyncMock(return_value=FakeAppleTV()))
+            )
+            stack.enter_context(
+                patch("pybridge.pairing.pyatv_pair", AsyncMock(return_value=handler))
+            )
+            stack.enter_context(patch("sys.stdin", io.StringIO(commands)))
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(["session", "--identifier", "Living Room"])
+
+        self.assertEqual(exit_code, 0)
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(responses[1]["status"], "pin_required")
+        self.assertEqual(responses[1]["handle"], "pair-1")
+        self.assertEqual(responses[2]["status"], "paired")
+        self.assertEqual(responses[2]["credentials"], "cred-4021")
+        self.assertEqual(scan_mock.await_count, 1)
+        self.assertTrue(storage.saved)
+        self.assertTrue(handler.close_called)
+
+    def test_session_pairs_another_device(self) -> None:
+        handler = FakePairingHandler(device_provides_pin=True)
+        bedroom = FakeConfig()
+        bedroom.identifier = "aabbccdd-0000-0000-0000-000000000000"
+        bedroom.all_identifiers = [bedroom.identifier]
+        bedroom.name = "Bedroom"
+
+        async def _scan(options, storage=None):
+            return [bedroom] if options.target == "Bedroom" else [FakeConfig()]
+
+        commands = "\n".join(
+            [
+                json.dumps(
+                    {"type": "pair_begin", "protocol": "Companion", "identifier": "Bedroom"}
+                ),
+                json.dumps({"type": "pair_pin", "handle": "pair-1", "pin": "4021"}),
+                json.dumps({"type": "pair_begin", "protocol": "AirPlay", "identifier": "Kitchen"}),
+                json.dumps({"type": "close"}),
+                "",
+            ]
+        )
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                patch("pybridge.control.load_storage", AsyncMock(return_value=FakeStorage()))
+            )
+            scan_mock = stack.enter_context(
+                patch("pybridge.control.scan_configs", AsyncMock(side_effect=_scan))
+            )
+            stack.enter_context(
+                patch("pybridge.control.connect", AsyncMock(return_value=FakeAppleTV()))
+            )
+            pair_mock = stack.enter_context(
+                patch("pybridge.pairing.pyatv_pair", AsyncMock(return_value=handler))
+            )
+            stack.enter_context(patch("sys.stdin", io.StringIO(commands)))
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(["session", "--identifier", "Living Room"])
+
+        self.assertEqual(exit_code, 0)
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(responses[1]["status"], "pin_required")
+        self.assertIs(pair_mock.await_args.args[0], bedroom)
+        self.assertEqual(responses[2]["status"], "paired")
+        self.assertEqual(responses[3]["error"], "device not found")
+        self.assertEqual(
+            [call.args[0].target for call in scan_mock.await_args_list],
+            ["Living Room", "Bedroom", "Kitchen"],
+        )
+
+    def test_session_survives_unreachable_pairing_target(self) -> None:
+        unreachable = FakePairingHandler(device_provides_pin=True)
+        unreachable.begin = AsyncMock(
+            side_effect=pyatv_exceptions.ConnectionFailedError("no route")
+        )
+        commands = "\n".join(
+            [
+                json.dumps({"type": "pair_begin", "protocol": "Companion"}),
+                json.dumps({"type": "pair_begin", "protocol": "AirPlay"}),
+                json.dumps({"type": "pair_pin", "handle": "pair-1", "pin": "4021"}),
+                json.dumps({"type": "close"}),
+                "",
+            ]
+        )
+
+        with contextlib.ExitStack() as stack:
+            for target, value in (
+                ("pybridge.control.load_storage", None),
+                ("pybridge.control.scan_configs", [FakeConfig()]),
+                ("pybridge.control.connect", FakeAppleTV()),
+            ):
+                stack.enter_context(patch(target, AsyncMock(return_value=value)))
+            stack.enter_context(
+                patch(
+                    "pybridge.pairing.pyatv_pair",
+                    AsyncMock(
+                        side_effect=[
+                            pyatv_exceptions.ConnectionFailedError("unreachable"),
+                            unreachable,
+                        ]
+                    ),
+                )
+            )
+            stack.enter_context(patch("sys.stdin", io.StringIO(commands)))
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(["session", "--identifier", "Living Room"])
+
+        self.assertEqual(exit_code, 0)
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(
+            responses[1], {"status": "error", "type": "pair_begin", "error": "unreachable"}
+        )
+        self.assertEqual(
+            responses[2], {"status": "error", "type": "pair_begin", "error": "no route"}
+        )
+        self.assertTrue(unreachable.close_called)
+        self.assertEqual(responses[3]["error"], "unknown pairing handle: pair-1")
+        self.assertEqual(responses[4]["status"], "closing")
+
+    def test_abandoned_pairing_handle_expires(self) -> None:
+        handler = FakePairingHandler(device_provides_pin=True)
+        expired = []
+
+        async def _run():
+            manager = PairingManager(
+                AsyncMock(return_value=handler), None, expired.append, timeout=0.01
+            )
+            result = await manager.begin(FakeConfig(), "AirPlay")
+            await asyncio.sleep(0.05)
+            return result, manager.handles
+
+        result, handles = asyncio.run(_run())
+
+        self.assertEqual(result["status"], "pin_required")
+        self.assertEqual(handles, [])
+        self.assertEqual(expired[0]["error"], "pairing timed out")
+        self.assertEqual(expired[0]["handle"], result["handle"])
+        self.assertTrue(handler.close_called)
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -0,0 +1,61 @@
+"""Tests for power status inferred from discovery (power --source)."""
+
+from __future__ import annotations
+
+import unittest
+
+from pyatv.const import PowerState
+
+from bridge_fixtures import DeviceTestCase, FakeAppleTV, FakeConfig
+
+
+class PowerInferenceTests(DeviceTestCase):
+    """Verify power status answered from discovery without connecting."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.asleep = self.config
+        self.asleep.deep_sleep = True
+        self.awake = FakeConfig()
+        self.awake.identifier = "aabbccdd-0000-0000-0000-000000000000"
+        self.awake.all_identifiers = [self.awake.identifier]
+        self.awake.name = "Bedroom"
+        self.awake.deep_sleep = False
+        self.scan.return_value = [self.asleep, self.awake]
+        self.connect.side_effect = lambda *args, **kwargs: FakeAppleTV()
+
+    def _status(self, *selector: str, source: str):
+        return self.run_cli("power", *selector, "--action", "status", "--source", source)
+
+    def test_deep_sleep_answers_without_connecting(self) -> None:
+        exit_code, lines = self._status("--identifier", "Living Room", source="auto")
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            (lines[0]["power_state"], lines[0]["confidence"], lines[0]["source"]),
+            ("Off", 0.9, "discovery"),
+        )
+        self.connect.assert_not_awaited()
+
+    def test_auto_connects_when_unsure_and_remembers_the_answer(self) -> None:
+        _, first = self._status("--identifier", "Bedroom", source="auto")
+        _, second = self._status("--identifier", "Bedroom", source="auto")
+
+        self.assertEqual((first[0]["source"], first[0]["confidence"]), ("device", 1.0))
+        self.assertEqual(second[0]["source"], "observed")
+        self.assertEqual(second[0]["power_state"], PowerState.On.name)
+        self.assertGreaterEqual(second[0]["confidence"], 0.8)
+        self.assertEqual(self.connect.await_count, 1)
+
+    def test_fleet_status_costs_one_scan(self) -> None:
+        exit_code, lines = self._status("--all", source="discovery")
+
+        self.assertEqual(exit_code, 0)
+        states = {line["identifier"]: line["power_state"] for line in lines[:-1]}
+        self.assertEqual(states, {self.asleep.identifier: "Off", self.awake.identifier: "On"})
+        self.assertEqual(self.scan.await_count, 1)
+        self.connect.assert_not_awaited()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
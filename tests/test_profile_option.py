@@ -0,0 +1,66 @@
+"""Tests for the ``--profile`` and ``--trace-events`` global options."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import pstats
+import tempfile
+import unittest
+from pathlib import Path
+
+from pybridge import cli, tracing
+
+
+class ProfileOptionTests(unittest.TestCase):
+    """Verify profiles and trace-event files are written for a command run."""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = Path(self.tmpdir.name)
+        self.storage = str(self.root / "pyatv.conf")
+
+    def _run(self, *argv: str) -> int:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return cli.main(["--simulate", "2", "--storage", self.storage, *argv])
+
+    def test_profile_writes_pstats(self) -> None:
+        profile_path = self.root / "scan.prof"
+        exit_code = self._run("--profile", str(profile_path), "scan", "--timeout", "0.05")
+
+        self.assertEqual(exit_code, 0)
+        stats = pstats.Stats(str(profile_path))
+        self.assertGreater(stats.total_calls, 0)  # type: ignore[attr-defined]
+
+    def test_trace_events_cover_main_phases(self) -> None:
+        trace_path = self.root / "trace.json"
+        # Record the fleet in the scan telemetry so the command's scan is targeted.
+        self._run("scan", "--timeout", "0.05")
+        exit_code = self._run(
+            "--trace-events",
+            str(trace_path),
+            "command",
+            "--identifier",
+            "Simulated 001",
+            "--command",
+            "home",
+        )
+
+        self.assertEqual(exit_code, 0)
+        document = json.loads(trace_path.read_text(encoding="utf-8"))
+        spans = [event for event in document["traceEvents"] if event["ph"] == "X"]
+        names = {event["name"] for event in spans}
+        self.assertTrue(
+            {"storage.load", "scan", "select", "connect", "remote", "serialize"} <= names
+        )
+        self.assertTrue(all(event["dur"] >= 0 for event in spans))
+        self.assertIsNone(tracing._tracer)
+
+    def test_spans_are_free_when_tracing_is_off(self) -> None:
+        self.assertIs(tracing.span("scan"), tracing.span("connect", identifier="x"))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,152 @@
+"""Tests for session recording and the replay command."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pybridge import cli
+from pybridge.recording import MASK, SessionRecorder, load_trace
+
+
+class ReplayCommandTests(unittest.TestCase):
+    """Verify traces are recorded and replayed against a fresh session."""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.trace_path = str(Path(self.tmpdir.name) / "trace.ndjson")
+
+    def _record(self, *requests: str) -> None:
+        requests = "\n".join(
+            list(requests)
+            or [
+                json.dumps({"type": "command", "command": "right"}),
+                json.dumps({"type": "framing", "framing": "json"}),
+                "not json",
+                json.dumps({"type": "power", "action": "on"}),
+                json.dumps({"type": "close"}),
+            ]
+        ) + "\n"
+        with patch("sys.stdin", io.StringIO(requests)), contextlib.redirect_stdout(
+            io.StringIO()
+        ):
+            exit_code = cli.main(
+                ["--mock", "session", "--identifier", "Living Room", "--record", self.trace_path]
+            )
+        self.assertEqual(exit_code, 0)
+
+    def test_session_records_requests_and_replies(self) -> None:
+        self._record()
+
+        records = [
+            json.loads(line)
+            for line in Path(self.trace_path).read_text(encoding="utf-8").splitlines()
+        ]
+        self.assertEqual(records[0]["type"], "header")
+        self.assertEqual(records[0]["identifier"], "Living Room")
+        self.assertEqual(records[1]["payload"]["status"], "ready")
+        self.assertIsNone(records[1]["reply_to"])
+
+        inbound = [record for record in records if record.get("dir") == "in"]
+        self.assertEqual([record["seq"] for record in inbound], [1, 2, 3, 4])
+        invalid = [record for record in records if record.get("payload", {}).get("error")]
+        self.assertEqual(invalid[0]["payload"]["error"], "invalid json")
+        self.assertIsNone(invalid[0]["reply_to"])
+
+        times = [record["t"] for record in records[1:]]
+        self.assertEqual(times, sorted(times))
+
+        trace = load_trace(self.trace_path)
+        self.assertEqual(trace.skipped, 1)
+        self.assertEqual(
+            [request.payload["type"] for request in trace.requests],
+            ["command", "power", "close"],
+        )
+        self.assertTrue(all(request.latency is not None for request in trace.requests))
+
+    def test_trace_masks_secrets_and_is_private(self) -> None:
+        requests = "\n".join(
+            [
+                json.dumps({"type": "pair_pin", "handle": "abc", "pin": "1234"}),
+                json.dumps({"type": "close"}),
+                "",
+            ]
+        )
+        stdout = io.StringIO()
+        with patch("sys.stdin", io.StringIO(requests)), contextlib.redirect_stdout(stdout):
+            cli.main(
+                ["--mock", "session", "--identifier", "Living Room", "--record", self.trace_path]
+            )
+        recorder = SessionRecorder.open(str(Path(self.tmpdir.name) / "out.ndjson"), "x")
+        recorder.outbound({"status": "ok", "pairing": {"credentials": "secret", "password": None}})
+        recorder.close()
+
+        self.assertEqual(stat.S_IMODE(Path(self.trace_path).stat().st_mode), 0o600)
+        trace = Path(self.trace_path).read_text(encoding="utf-8")
+        self.assertNotIn("1234", trace)
+        inbound = [json.loads(line) for line in trace.splitlines() if '"dir":"in"' in line]
+        self.assertEqual(inbound[0]["payload"]["pin"], MASK)
+        self.assertEqual(inbound[0]["payload"]["handle"], "abc")
+        outbound = json.loads(
+            (Path(self.tmpdir.name) / "out.ndjson").read_text(encoding="utf-8").splitlines()[1]
+        )
+        self.assertEqual(outbound["payload"]["pairing"], {"credentials": MASK, "password": None})
+
+    def test_replay_reports_latency_deltas(self) -> None:
+        self._record()
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = cli.main(["--mock", "replay", "--trace", self.trace_path, "--fast"])
+
+        self.assertEqual(exit_code, 0)
+        result = json.loads(stdout.getvalue())
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["mode"], "fast")
+        self.assertEqual((result["messages"], result["skipped"]), (3, 1))
+        self.assertEqual(result["delta"]["count"], 3)
+        self.assertEqual(result["round_trip"]["count"], 3)
+
+    def test_replay_skips_waiting_for_unanswered_touch_events(self) -> None:
+        self._record(
+            json.dumps({"type": "touch", "event": "down", "x": 0, "y": 0}),
+            json.dumps({"type": "touch", "event": "move", "x": 300, "y": 0}),
+            json.dumps({"type": "touch", "event": "up", "x": 300, "y": 0}),
+            json.dumps({"type": "stats"}),
+            json.dumps({"type": "close"}),
+        )
+
+        trace = load_trace(self.trace_path)
+        self.assertEqual(
+            [request.expects_reply for request in trace.requests],
+            [False, False, False, True, True],
+        )
+
+        for mode in (["--fast"], []):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(["--mock", "replay", "--trace", self.trace_path, *mode])
+
+            self.assertEqual(exit_code, 0)
+            result = json.loads(stdout.getvalue())
+            self.assertEqual((result["status"], result["unanswered"]), ("ok", 0))
+            self.assertEqual(result["round_trip"]["count"], 2)
+
+    def test_replay_rejects_missing_trace(self) -> None:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = cli.main(["--mock", "replay", "--trace", self.trace_path])
+
+        self.assertEqual(exit_code, 2)
+        self.assertIn("unable to read trace", stderr.getvalue())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
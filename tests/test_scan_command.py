@@ -2,12 +2,32 @@
 
 from __future__ import annotations
 
+import asyncio
 import io
 import json
 import contextlib
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
 
-from pybridge import cli
+from pyatv.const import Protocol
+
+from pybridge import cli, discovery
+
+
+class FakeService:
+    def __init__(self, protocol: Protocol):
+        self.protocol = protocol
+
+
+class FakeConfig:
+    def __init__(self, address: str = "10.0.0.10"):
+        self.identifier = "11223344-5566-7788-9900-112233445566"
+        self.all_identifiers = [self.identifier, "00:11:22:33:44:55"]
+        self.name = "Living Room"
+        self.address = address
+        self.services = [FakeService(Protocol.Companion), FakeService(Protocol.AirPlay)]
 
 
 class ScanCommandTests(unittest.TestCase):
@@ -29,6 +49,205 @@ class ScanCommandTests(unittest.TestCase):
         self.assertIn("protocols", device)
         self.assertIsInstance(device["protocols"], list)
 
+    def test_mock_scan_stats_reports_default_timeout(self) -> None:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = cli.main(["--mock", "scan", "--stats"])
+
+        self.assertEqual(exit_code, 0)
+        data = json.loads(stdout.getvalue())
+        self.assertEqual(data["stats"]["adaptive_timeout"], discovery.DEFAULT_TIMEOUT)
+
+    def test_scan_fields_skip_unrequested_parts(self) -> None:
+        # FakeConfig has no device_info, so building it would raise.
+        scan_mock = AsyncMock(return_value=[FakeConfig()])
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+            "pybridge.discovery.scan", scan_mock
+        ):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(
+                    [
+                        "--storage",
+                        str(Path(tmpdir) / "pyatv.conf"),
+                        "--no-storage",
+                        "scan",
+                        "--fields",
+                        "name,main_identifier",
+                    ]
+                )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            json.loads(stdout.getvalue())["devices"],
+            [{"name": "Living Room", "main_identifier": FakeConfig().identifier}],
+        )
+
+    def test_mock_scan_fields_projects_devices(self) -> None:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = cli.main(["--mock", "scan", "--fields", "address"])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(json.loads(stdout.getvalue())["devices"], [{"address": "10.0.0.10"}])
+
+    def test_scan_honours_fractional_timeout(self) -> None:
+        scan_mock = AsyncMock(return_value=[])
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+            "pybridge.discovery.scan", scan_mock
+        ):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(
+                    [
+                        "--storage",
+                        str(Path(tmpdir) / "pyatv.conf"),
+                        "--no-storage",
+                        "scan",
+                        "--timeout",
+                        "0.75",
+                    ]
+                )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(scan_mock.await_args.kwargs["timeout"], 0.75)
+
+
+class ScanTelemetryTests(unittest.TestCase):
+    """Verify learned discovery timeouts."""
+
+    def test_targeted_scans_learn_adaptive_timeout(self) -> None:
+        config = FakeConfig()
+        scan_mock = AsyncMock(return_value=[config])
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+            "pybridge.discovery.scan", scan_mock
+        ), patch("pybridge.discovery.load_storage", AsyncMock(return_value=None)):
+            options = discovery.DiscoveryOptions(
+                timeout=None,
+                storage_path=str(Path(tmpdir) / "pyatv.conf"),
+                target="Living Room",
+            )
+
+            for _ in range(4):
+                asyncio.run(discovery.scan_configs(options))
+
+            stats = asyncio.run(discovery.scan_statistics(options))
+
+        first_call, *targeted_calls = scan_mock.await_args_list
+        self.assertEqual(first_call.kwargs["timeout"], discovery.DEFAULT_TIMEOUT)
+        self.assertIsNone(first_call.kwargs["identifier"])
+        for call in targeted_calls:
+            self.assertIn(config.identifier, call.kwargs["identifier"])
+
+        device = stats["devices"][config.identifier]
+        self.assertEqual(device["protocols"]["Companion"]["count"], 3)
+        self.assertLess(stats["adaptive_timeout"], discovery.DEFAULT_TIMEOUT)
+        self.assertGreaterEqual(stats["adaptive_timeout"], discovery.MIN_TIMEOUT)
+
+    def test_no_storage_leaves_no_state(self) -> None:
+        scan_mock = AsyncMock(return_value=[FakeConfig()])
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+            "pybridge.discovery.scan", scan_mock
+        ):
+            options = discovery.DiscoveryOptions(
+                timeout=None,
+                storage_path=str(Path(tmpdir) / "pyatv.conf"),
+                use_storage=False,
+                target="Living Room",
+            )
+            asyncio.run(discovery.scan_configs(options))
+            asyncio.run(discovery.scan_configs(options))
+            written = list(Path(tmpdir).iterdir())
+
+        self.assertEqual(written, [])
+        # Nothing was learned, so the second scan was not targeted either.
+        self.assertIsNone(scan_mock.await_args.kwargs["identifier"])
+
+
+class ScanPathTests(unittest.TestCase):
+    """Verify concurrent multi-path scanning."""
+
+    def test_paths_merge_keeping_lowest_latency(self) -> None:
+        other = FakeConfig(address="192.168.1.20")
+        other.identifier = "aabbccdd-0000-0000-0000-000000000000"
+
+        async def fake_scan(loop, timeout, identifier, protocol, storage, hosts=None):
+            if hosts is None:
+                return [FakeConfig(address="192.168.1.10"), other]
+            if hosts == ["10.0.0.10"]:
+                await asyncio.sleep(0.05)
+                return [FakeConfig(address="10.0.0.10")]
+            return []
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+            "pybridge.discovery.scan", AsyncMock(side_effect=fake_scan)
+        ):
+            options = discovery.DiscoveryOptions(
+                timeout=1.0,
+                storage_path=str(Path(tmpdir) / "pyatv.conf"),
+                use_storage=False,
+                paths=["multicast", "10.0.0.8/30"],
+            )
+            merged, timings = asyncio.run(discovery.scan_paths(options))
+
+        answers = {
+            config.identifier: (config.address, path, latency)
+            for config, path, latency in merged
+        }
+        # The slower unicast answer still wins: multicast answers are only reported at the end.
+        address, path, latency = answers[FakeConfig().identifier]
+        self.assertEqual((address, path), ("10.0.0.10", "10.0.0.8/30"))
+        self.assertGreaterEqual(latency, 0.05)
+        self.assertEqual(answers[other.identifier], ("192.168.1.20", "multicast", None))
+        self.assertEqual([timing.path for timing in timings], ["multicast", "10.0.0.8/30"])
+        self.assertEqual(timings[1].hosts, 2)
+        self.assertEqual(timings[0].devices, 2)
+
+    def test_range_sweep_fits_the_scan_timeout(self) -> None:
+        scan_mock = AsyncMock(return_value=[])
+
+        with patch("pybridge.discovery.scan", scan_mock):
+            options = discovery.DiscoveryOptions(
+                timeout=4.0, use_storage=False, paths=["10.0.0.0/24"]
+            )
+            asyncio.run(discovery.scan_paths(options))
+
+        self.assertEqual(scan_mock.await_count, 254)
+        # 254 hosts are probed in four rounds of MAX_CONCURRENT_HOSTS.
+        self.assertEqual({call.kwargs["timeout"] for call in scan_mock.await_args_list}, {1.0})
+
+    def test_large_range_sweep_stays_within_the_scan_timeout(self) -> None:
+        async def unresponsive(_loop, timeout, **_kwargs):
+            await asyncio.sleep(timeout)
+            return []
+
+        scan_mock = AsyncMock(side_effect=unresponsive)
+
+        # A /22 at the per-host floor would need sixteen rounds; wider rounds keep it on budget.
+        with patch("pybridge.discovery.scan", scan_mock), patch.object(
+            discovery, "MIN_TIMEOUT", 0.05
+        ):
+            options = discovery.DiscoveryOptions(
+                timeout=0.2, use_storage=False, paths=["10.0.0.0/22"]
+            )
+            _, timings = asyncio.run(discovery.scan_paths(options))
+
+        self.assertEqual(scan_mock.await_count, 1022)
+        self.assertEqual(timings[0].hosts, 1022)
+        self.assertLess(timings[0].elapsed, 0.2 + 0.15)
+        host_timeouts = {call.kwargs["timeout"] for call in scan_mock.await_args_list}
+        self.assertGreaterEqual(min(host_timeouts), 0.05)
+
+    def test_invalid_path_is_rejected(self) -> None:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = cli.main(["--no-storage", "scan", "--path", "not-a-network"])
+
+        self.assertEqual(exit_code, 2)
+        self.assertIn("invalid scan path", stderr.getvalue())
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
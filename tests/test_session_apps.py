@@ -0,0 +1,85 @@
+"""Tests for the apps and launch_app session messages."""
+
+from __future__ import annotations
+
+import json
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from pyatv import exceptions as pyatv_exceptions
+
+from bridge_fixtures import DeviceTestCase, PausedInput, request_lines
+from pybridge import apps
+
+
+class AppsTests(DeviceTestCase):
+    """Verify the cached app list and launching apps from it."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.apps_path = self.state_file("apps")
+        self.apple_tv.device_info = SimpleNamespace(build_number="21K69")
+        self.app_list = AsyncMock(
+            return_value=[
+                SimpleNamespace(name="TV", identifier="com.apple.TVWatchList"),
+                SimpleNamespace(name="Music", identifier="com.apple.TVMusic"),
+            ]
+        )
+        self.launch = AsyncMock()
+        self.apple_tv.apps = SimpleNamespace(app_list=self.app_list, launch_app=self.launch)
+
+    def _seed(self, build_number: str, age: float) -> None:
+        entry = {
+            "build_number": build_number,
+            "fetched_at": time.time() - age,
+            "apps": [{"name": "Old App", "identifier": "com.example.old"}],
+        }
+        self.apps_path.write_text(json.dumps({"devices": {self.config.identifier: entry}}))
+
+    def test_list_is_fetched_once_and_launch_resolves_names(self) -> None:
+        exit_code, responses = self.run_session(
+            request_lines(
+                {"type": "apps"}, {"type": "apps"}, {"type": "launch_app", "app": "music"}
+            )
+        )
+
+        self.assertEqual(exit_code, 0)
+        first, second, launched = responses[1:4]
+        self.assertIn(first["cache"], ("miss", "hit"))
+        self.assertEqual(second["cache"], "hit")
+        self.assertEqual([app["name"] for app in second["apps"]], ["Music", "TV"])
+        self.assertEqual(launched["app"], "com.apple.TVMusic")
+        self.launch.assert_awaited_once_with("com.apple.TVMusic")
+        self.app_list.assert_awaited_once()
+        stored = json.loads(self.apps_path.read_text())["devices"][self.config.identifier]
+        self.assertEqual(stored["build_number"], "21K69")
+
+    def test_stale_list_is_served_while_refreshing(self) -> None:
+        self._seed("21K69", age=apps.APP_LIST_TTL + 60)
+
+        _, responses = self.run_session(
+            PausedInput((0, {"type": "apps"}), (0.2, {"type": "apps"}))
+        )
+
+        self.assertIn(responses[1]["cache"], ("stale", "hit"))
+        self.assertEqual(responses[2]["cache"], "hit")
+        self.assertEqual(len(responses[2]["apps"]), 2)
+        self.app_list.assert_awaited_once()
+
+    def test_firmware_change_invalidates_the_list(self) -> None:
+        self._seed("20A100", age=0)
+        self.app_list.side_effect = pyatv_exceptions.ConnectionLostError("busy")
+
+        _, responses = self.run_session(
+            request_lines({"type": "apps"}, {"type": "launch_app", "app": "Old App"})
+        )
+
+        self.assertEqual((responses[1]["status"], responses[1]["error"]), ("error", "busy"))
+        self.assertEqual(responses[2]["status"], "error")
+        self.launch.assert_not_awaited()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
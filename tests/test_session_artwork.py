@@ -0,0 +1,113 @@
+"""Tests for the now_playing and artwork session messages."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+from pyatv.const import DeviceState
+from pyatv.interface import ArtworkInfo
+
+from bridge_fixtures import DeviceTestCase, request_lines
+from pybridge.artwork import ArtworkCache
+
+
+class ArtworkTests(DeviceTestCase):
+    """Verify now-playing and artwork messages and the shared artwork cache."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.apple_tv.metadata.artwork_id = "art-1"
+        self.fetch = AsyncMock(
+            return_value=ArtworkInfo(bytes=b"png-bytes", mimetype="image/png", width=64, height=64)
+        )
+        self.apple_tv.metadata.artwork = self.fetch
+
+    def test_repeated_artwork_is_served_from_cache(self) -> None:
+        request = {"type": "artwork", "width": 64}
+        exit_code, responses = self.run_session(
+            request_lines(
+                {"type": "now_playing"}, request, dict(request, inline=True), {"type": "stats"}
+            )
+        )
+
+        self.assertEqual(exit_code, 0)
+        playing, first, second, stats = responses[1:5]
+        self.assertEqual(playing["device_state"], DeviceState.Paused.name)
+        self.assertEqual((first["cache"], second["cache"]), ("miss", "hit"))
+        self.assertEqual(first["digest"], second["digest"])
+        self.assertEqual(Path(first["path"]).read_bytes(), b"png-bytes")
+        self.assertEqual(base64.b64decode(second["data"]), b"png-bytes")
+        self.fetch.assert_awaited_once_with(width=64, height=None)
+        self.assertEqual(stats["artwork"]["hit_rate"], 0.5)
+
+        # A later session shares the cache on disk.
+        _, responses = self.run_session(request_lines(request))
+        self.assertEqual(responses[1]["cache"], "hit")
+        self.fetch.assert_awaited_once()
+
+    def test_least_recently_used_images_are_evicted(self) -> None:
+        async def scenario() -> ArtworkCache:
+            loop = asyncio.get_running_loop()
+            cache = await ArtworkCache.load(loop, self.storage, max_bytes=10)
+            await cache.store(loop, "a", 64, None, b"aaaa", "image/png", 64, 64)
+            await cache.store(loop, "b", 64, None, b"bbbb", "image/png", 64, 64)
+            cache.lookup("a", 64, None)
+            await cache.store(loop, "c", 64, None, b"cccc", "image/png", 64, 64)
+            return cache
+
+        cache = asyncio.run(scenario())
+
+        self.assertIsNotNone(cache.lookup("a", 64, None))
+        self.assertIsNone(cache.lookup("b", 64, None))
+        self.assertEqual((cache.evictions, cache.stats()["bytes"]), (1, 8))
+        self.assertEqual(len(list(cache.directory.glob("*.png"))), 2)
+
+    def test_artwork_without_identifier_is_keyed_by_content(self) -> None:
+        self.apple_tv.metadata.artwork_id = None
+        self.fetch.side_effect = [
+            ArtworkInfo(bytes=data, mimetype="image/png", width=64, height=64)
+            for data in (b"first-art", b"second-art")
+        ]
+        request = {"type": "artwork", "width": 64}
+
+        exit_code, responses = self.run_session(request_lines(request, request))
+
+        self.assertEqual(exit_code, 0)
+        first, second = responses[1:3]
+        self.assertEqual((first["cache"], second["cache"]), ("miss", "miss"))
+        self.assertEqual(Path(first["path"]).read_bytes(), b"first-art")
+        self.assertEqual(Path(second["path"]).read_bytes(), b"second-art")
+        index = json.loads((Path(first["path"]).parent / "index.json").read_text())
+        self.assertEqual(
+            sorted(index["keys"].values()), sorted([first["digest"], second["digest"]])
+        )
+
+    def test_concurrent_sessions_merge_the_index_and_share_the_budget(self) -> None:
+        async def scenario() -> ArtworkCache:
+            loop = asyncio.get_running_loop()
+            first = await ArtworkCache.load(loop, self.storage, max_bytes=10)
+            second = await ArtworkCache.load(loop, self.storage, max_bytes=10)
+            await first.store(loop, "a", 64, None, b"aaaa", "image/png", 64, 64)
+            await second.store(loop, "b", 64, None, b"bbbb", "image/png", 64, 64)
+            await first.save(loop)
+            await second.save(loop)
+            await first.store(loop, "c", 64, None, b"cccc", "image/png", 64, 64)
+            await first.save(loop)
+            return await ArtworkCache.load(loop, self.storage, max_bytes=10)
+
+        cache = asyncio.run(scenario())
+
+        self.assertIsNone(cache.lookup("a", 64, None))
+        self.assertIsNotNone(cache.lookup("b", 64, None))
+        self.assertIsNotNone(cache.lookup("c", 64, None))
+        self.assertEqual(cache.stats()["bytes"], 8)
+        self.assertEqual(len(list(cache.directory.glob("*.png"))), 2)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
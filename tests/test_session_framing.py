@@ -0,0 +1,71 @@
+"""Tests for switching a session to length-prefixed binary framing."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from pybridge import cli
+from pybridge.channel import FRAME_HEADER, available_framings, decode_frame, encode_frame
+
+
+@unittest.skipUnless("msgpack" in available_framings(), "msgpack is not installed")
+class SessionFramingTests(unittest.TestCase):
+    """Verify the session switches to length-prefixed MessagePack frames on request."""
+
+    def test_mock_session_switches_to_msgpack(self) -> None:
+        requests = (
+            encode_frame({"type": "framing", "framing": "msgpack"}, "json")
+            + encode_frame({"type": "command", "command": "Home"}, "msgpack")
+            + FRAME_HEADER.pack(3)
+            + b"\xc1\xc1\xc1"
+            + encode_frame({"type": "power", "action": "on"}, "msgpack")
+            + encode_frame({"type": "close"}, "msgpack")
+        )
+        stdin = io.TextIOWrapper(io.BytesIO(requests))
+        raw_stdout = io.BytesIO()
+        stdout = io.TextIOWrapper(raw_stdout, write_through=True)
+
+        with patch("sys.stdin", stdin), contextlib.redirect_stdout(stdout):
+            exit_code = cli.main(["--mock", "session", "--identifier", "Living Room"])
+
+        self.assertEqual(exit_code, 0)
+        data = raw_stdout.getvalue()
+        ready_line, ack_line, rest = data.split(b"\n", 2)
+        self.assertIn("msgpack", json.loads(ready_line)["framings"])
+        self.assertEqual(json.loads(ack_line)["framing"], "msgpack")
+
+        responses = []
+        while rest:
+            (length,) = FRAME_HEADER.unpack(rest[: FRAME_HEADER.size])
+            body = rest[FRAME_HEADER.size : FRAME_HEADER.size + length]
+            responses.append(decode_frame(body, "msgpack"))
+            rest = rest[FRAME_HEADER.size + length :]
+
+        self.assertEqual(responses[0]["command"], "home")
+        self.assertEqual(responses[1], {"status": "error", "error": "invalid frame"})
+        self.assertEqual(responses[2]["power"], "on")
+        self.assertEqual(responses[3]["status"], "closing")
+
+    def test_unsupported_framing_keeps_json(self) -> None:
+        stdin = io.StringIO(
+            json.dumps({"type": "framing", "framing": "xml"})
+            + "\n"
+            + json.dumps({"type": "close"})
+            + "\n"
+        )
+        stdout = io.StringIO()
+        with patch("sys.stdin", stdin), contextlib.redirect_stdout(stdout):
+            exit_code = cli.main(["--mock", "session", "--identifier", "Living Room"])
+
+        self.assertEqual(exit_code, 0)
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(responses[1]["error"], "unsupported framing: xml")
+        self.assertEqual(responses[2]["status"], "closing")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
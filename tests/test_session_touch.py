@@ -0,0 +1,67 @@
+"""Tests for streaming touch gestures over a session."""
+
+from __future__ import annotations
+
+import unittest
+
+from pyatv.const import TouchAction
+
+from bridge_fixtures import DeviceTestCase, FakeTouch, PausedInput, request_lines
+
+
+class GestureTests(DeviceTestCase):
+    """Verify touch events are streamed, coalesced and interpolated."""
+
+    def test_moves_are_coalesced_while_the_device_is_busy(self) -> None:
+        self.apple_tv.touch = FakeTouch(delay=0.02)
+        events = [{"event": "down", "x": 0, "y": 500}]
+        events += [{"event": "move", "x": 10 * step, "y": 500} for step in range(1, 6)]
+        events.append({"event": "up", "x": 50, "y": 500})
+        stdin = PausedInput(
+            (0, {"type": "touch", "events": events}), (0.3, {"type": "stats"})
+        )
+
+        exit_code, responses = self.run_session(stdin)
+
+        self.assertEqual(exit_code, 0)
+        ended, stats = responses[1], responses[2]["touch"]
+        self.assertEqual((ended["type"], ended["event"]), ("touch", "up"))
+        self.assertGreater(ended["latency_ms"], 0)
+        self.assertGreaterEqual(ended["gesture"]["dropped"], 1)
+        calls = self.apple_tv.touch.calls
+        self.assertEqual(calls[0], (TouchAction.Press, 0, 500))
+        self.assertEqual(calls[-2], (TouchAction.Hold, 50, 500))
+        self.assertEqual(calls[-1], (TouchAction.Release, 50, 500))
+        self.assertEqual(stats["received"], 7)
+        self.assertEqual(stats["sent"] + stats["dropped"], 7)
+        self.assertIsNotNone(stats["latency_p99_ms"])
+
+    def test_large_jumps_are_interpolated_when_idle(self) -> None:
+        self.apple_tv.touch = FakeTouch()
+        stdin = PausedInput(
+            (0, {"type": "touch", "event": "down", "x": 0, "y": 0}),
+            (0.05, {"type": "touch", "event": "move", "x": 200, "y": 0}),
+            (0.05, {"type": "touch", "event": "swipe", "start": [0, 0], "end": [900, 0]}),
+        )
+
+        self.run_session(stdin)
+
+        self.assertEqual(
+            [call[1] for call in self.apple_tv.touch.calls[:6]], [0, 40, 80, 120, 160, 200]
+        )
+        self.assertEqual(self.apple_tv.touch.calls[-1], ("swipe", 0, 0, 900, 0, 200))
+
+    def test_mock_session_rejects_malformed_events(self) -> None:
+        stdin = request_lines(
+            {"type": "touch", "event": "pinch"}, {"type": "touch", "event": "click"}
+        )
+
+        _, responses = self.run_session(stdin, global_options=["--mock"])
+
+        self.assertEqual(responses[1]["status"], "error")
+        self.assertIn("touch event must be one of", responses[1]["error"])
+        self.assertEqual((responses[2]["status"], responses[2]["event"]), ("ok", "click"))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
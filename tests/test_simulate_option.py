@@ -0,0 +1,158 @@
+"""Tests for running the CLI against the simulated fleet (``--simulate``)."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+import warnings
+from pathlib import Path
+from unittest.mock import patch
+
+from pybridge import cli, control, discovery, pairing
+from pybridge.simulator import SimulationError, load_profile
+
+
+class SimulateOptionTests(unittest.TestCase):
+    """Drive real command paths against virtual devices."""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.storage = str(Path(self.tmpdir.name) / "pyatv.conf")
+
+    def _profile(self, **settings) -> str:
+        profile = {
+            "devices": 3,
+            "arrival": 0.01,
+            "connect_latency": 0.001,
+            "command_latency": 0.001,
+            "seed": 7,
+        }
+        profile.update(settings)
+        path = Path(self.tmpdir.name) / "profile.json"
+        path.write_text(json.dumps(profile), encoding="utf-8")
+        return str(path)
+
+    def _run(self, profile: str, *argv: str, stdin: str = ""):
+        # Credentials and bridge state (e.g. scan telemetry) stay in the temporary directory.
+        prefix = ["--simulate", profile, "--storage", self.storage]
+
+        stdout = io.StringIO()
+        with patch("sys.stdin", io.StringIO(stdin)), contextlib.redirect_stdout(stdout):
+            exit_code = cli.main(prefix + list(argv))
+        return exit_code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def _warm_up(self, profile: str) -> None:
+        # A short scan records the fleet in the scan telemetry, so the session's
+        # targeted scan can stop as soon as its device answers.
+        self._run(profile, "scan", "--timeout", "0.1")
+
+    def test_power_off_fan_out_reaches_every_device(self) -> None:
+        profile = self._profile()
+        exit_code, lines = self._run(
+            profile, "power", "--all", "--action", "off", "--timeout", "0.1"
+        )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual((lines[-1]["succeeded"], lines[-1]["failed"]), (3, 0))
+
+    def test_wake_finds_sleeping_device_at_cached_address(self) -> None:
+        profile = self._profile(power_on_fraction=0.0)
+        self._warm_up(profile)
+
+        exit_code, lines = self._run(
+            profile, "power", "--identifier", "Simulated 001", "--action", "on", "--wake"
+        )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual((lines[0]["located"], lines[0]["confirmed"]), ("cached", True))
+        self.assertEqual(lines[0]["attempts"], 1)
+        self.assertGreater(lines[0]["time_to_on"], 0)
+
+    def test_simulation_is_removed_after_the_run(self) -> None:
+        originals = (discovery.scan, control.connect, pairing.pyatv_pair)
+        self._run("1", "scan", "--timeout", "0.05")
+        self.assertEqual((discovery.scan, control.connect, pairing.pyatv_pair), originals)
+
+    def test_session_reports_dropped_connection(self) -> None:
+        profile = self._profile(drop_rate=1.0)
+        self._warm_up(profile)
+        requests = json.dumps({"type": "command", "command": "home"}) + "\n"
+        exit_code, lines = self._run(
+            profile, "session", "--identifier", "Simulated 002", stdin=requests
+        )
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(lines[0]["status"], "ready")
+        self.assertTrue(lines[1]["fatal"])
+        self.assertIn("simulated connection drop", lines[1]["error"])
+
+    def test_session_heartbeat_probes_simulated_device(self) -> None:
+        profile = self._profile()
+        self._warm_up(profile)
+        requests = "\n".join(
+            [json.dumps({"type": "health"}), json.dumps({"type": "health"}), ""]
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            exit_code, lines = self._run(
+                profile,
+                "session",
+                "--identifier",
+                "Simulated 001",
+                "--heartbeat",
+                "30",
+                stdin=requests,
+            )
+
+        self.assertEqual(exit_code, 0)
+        health = lines[2]
+        self.assertTrue(health["healthy"])
+        self.assertEqual((health["probes"], health["failures"]), (2, 0))
+        self.assertEqual(health["reconnects"], 0)
+        self.assertIsNotNone(health["rtt_ms"])
+
+    def test_session_pairs_with_profile_pin(self) -> None:
+        profile = self._profile(pin="4321")
+        self._warm_up(profile)
+        begin = json.dumps({"type": "pair_begin", "protocol": "Companion"})
+        requests = "\n".join(
+            [
+                begin,
+                json.dumps({"type": "pair_pin", "handle": "pair-1", "pin": "0000"}),
+                begin,
+                json.dumps({"type": "pair_pin", "handle": "pair-2", "pin": "4321"}),
+                json.dumps({"type": "close"}),
+                "",
+            ]
+        )
+        exit_code, lines = self._run(
+            profile,
+            "session",
+            "--identifier",
+            "Simulated 001",
+            stdin=requests,
+        )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(lines[2]["status"], "error")
+        self.assertEqual(lines[4]["status"], "paired")
+        self.assertTrue(lines[4]["credentials_saved"])
+        self.assertTrue(Path(self.storage).exists())
+
+    def test_invalid_profile_is_rejected(self) -> None:
+        with self.assertRaises(SimulationError):
+            load_profile(self._profile(drop_rate=2))
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = cli.main(["--simulate", self._profile(bogus=1), "scan"])
+        self.assertEqual(exit_code, 2)
+        self.assertIn("unknown simulation settings: bogus", stderr.getvalue())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Tests for session statistics and the event-loop stall watchdog."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import time
+import unittest
+from unittest.mock import patch
+
+from bridge_fixtures import DeviceTestCase, request_lines
+from pybridge import cli, control
+
+
+class SessionStatsTests(DeviceTestCase):
+    """Verify session statistics and the event-loop stall watchdog."""
+
+    def _run_session(self, *options: str):
+        stdin = request_lines(
+            {"type": "command", "command": "home"}, {"type": "stats"}, {"type": "close"}
+        )
+        return self.run_session(stdin, *options, global_options=["--mock"])
+
+    def test_stats_without_watchdog(self) -> None:
+        exit_code, responses = self._run_session()
+
+        self.assertEqual(exit_code, 0)
+        stats = responses[2]
+        self.assertEqual((stats["type"], stats["messages"]), ("stats", 2))
+        self.assertIsNone(stats["loop"])
+
+    def test_watchdog_records_blocking_call(self) -> None:
+        send = control._session_channel.send
+
+        def blocking_send(payload) -> None:
+            if payload.get("type") == "command":
+                time.sleep(0.3)  # a synchronous call stalling the loop
+            send(payload)
+
+        with patch.object(control._session_channel, "send", side_effect=blocking_send):
+            exit_code, responses = self._run_session("--stall-threshold", "0.1")
+
+        self.assertEqual(exit_code, 0)
+        loop_stats = responses[2]["loop"]
+        self.assertEqual(loop_stats["threshold_ms"], 100.0)
+        self.assertGreaterEqual(loop_stats["stalls"], 1)
+        stall = loop_stats["recent_stalls"][0]
+        self.assertGreater(stall["lag_ms"], 100.0)
+        self.assertTrue(any("in blocking_send" in frame for frame in stall["stack"]))
+        self.assertIsNone(control._session_watchdog)
+
+    def test_rejects_non_positive_threshold(self) -> None:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = cli.main(
+                ["--mock", "session", "--identifier", "Living Room", "--stall-threshold", "0"]
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertIn("--stall-threshold must be positive", stderr.getvalue())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Start-up cost checks for one-shot pybridge invocations."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from typing import Dict, List
+
+from pyatv.const import Protocol
+
+from pybridge.constants import PROTOCOL_NAMES
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time budget (microseconds) for the ``pybridge`` package in
+# commands that never contact a device. Loading pyatv costs several hundred
+# milliseconds, so a regression that pulls it back in blows well past this.
+IMPORT_BUDGET_US = 150_000
+
+
+def _import_times(*args: str) -> Dict[str, int]:
+    """Run ``python -X importtime -m pybridge`` and return cumulative times per module."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "pybridge", *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative.strip())
+        except ValueError:  # header line
+            continue
+    return times
+
+
+class StartupTests(unittest.TestCase):
+    """Keep lightweight commands from importing pyatv."""
+
+    def _assert_lightweight(self, args: List[str]) -> None:
+        times = _import_times(*args)
+
+        loaded_pyatv = sorted(name for name in times if name.split(".")[0] == "pyatv")
+        self.assertEqual(loaded_pyatv, [], f"{args} imported pyatv")
+        self.assertLess(times["pybridge"], IMPORT_BUDGET_US)
+
+    def test_mock_scan_skips_pyatv(self) -> None:
+        self._assert_lightweight(["--mock", "scan"])
+
+    def test_clear_storage_skips_pyatv(self) -> None:
+        self._assert_lightweight(["--mock", "clear-storage"])
+
+    def test_protocol_names_match_pyatv(self) -> None:
+        self.assertEqual(list(PROTOCOL_NAMES), list(Protocol.__members__))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,176 @@
+"""Unit tests for the pybridge CLI verify command."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from pyatv import exceptions as pyatv_exceptions
+from pyatv.const import Protocol
+from pyatv.settings import Settings
+
+from pybridge import cli
+
+
+class FakeService:
+    def __init__(self, protocol: Protocol):
+        self.protocol = protocol
+        self.enabled = True
+
+
+class FakeConfig:
+    def __init__(self):
+        self.identifier = "11223344-5566-7788-9900-112233445566"
+        self.all_identifiers = [self.identifier, "00:11:22:33:44:55"]
+        self.name = "Living Room"
+        self.address = "10.0.0.10"
+        self.services = [FakeService(Protocol.Companion), FakeService(Protocol.AirPlay)]
+
+    def get_service(self, protocol: Protocol):
+        for service in self.services:
+            if service.protocol == protocol:
+                return service
+        return None
+
+
+class FakeAppleTV:
+    def __init__(self):
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeStorage:
+    def __init__(self, settings):
+        self.settings = settings
+
+
+def _settings(companion_id: str, airplay_id: str) -> Settings:
+    settings = Settings()
+    settings.protocols.companion.identifier = companion_id
+    settings.protocols.companion.credentials = "companion-token"
+    settings.protocols.airplay.identifier = airplay_id
+    settings.protocols.airplay.credentials = "airplay-token"
+    return settings
+
+
+class VerifyCommandTests(unittest.TestCase):
+    """Verify the credential health check classification."""
+
+    def test_verify_reports_valid_stale_and_unreachable(self) -> None:
+        storage = FakeStorage(
+            [
+                _settings("11223344-5566-7788-9900-112233445566", "00:11:22:33:44:55"),
+                _settings("missing-device", "66:55:44:33:22:11"),
+            ]
+        )
+        connected = []
+
+        async def fake_connect(config, _loop, storage=None):
+            enabled = [service.protocol for service in config.services if service.enabled]
+            if enabled == [Protocol.AirPlay]:
+                raise pyatv_exceptions.AuthenticationError("pair verify failed")
+            atv = FakeAppleTV()
+            connected.append(atv)
+            return atv
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                patch("pybridge.verify.load_storage", AsyncMock(return_value=storage))
+            )
+            stack.enter_context(
+                patch("pybridge.verify.scan_configs", AsyncMock(return_value=[FakeConfig()]))
+            )
+            stack.enter_context(
+                patch("pybridge.control.connect", AsyncMock(side_effect=fake_connect))
+            )
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(["verify"])
+
+        self.assertEqual(exit_code, 1)
+        data = json.loads(stdout.getvalue())
+        self.assertEqual((data["valid"], data["stale"], data["unreachable"]), (0, 1, 1))
+
+        living_room, missing = data["devices"]
+        protocols = {item["protocol"]: item for item in living_room["protocols"]}
+        self.assertEqual(living_room["status"], "stale")
+        self.assertEqual(protocols["Companion"]["status"], "valid")
+        self.assertEqual(protocols["AirPlay"]["status"], "stale")
+        self.assertIsNotNone(protocols["Companion"]["elapsed"])
+        self.assertEqual(missing["status"], "unreachable")
+        self.assertTrue(all(atv.closed for atv in connected))
+
+    def test_verify_reports_socket_errors_as_unreachable(self) -> None:
+        storage = FakeStorage(
+            [_settings("11223344-5566-7788-9900-112233445566", "00:11:22:33:44:55")]
+        )
+
+        async def fake_connect(config, _loop, storage=None):
+            enabled = [service.protocol for service in config.services if service.enabled]
+            if enabled == [Protocol.AirPlay]:
+                raise ConnectionRefusedError(111, "Connection refused")
+            return FakeAppleTV()
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                patch("pybridge.verify.load_storage", AsyncMock(return_value=storage))
+            )
+            stack.enter_context(
+                patch("pybridge.verify.scan_configs", AsyncMock(return_value=[FakeConfig()]))
+            )
+            stack.enter_context(
+                patch("pybridge.control.connect", AsyncMock(side_effect=fake_connect))
+            )
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(["verify"])
+
+        self.assertEqual(exit_code, 1)
+        data = json.loads(stdout.getvalue())
+        self.assertEqual((data["valid"], data["stale"], data["unreachable"]), (0, 0, 1))
+        protocols = {item["protocol"]: item for item in data["devices"][0]["protocols"]}
+        self.assertEqual(protocols["Companion"]["status"], "valid")
+        self.assertEqual(protocols["AirPlay"]["status"], "unreachable")
+        self.assertIn("Connection refused", protocols["AirPlay"]["error"])
+
+    def test_verify_succeeds_when_every_device_is_valid(self) -> None:
+        storage = FakeStorage(
+            [_settings("11223344-5566-7788-9900-112233445566", "00:11:22:33:44:55")]
+        )
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                patch("pybridge.verify.load_storage", AsyncMock(return_value=storage))
+            )
+            stack.enter_context(
+                patch("pybridge.verify.scan_configs", AsyncMock(return_value=[FakeConfig()]))
+            )
+            stack.enter_context(
+                patch("pybridge.control.connect", AsyncMock(return_value=FakeAppleTV()))
+            )
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                exit_code = cli.main(["verify"])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(json.loads(stdout.getvalue())["valid"], 1)
+
+    def test_verify_requires_storage(self) -> None:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = cli.main(["--no-storage", "verify"])
+
+        self.assertEqual(exit_code, 2)
+        self.assertIn("storage is required", stderr.getvalue())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Tests for the power-on fast path for sleeping devices (power --wake)."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from pyatv import exceptions as pyatv_exceptions
+from pyatv.const import PowerState, Protocol
+
+from bridge_fixtures import DeviceTestCase
+
+
+class WakeTests(DeviceTestCase):
+    """Verify the power-on fast path for sleeping devices."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.config.services = [
+            SimpleNamespace(protocol=protocol, enabled=True)
+            for protocol in (Protocol.MRP, Protocol.Companion, Protocol.AirPlay, Protocol.RAOP)
+        ]
+        self.config.get_service = lambda protocol: object()
+        self.apple_tv.power.state = PowerState.Off
+
+        async def turn_on() -> None:
+            self.apple_tv.power.state = PowerState.On
+
+        self.apple_tv.power.turn_on = turn_on
+        self.connect.side_effect = [
+            pyatv_exceptions.ConnectionFailedError("waking"),
+            self.apple_tv,
+        ]
+        self.host_scan = AsyncMock(return_value=[self.config])
+        self.stack.enter_context(patch("pybridge.discovery.scan", self.host_scan))
+        self.stack.enter_context(patch("pybridge.control._WAKE_RETRY_INTERVAL", 0.01))
+
+    def _wake(self):
+        return self.run_cli(
+            "power",
+            "--identifier",
+            "Living Room",
+            "--action",
+            "on",
+            "--wake",
+            "--wake-timeout",
+            "2",
+        )
+
+    def test_known_device_is_woken_at_cached_address_with_retries(self) -> None:
+        entry = {
+            "name": self.config.name,
+            "address": self.config.address,
+            "identifiers": self.config.all_identifiers,
+            "arrivals": {},
+        }
+        self.state_file("scan").write_text(
+            json.dumps({"devices": {self.config.identifier: entry}})
+        )
+
+        exit_code, lines = self._wake()
+
+        self.assertEqual(exit_code, 0)
+        result = lines[0]
+        self.assertEqual((result["located"], result["attempts"]), ("cached", 2))
+        self.assertTrue(result["confirmed"])
+        self.assertIsNotNone(result["time_to_on"])
+        self.scan.assert_not_awaited()
+        self.assertEqual(self.host_scan.await_args.kwargs["hosts"], [self.config.address])
+        connected = self.connect.await_args.args[0]
+        self.assertEqual(
+            [service.protocol for service in connected.services if service.enabled],
+            [Protocol.Companion],
+        )
+        self.assertNotIn("protocol", self.connect.await_args.kwargs)
+        self.assertTrue(all(service.enabled for service in self.config.services))
+        self.assertTrue(self.apple_tv.closed)
+
+    def test_unknown_device_falls_back_to_scan(self) -> None:
+        self.connect.side_effect = None
+
+        exit_code, lines = self._wake()
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(lines[0]["located"], "scan")
+        self.scan.assert_awaited_once()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()